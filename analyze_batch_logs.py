@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Batch Extraction Log Analyzer for YouTube Treatment Comparison Helper
+Rebuilds a per-video, per-step timeline of batch extractions from the JSON
+the extension's "Export Logs" button writes (ExtensionLogger.downloadLogs),
+and reports where the time goes: latency percentiles per video, per kind of
+step and per step, the slowest steps, and retry rates.
+
+Batch mode logs one "Batch video timing" entry per video (the step
+timeline of extractVideoMetrics, see content-batch.js) and a "Retry: ..."
+warning whenever a date range has to be set again. Exports overlap (the
+extension keeps its last 500 entries), so entries seen in an earlier file
+are counted once.
+
+Usage:
+  python analyze_batch_logs.py yt-treatment-helper-logs-*.json
+  python analyze_batch_logs.py logs/ --top 20
+  python analyze_batch_logs.py logs/ --timeline VIDEO_ID
+  python analyze_batch_logs.py logs/ --json report.json
+"""
+
+import argparse
+import glob
+import heapq
+import json
+import sys
+from bisect import bisect_right
+from collections import Counter, defaultdict, namedtuple
+from datetime import datetime
+from pathlib import Path
+
+TIMING_MESSAGE = 'Batch video timing'
+RETRY_PREFIX = 'Retry:'
+# The last progress step only marks the end of a video
+END_STEP = 'Extraction complete'
+# Stands in for the page navigation before a video's first step
+PAGE_LOAD_STEP = 'Load video page'
+
+# Step descriptions passed to the batch progress callback, by prefix, and
+# the kind of work each is; anything else is setup (dates, metric picker)
+STEP_KINDS = (
+    ('Waiting for analytics page', 'page load'),
+    ('Analytics page loaded', 'page load'),
+    ('Navigating ', 'navigation'),
+    ('Returning ', 'navigation'),
+    ('Setting ', 'date range'),
+    ('Extracting ', 'metric read'),
+)
+KIND_ORDER = ('page load', 'navigation', 'date range', 'metric read', 'setup')
+
+PERCENTILES = (50, 90, 99)
+TOP_STEPS = 10
+
+# One timed step of a video; start_ms is relative to the video's first step
+Step = namedtuple('Step', ['label', 'kind', 'start_ms', 'ms'])
+# One video's extraction; retries are (step label, retry message) pairs
+VideoRun = namedtuple('VideoRun', ['session', 'video_id', 'index', 'total', 'mode',
+                                   'status', 'errors', 'started', 'ms', 'steps', 'retries'])
+
+def step_kind(label):
+    """Kind of work a step description stands for ('[Equal] ' phase prefixes ignored)."""
+    if label.startswith('['):
+        label = label.split('] ', 1)[-1]
+    for prefix, kind in STEP_KINDS:
+        if label.startswith(prefix):
+            return kind
+    return 'setup'
+
+def parse_time(value):
+    """Seconds since the epoch from an ISO timestamp ('2025-11-04T10:15:02.123Z')."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+def percentile(sorted_values, q):
+    """Linearly interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return float('nan')
+    position = (len(sorted_values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+# ============================================================================
+# Reading exported logs
+# ============================================================================
+
+def find_logs(patterns):
+    """Expand the command line into log files: files, directories of *.json, globs, '-'."""
+    paths = []
+    for pattern in patterns:
+        path = Path(pattern)
+        if pattern == '-':
+            paths.append('-')
+        elif path.is_dir():
+            paths.extend(sorted(path.glob('*.json')))
+        elif glob.has_magic(pattern):
+            paths.extend(sorted(Path(p) for p in glob.glob(pattern)))
+        else:
+            paths.append(path)
+    return paths
+
+def iter_entries(paths):
+    """Log entries of every file, one file in memory at a time.
+
+    Accepts the extension's export ({"logs": [...]}) or a bare list of
+    entries; entries repeated across overlapping exports are yielded once.
+    Only timing and retry entries are remembered for that.
+    """
+    seen = set()
+    for path in paths:
+        if path == '-':
+            export = json.load(sys.stdin)
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                export = json.load(f)
+        entries = export.get('logs', []) if isinstance(export, dict) else export
+        for entry in entries:
+            message = entry.get('message', '')
+            if message != TIMING_MESSAGE and not message.startswith(RETRY_PREFIX):
+                continue
+            key = (entry.get('sessionId'), entry.get('timestamp'), message,
+                   (entry.get('data') or {}).get('videoId'))
+            if key in seen:
+                continue
+            seen.add(key)
+            yield entry
+
+def video_run(entry):
+    """A VideoRun from a "Batch video timing" entry."""
+    data = entry.get('data') or {}
+    total_ms = data.get('totalMs') or 0
+    marks = sorted(data.get('steps') or [], key=lambda mark: mark[2])
+    steps = []
+    if data.get('navigationMs') is not None:
+        steps.append(Step(PAGE_LOAD_STEP, 'page load', -data['navigationMs'], data['navigationMs']))
+    for (_, label, at), following in zip(marks, marks[1:] + [None]):
+        if label == END_STEP:
+            continue
+        end = following[2] if following else total_ms
+        steps.append(Step(label, step_kind(label), at, max(0, end - at)))
+    started = parse_time(data['startedAt']) if data.get('startedAt') else parse_time(entry['timestamp']) - total_ms / 1000
+    return VideoRun(entry.get('sessionId'), data.get('videoId'), data.get('index'), data.get('total'),
+                    data.get('mode'), data.get('status', 'unknown'), data.get('errors') or [],
+                    started, total_ms + (data.get('navigationMs') or 0), steps, [])
+
+def load_runs(paths):
+    """Every video run in the logs, with each retry attached to the step it happened in.
+
+    Retries carry no video ID; they belong to the run of the same session
+    whose time span contains them.
+    """
+    runs, retries = [], []
+    for entry in iter_entries(paths):
+        if entry['message'] == TIMING_MESSAGE:
+            runs.append(video_run(entry))
+        else:
+            retries.append(entry)
+
+    runs.sort(key=lambda run: (run.session or '', run.started))
+    by_session = defaultdict(list)
+    for position, run in enumerate(runs):
+        by_session[run.session].append(position)
+    unmatched = 0
+    for entry in retries:
+        positions = by_session.get(entry.get('sessionId'), [])
+        at = parse_time(entry['timestamp'])
+        found = bisect_right([runs[p].started for p in positions], at) - 1
+        run = runs[positions[found]] if found >= 0 else None
+        offset_ms = (at - run.started) * 1000 if run else None
+        if run is None or offset_ms > run.ms:
+            unmatched += 1
+            continue
+        step = next((step for step in reversed(run.steps) if step.start_ms <= offset_ms),
+                    run.steps[0] if run.steps else None)
+        run.retries.append((step.label if step else '', entry['message']))
+    return runs, unmatched
+
+# ============================================================================
+# Report
+# ============================================================================
+
+def distribution(values):
+    values = sorted(values)
+    return {'count': len(values), 'total_ms': sum(values),
+            **{f'p{q}_ms': percentile(values, q) for q in PERCENTILES},
+            'max_ms': values[-1] if values else float('nan')}
+
+def analyze(runs, unmatched_retries=0, top=TOP_STEPS):
+    """Everything the report prints, as plain data (also written by --json)."""
+    per_video = [run.ms for run in runs]
+    by_kind = defaultdict(list)
+    by_step = defaultdict(list)
+    retries_by_step = Counter()
+    retry_messages = Counter()
+    for run in runs:
+        kinds = Counter()
+        for step in run.steps:
+            kinds[step.kind] += step.ms
+            by_step[step.label].append(step.ms)
+        for kind in KIND_ORDER:
+            by_kind[kind].append(kinds[kind])
+        for label, message in run.retries:
+            retries_by_step[label] += 1
+            retry_messages[message] += 1
+
+    total_ms = sum(per_video) or 1
+    steps = sorted(({'step': label, 'kind': step_kind(label) if label != PAGE_LOAD_STEP else 'page load',
+                     'retries': retries_by_step[label], 'share': sum(values) / total_ms,
+                     **distribution(values)}
+                    for label, values in by_step.items()),
+                   key=lambda row: -row['total_ms'])
+    slowest = heapq.nlargest(top, ((step.ms, run.video_id, run.session, step.label)
+                                   for run in runs for step in run.steps))
+
+    date_range_steps = sum(row['count'] for row in steps if row['kind'] == 'date range')
+    retried_videos = sum(1 for run in runs if run.retries)
+    retry_count = sum(retry_messages.values())
+    sessions = defaultdict(list)
+    for run in runs:
+        sessions[run.session].append(run)
+    # run.ms includes the page load before run.started
+    span_s = sum(max(run.started + (run.ms + run.steps[0].start_ms) / 1000 for run in session)
+                 - min(run.started + min(0, run.steps[0].start_ms) / 1000 for run in session)
+                 for session in sessions.values() if all(run.steps for run in session))
+    return {
+        'sessions': len(sessions),
+        'videos': len(runs),
+        'status': dict(Counter(run.status for run in runs)),
+        'errors': dict(Counter(error for run in runs for error in run.errors).most_common(top)),
+        'videos_per_hour': len(runs) / span_s * 3600 if span_s > 0 else None,
+        'per_video': distribution(per_video),
+        'kinds': {kind: {'share': sum(by_kind[kind]) / total_ms, **distribution(by_kind[kind])}
+                  for kind in KIND_ORDER},
+        'steps': steps,
+        'slowest': [{'ms': ms, 'video_id': video_id, 'session': session, 'step': label}
+                    for ms, video_id, session, label in slowest],
+        'retries': {
+            'total': retry_count,
+            'videos_retried': retried_videos,
+            'video_rate': retried_videos / len(runs) if runs else 0.0,
+            'per_date_range_set': retry_count / date_range_steps if date_range_steps else 0.0,
+            'unmatched': unmatched_retries,
+            'by_message': dict(retry_messages.most_common()),
+        },
+    }
+
+def seconds(ms):
+    return f"{ms / 1000:7.1f}s" if ms == ms else "      -"
+
+def print_report(report):
+    print(f"\nBatch extraction timing: {report['videos']} videos in {report['sessions']} sessions")
+    print("=" * 50)
+    status = ', '.join(f"{count} {name}" for name, count in sorted(report['status'].items()))
+    print(f"  Results: {status}")
+    if report['videos_per_hour']:
+        print(f"  Throughput: {report['videos_per_hour']:.0f} videos/hour")
+
+    quantiles = ''.join(f"{f'p{q}':>8}" for q in PERCENTILES)
+    print(f"\n{'Per video':<34}{quantiles}{'max':>8}  share")
+    video = report['per_video']
+    print(f"  {'wall time':<32}" + ''.join(seconds(video[f'p{q}_ms']) for q in PERCENTILES)
+          + seconds(video['max_ms']))
+    for kind, row in report['kinds'].items():
+        print(f"  {kind:<32}" + ''.join(seconds(row[f'p{q}_ms']) for q in PERCENTILES)
+              + seconds(row['max_ms']) + f"  {row['share']:5.1%}")
+
+    print(f"\n{'Steps by total time':<34}{quantiles}{'max':>8}  share  retries")
+    for row in report['steps'][:TOP_STEPS * 2]:
+        print(f"  {row['step'][:32]:<32}" + ''.join(seconds(row[f'p{q}_ms']) for q in PERCENTILES)
+              + seconds(row['max_ms']) + f"  {row['share']:5.1%}  {row['retries']:7d}")
+
+    if report['slowest']:
+        print("\nSlowest steps")
+        for row in report['slowest']:
+            print(f"  {seconds(row['ms'])}  {row['video_id']}  {row['step']}")
+
+    retries = report['retries']
+    print("\nRetries")
+    print(f"  {retries['total']} retries; {retries['videos_retried']} of {report['videos']} videos "
+          f"retried ({retries['video_rate']:.1%}); {retries['per_date_range_set']:.2%} of date range sets")
+    for message, count in retries['by_message'].items():
+        print(f"    {count:5d}  {message}")
+    if retries['unmatched']:
+        print(f"  ({retries['unmatched']} retries outside any logged video)")
+    if report['errors']:
+        print("\nMost common errors")
+        for error, count in report['errors'].items():
+            print(f"  {count:5d}  {error}")
+
+def print_timeline(runs, video_id):
+    matching = [run for run in runs if run.video_id == video_id]
+    if not matching:
+        print(f"\nNo timing logged for video {video_id}")
+        return
+    for run in matching:
+        started = datetime.fromtimestamp(run.started).isoformat(sep=' ', timespec='seconds')
+        print(f"\n{video_id}: {run.mode}, {run.status}, {run.ms / 1000:.1f}s "
+              f"(started {started}, video {(run.index or 0) + 1} of {run.total})")
+        retried = Counter(label for label, _ in run.retries)
+        for step in run.steps:
+            note = f"  ({retried[step.label]} retries)" if retried[step.label] else ""
+            print(f"  {step.start_ms / 1000:+8.1f}s {seconds(step.ms)}  {step.kind:<12} {step.label}{note}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report where batch extraction spends its time, from exported extension logs",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python analyze_batch_logs.py yt-treatment-helper-logs-*.json
+  python analyze_batch_logs.py logs/ --top 20
+  python analyze_batch_logs.py logs/ --timeline VIDEO_ID
+  python analyze_batch_logs.py logs/ --json report.json
+        """
+    )
+    parser.add_argument("logs", nargs="+",
+                        help="Exported log files, folders of them, globs, or '-' for stdin")
+    parser.add_argument("--top", type=int, default=TOP_STEPS,
+                        help=f"Slowest individual steps to list (default: {TOP_STEPS})")
+    parser.add_argument("--timeline", metavar="VIDEO_ID",
+                        help="Also print every step of this video's extractions")
+    parser.add_argument("--json", metavar="PATH",
+                        help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    paths = find_logs(args.logs)
+    missing = [path for path in paths if path != '-' and not Path(path).is_file()]
+    if missing:
+        parser.error(f"no such log file: {missing[0]}")
+    if not paths:
+        parser.error("no log files found")
+
+    runs, unmatched = load_runs(paths)
+    if not runs:
+        print(f"No batch timing entries in {len(paths)} log file(s); they are written by "
+              f"batch mode from this extension version on")
+        return
+    report = analyze(runs, unmatched, args.top)
+    print_report(report)
+    if args.timeline:
+        print_timeline(runs, args.timeline)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Report written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark the batched bootstrap behind the summary chart's confidence
+intervals against a per-replicate Python loop.
+
+Uses synthetic per-video changes (heavy-tailed, like view deltas).
+
+Usage:
+  python benchmarks/bench_bootstrap.py
+  python benchmarks/bench_bootstrap.py --videos 100000 --replicates 2000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from generate_visualizations import (  # noqa: E402
+    BOOTSTRAP_CONFIDENCE, BOOTSTRAP_REPLICATES, bootstrap_mean_ci,
+)
+
+
+def loop_bootstrap_mean_ci(values, replicates, confidence, seed=0):
+    """One resample and mean per loop iteration."""
+    rng = np.random.default_rng(seed)
+    n = len(values)
+    means = [values[rng.integers(0, n, size=n)].mean() for _ in range(replicates)]
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(means, [tail, 100 - tail])
+    return values.mean(), low, high
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bootstrap confidence intervals")
+    parser.add_argument("--videos", type=int, nargs="+", default=[50, 1000, 100000],
+                        help="Section sizes to time (default: 50 1000 100000)")
+    parser.add_argument("--replicates", type=int, default=BOOTSTRAP_REPLICATES,
+                        help=f"Bootstrap replicates (default: {BOOTSTRAP_REPLICATES})")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timing repetitions, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    print(f"Bootstrap benchmark: {args.replicates:,} replicates, "
+          f"{BOOTSTRAP_CONFIDENCE:.0%} interval")
+    print("=" * 50)
+    rng = np.random.default_rng(1)
+    for videos in args.videos:
+        values = rng.standard_t(3, size=videos) * 100
+        loop, (_, loop_low, loop_high) = best_of(
+            lambda: loop_bootstrap_mean_ci(values, args.replicates, BOOTSTRAP_CONFIDENCE),
+            args.repeat)
+        batched, (_, low, high) = best_of(
+            lambda: bootstrap_mean_ci(values, args.replicates), args.repeat)
+        print(f"  {videos:>8,} videos   loop {loop * 1000:9.1f} ms   "
+              f"batched {batched * 1000:9.1f} ms   ({loop / batched:.1f}x)")
+        print(f"  {'':>15}CI loop [{loop_low:.2f}, {loop_high:.2f}]   "
+              f"batched [{low:.2f}, {high:.2f}]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark loading parsed sections from the .npy dataset cache against
+parsing and normalizing the CSV again.
+
+Usage:
+  python benchmarks/bench_cache.py
+  python benchmarks/bench_cache.py --rows 125000   # 500k rows in total
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_parser import build_large_csv  # noqa: E402
+from generate_visualizations import (  # noqa: E402
+    dataset_cache_key, file_sha256, load_cached_sections, load_sections,
+    normalize_sections, save_cached_sections,
+)
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the parsed-dataset cache")
+    parser.add_argument("--rows", type=int, default=125000,
+                        help="Data rows per section in the generated CSV (default: 125000)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timing repetitions, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "bench.csv"
+        cache_dir = Path(tmp) / "cache"
+        build_large_csv(csv_path, args.rows)
+
+        print(f"Dataset cache benchmark: {args.rows * 4:,} rows "
+              f"({csv_path.stat().st_size / 1e6:.1f} MB)")
+        print("=" * 50)
+
+        parse = best_of(lambda: normalize_sections(load_sections(csv_path)), args.repeat)
+        print(f"  parse + normalize   {parse * 1000:9.1f} ms")
+
+        key = dataset_cache_key(file_sha256(csv_path), 'auto')
+        save_cached_sections(cache_dir, key, normalize_sections(load_sections(csv_path)))
+
+        cached = best_of(lambda: load_cached_sections(cache_dir, key), args.repeat)
+        print(f"  cache load          {cached * 1000:9.1f} ms")
+
+        print(f"\n  speedup {parse / cached:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
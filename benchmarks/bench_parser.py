@@ -0,0 +1,160 @@
+"""
+Benchmark the streaming CSV section parser against the original
+readlines() + StringIO implementation.
+
+Builds a large comparison CSV by repeating the data rows of the sample
+spreadsheet, then reports wall time and peak traced memory for both parsers.
+
+Usage:
+  python benchmarks/bench_parser.py
+  python benchmarks/bench_parser.py --rows 50000 --repeat 3
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from generate_visualizations import parse_csv_sections  # noqa: E402
+
+SAMPLE_CSV = REPO_ROOT / "JSTB spreadsheet (Extension) - YouTube Metrics Comparison.csv"
+
+
+def legacy_parse_csv_sections(csv_path):
+    """The pre-streaming parser, kept verbatim as the benchmark baseline."""
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+
+    sections = {
+        'longform_equal': [],
+        'longform_lifetime': [],
+        'shorts_equal': [],
+        'shorts_lifetime': []
+    }
+
+    current_section = None
+    header_row = None
+
+    for i, line in enumerate(lines):
+        if 'Long Form Videos - Equal Duration' in line:
+            current_section = 'longform_equal'
+            header_row = None
+        elif 'Long Form Videos - Lifetime' in line:
+            current_section = 'longform_lifetime'
+            header_row = None
+        elif 'Shorts - Equal Duration' in line:
+            current_section = 'shorts_equal'
+            header_row = None
+        elif 'Shorts - Lifetime' in line:
+            current_section = 'shorts_lifetime'
+            header_row = None
+        elif current_section and 'Video Title' in line:
+            header_row = line
+            sections[current_section].append(line)
+        elif current_section and header_row and line.strip() and not line.startswith(',,,'):
+            sections[current_section].append(line)
+
+    dfs = {}
+    for section, data in sections.items():
+        if data:
+            df = pd.read_csv(StringIO(''.join(data)))
+
+            numeric_cols = ['Equal Before Impressions', 'Equal After Impressions',
+                            'Equal Before Views', 'Equal After Views',
+                            'Lifetime Before Impressions', 'Lifetime After Impressions',
+                            'Lifetime Before Views', 'Lifetime After Views']
+
+            for col in numeric_cols:
+                if col in df.columns:
+                    df[col] = df[col].astype(str).str.replace(',', '').replace('nan', '0')
+                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+
+            dfs[section] = df
+
+    return dfs
+
+
+def build_large_csv(path, rows_per_section):
+    """Write a copy of the sample CSV with each section grown to rows_per_section rows."""
+    with open(SAMPLE_CSV, 'r', encoding='utf-8') as f:
+        lines = [line.rstrip('\n') + '\n' for line in f]
+
+    out = []
+    block = []
+    in_data = False
+
+    def flush():
+        if block:
+            for i in range(rows_per_section):
+                out.append(block[i % len(block)])
+            block.clear()
+
+    for line in lines:
+        if 'Video Title' in line:
+            in_data = True
+            out.append(line)
+        elif in_data and line.strip() and not line.startswith(',,,'):
+            block.append(line)
+        else:
+            if in_data:
+                flush()
+                in_data = False
+            out.append(line)
+    flush()
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(out)
+
+
+def measure(parser, csv_path, repeat):
+    """Return (best wall time in seconds, peak traced memory in bytes)."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser(csv_path)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    parser(csv_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the comparison CSV parser")
+    parser.add_argument("--rows", type=int, default=20000,
+                        help="Data rows per section in the generated CSV (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timing repetitions, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "bench.csv"
+        build_large_csv(csv_path, args.rows)
+        size_mb = csv_path.stat().st_size / 1e6
+
+        print(f"Parser benchmark: {args.rows * 4:,} rows ({size_mb:.1f} MB)")
+        print("=" * 50)
+
+        results = {}
+        for name, fn in [("legacy", legacy_parse_csv_sections), ("streaming", parse_csv_sections)]:
+            wall, peak = measure(fn, csv_path, args.repeat)
+            results[name] = (wall, peak)
+            print(f"  {name:<10} {wall * 1000:9.1f} ms   peak {peak / 1e6:8.1f} MB")
+
+        legacy_wall, legacy_peak = results["legacy"]
+        wall, peak = results["streaming"]
+        print(f"\n  speedup {legacy_wall / wall:.2f}x, peak memory {peak / legacy_peak:.0%} of legacy")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark top/bottom-K selection for the ranking charts: the RankingIndex
+(argpartition, built once per section) against sorting the whole section
+per metric, as the charts used to.
+
+Uses a synthetic section with Before/After CTR, views and impressions.
+
+Usage:
+  python benchmarks/bench_ranking.py
+  python benchmarks/bench_ranking.py --videos 1000000 --k 10
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from generate_visualizations import RankingIndex  # noqa: E402
+
+METRICS = ('CTR', 'Views', 'Impressions')
+
+
+def make_section(videos, seed=1):
+    rng = np.random.default_rng(seed)
+    data = {'Video Title': [f'Video {i}' for i in range(videos)]}
+    for metric, scale in (('CTR', 5), ('Views', 10000), ('Impressions', 100000)):
+        before = rng.lognormal(0, 1, videos) * scale
+        data[f'Equal Before {metric}'] = before
+        data[f'Equal After {metric}'] = before * rng.lognormal(0, 0.3, videos)
+    return pd.DataFrame(data)
+
+
+def sorted_extremes(df, k):
+    """Whole-section sort per metric, then head/tail."""
+    shown = {}
+    for metric in METRICS:
+        change = df[f'Equal After {metric}'] - df[f'Equal Before {metric}']
+        order = change.sort_values()
+        shown[metric] = np.concatenate([order.index[:k], order.index[-k:]])
+    return shown
+
+
+def indexed_extremes(df, k):
+    """One index for the section, then a selection per metric."""
+    ranking = RankingIndex(df)
+    return {metric: ranking.extremes(metric, k, k) for metric in METRICS}
+
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark top/bottom-K ranking selection")
+    parser.add_argument("--videos", type=int, nargs="+", default=[1000, 100000, 1000000],
+                        help="Section sizes to time (default: 1000 100000 1000000)")
+    parser.add_argument("--k", type=int, default=10,
+                        help="Rows at each end (default: 10)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timing repetitions, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    print(f"Ranking benchmark: top/bottom {args.k} of {len(METRICS)} metrics")
+    print("=" * 50)
+    for videos in args.videos:
+        df = make_section(videos)
+        full, expected = best_of(lambda: sorted_extremes(df, args.k), args.repeat)
+        indexed, shown = best_of(lambda: indexed_extremes(df, args.k), args.repeat)
+        same = all(np.array_equal(expected[metric], shown[metric]) for metric in METRICS)
+        print(f"  {videos:>9,} videos   sort {full * 1000:8.1f} ms   "
+              f"index {indexed * 1000:8.1f} ms   ({full / indexed:.1f}x)"
+              f"{'' if same else '   ROWS DIFFER'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark getting one figure's image bytes the three ways a dashboard can:
+running the script and reading the PNG back, calling render() on sections
+already loaded in-process, and a repeat request to the --serve service
+(answered from its LRU cache).
+
+Usage:
+  python benchmarks/bench_render.py
+  python benchmarks/bench_render.py --rows 5000 --figure top-performers
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import generate_visualizations as gv  # noqa: E402
+from make_dataset import write_dataset  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark in-process and served rendering")
+    parser.add_argument("--rows", type=int, default=1000,
+                        help="Videos in the synthetic sheet (default: 1000)")
+    parser.add_argument("--figure", default="heatmap",
+                        help="Figure name or number (default: heatmap)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timing repetitions, best is reported (default: 3)")
+    args = parser.parse_args()
+    figure = gv.FIGURES[gv.figure_index(args.figure)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = Path(tmp) / "sheet.csv"
+        write_dataset(data, args.rows, 'csv')
+        output = Path(tmp) / "out"
+
+        def shell_out():
+            subprocess.run([sys.executable, str(REPO_ROOT / "generate_visualizations.py"),
+                            "--input", str(data), "--output", str(output), "--only", figure.name,
+                            "--force", "--no-cache"], check=True, stdout=subprocess.DEVNULL)
+            return (output / figure.filename).read_bytes()
+
+        print(f"Render API benchmark: {figure.name}, {args.rows:,} videos")
+        print("=" * 50)
+        seconds, expected = best_of(shell_out, args.repeat)
+        print(f"  script + read back  {seconds * 1000:9.1f} ms")
+
+        dfs = gv.load_figure_data(data)
+        seconds, image = best_of(lambda: gv.render(figure.name, dfs), args.repeat)
+        print(f"  render() warm       {seconds * 1000:9.1f} ms"
+              f"{'' if image == expected else '   BYTES DIFFER'}")
+
+        serve_args = argparse.Namespace(serve=0, cache_mb=gv.CACHE_MB, content_type='auto',
+                                        channel=None, treated_since=None)
+        server = gv.figure_server(str(data), serve_args)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://{gv.SERVE_HOST}:{server.server_port}/figures/{figure.name}.png"
+        try:
+            first, image = best_of(lambda: urllib.request.urlopen(url).read(), 1)
+            print(f"  --serve first       {first * 1000:9.1f} ms   (parse + render)"
+                  f"{'' if image == expected else '   BYTES DIFFER'}")
+            seconds, _ = best_of(lambda: urllib.request.urlopen(url).read(), args.repeat)
+            print(f"  --serve cached      {seconds * 1000:9.1f} ms")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark cold start of generate_visualizations.py: --help, --list and an
+up-to-date run that only checks the build manifest.
+
+Each case runs in a fresh interpreter, as in a cron job or container.
+
+Usage:
+  python benchmarks/bench_startup.py
+  python benchmarks/bench_startup.py --script old_generate_visualizations.py --repeat 10
+"""
+
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SAMPLE_CSV = REPO_ROOT / "JSTB spreadsheet (Extension) - YouTube Metrics Comparison.csv"
+
+CASES = [
+    ("--help", ["--help"]),
+    ("--list", ["--list"]),
+    ("up to date", []),
+]
+
+
+def best_of(command, cwd, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark generate_visualizations.py cold start")
+    parser.add_argument("--script", default=str(REPO_ROOT / "generate_visualizations.py"),
+                        help="Script to time (default: the repository's generate_visualizations.py)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="Timing repetitions, best is reported (default: 5)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        script = Path(tmp) / "generate_visualizations.py"
+        shutil.copy(args.script, script)
+        shutil.copy(SAMPLE_CSV, tmp)
+        command = [sys.executable, str(script)]
+
+        # Build once so the last case finds everything up to date
+        subprocess.run(command, cwd=tmp, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        print(f"Cold start benchmark: {args.script}")
+        print("=" * 50)
+        baseline = best_of([sys.executable, "-c", "pass"], tmp, args.repeat)
+        print(f"  {'interpreter only':<18} {baseline * 1000:8.1f} ms")
+        for name, extra in CASES:
+            if name == "--list" and "--list" not in subprocess.run(
+                    command + ["--help"], cwd=tmp, capture_output=True, text=True).stdout:
+                continue
+            wall = best_of(command + extra, tmp, args.repeat)
+            print(f"  {name:<18} {wall * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
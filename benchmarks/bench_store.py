@@ -0,0 +1,107 @@
+"""
+Benchmark the SQLite metrics store: ingesting several channels' exports,
+then reading one channel and every channel, against parsing and
+normalizing one channel's CSV again. Then the incremental cases on a batch
+export: re-ingesting it untouched, after rows were appended to it, and as
+a re-export with a few rows changed.
+
+Usage:
+  python benchmarks/bench_store.py
+  python benchmarks/bench_store.py --channels 20 --rows 10000
+  python benchmarks/bench_store.py --delta 5
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_visualizations import (  # noqa: E402
+    ingest_export, load_sections, normalize_sections, open_store, query_store,
+)
+from make_dataset import write_dataset  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the metrics store")
+    parser.add_argument("--channels", type=int, default=8,
+                        help="Channel exports to ingest (default: 8)")
+    parser.add_argument("--rows", type=int, default=4000,
+                        help="Videos per channel export (default: 4000)")
+    parser.add_argument("--delta", type=float, default=1.0,
+                        help="Percent of rows appended or changed (default: 1)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Timing repetitions, best is reported (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for seed in range(args.channels):
+            path = Path(tmp) / f"channel{seed}.csv"
+            write_dataset(path, args.rows, 'csv', seed)
+            paths.append(path)
+        conn = open_store(Path(tmp) / "metrics.sqlite")
+
+        print(f"Metrics store benchmark: {args.channels} channels x {args.rows:,} videos")
+        print("=" * 50)
+        start = time.perf_counter()
+        for path in paths:
+            ingest_export(conn, path, channel=path.stem)
+        print(f"  ingest all          {(time.perf_counter() - start) * 1000:9.1f} ms")
+
+        parse, _ = best_of(lambda: normalize_sections(load_sections(paths[0])), args.repeat)
+        print(f"  parse one channel   {parse * 1000:9.1f} ms")
+        for label, kwargs in (('query one channel', dict(channel='channel0')),
+                              ('query all channels', dict())):
+            seconds, dfs = best_of(lambda: query_store(conn, **kwargs), args.repeat)
+            videos = sum(len(df) for df in dfs.values())
+            print(f"  {label:<19} {seconds * 1000:9.1f} ms   ({videos:,} rows)")
+        conn.close()
+
+        print(f"\nIncremental ingest: {args.rows:,}-video batch export, {args.delta:g}% delta")
+        print("=" * 50)
+        full = Path(tmp) / "full.tsv"
+        delta = max(1, int(args.rows * args.delta / 100))
+        write_dataset(full, args.rows + delta, 'tsv', 0)
+        lines = full.read_bytes().splitlines(keepends=True)
+        export = Path(tmp) / "export.tsv"
+        export.write_bytes(b''.join(lines[:args.rows + 1]))
+        conn = open_store(Path(tmp) / "incremental.sqlite")
+
+        def timed(label, path):
+            start = time.perf_counter()
+            result = ingest_export(conn, path, channel='weekly')
+            print(f"  {label:<19} {(time.perf_counter() - start) * 1000:9.1f} ms   "
+                  f"({result['written']:,} of {result['rows']:,} rows written)")
+
+        timed('first ingest', export)
+        timed('untouched', export)
+        export.write_bytes(b''.join(lines))
+        timed('appended', export)
+        # The same extraction again with `delta` rows' Equal Pre Impressions changed
+        changed = [line.split(b'\t') for line in lines[1:delta + 1]]
+        for cells in changed:
+            cells[7] = b'1' + cells[7]
+        reexport = Path(tmp) / "reexport.tsv"
+        reexport.write_bytes(b''.join([lines[0]] + [b'\t'.join(cells) for cells in changed]
+                                      + lines[delta + 1:]))
+        timed('re-export', reexport)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark suite: time parsing, normalization and every figure on synthetic
+exports of increasing size, and record the results for later comparison.
+
+Each run writes benchmarks/results/<timestamp>-<commit>.json (kept out of
+git: timings only compare on the machine that made them). Pass an earlier
+result with --compare to flag stages that got slower; use --repeat 3 or more
+for comparisons, single timings of short stages are noisy.
+
+Usage:
+  python benchmarks/bench_suite.py
+  python benchmarks/bench_suite.py --rows 10 1000 100000 --format csv tsv
+  python benchmarks/bench_suite.py --rows 1000000 --no-figures
+  python benchmarks/bench_suite.py --repeat 3 --compare benchmarks/results/<earlier run>.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import generate_visualizations as gv  # noqa: E402
+from make_dataset import write_dataset  # noqa: E402
+
+# A stage this much slower than in the --compare run is reported as a regression
+REGRESSION_RATIO = 1.5
+# Stages faster than this are too noisy to compare
+MIN_COMPARE_SECONDS = 0.25
+
+
+def best_of(fn, repeat):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_case(path, fmt, rows, repeat, figures, output_dir):
+    """Time every stage for one dataset; returns {stage: seconds}."""
+    timings = {}
+    timings['parse'], raw = best_of(lambda: gv.load_sections(path), repeat)
+    timings['normalize'], dfs = best_of(
+        lambda: gv.normalize_sections({k: v.copy() for k, v in raw.items()}), repeat)
+    for section in gv.SECTION_LABELS:
+        dfs.setdefault(section, gv.empty_section(section))
+    for index in figures:
+        name = gv.FIGURES[index].name
+        timings[f'figure:{name}'], _ = best_of(
+            lambda: gv.render_figure(index, dfs, output_dir), repeat)
+    return timings
+
+
+def compare(results, baseline_path):
+    """Print per-stage ratios against an earlier result file; returns the regressions."""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(case['format'], case['rows']): case['timings']
+                    for case in json.load(f)['cases']}
+    regressions = []
+    print(f"\nCompared with {baseline_path}:")
+    for case in results['cases']:
+        before = baseline.get((case['format'], case['rows']))
+        if before is None:
+            continue
+        for stage, seconds in case['timings'].items():
+            old = before.get(stage)
+            if old is None or max(old, seconds) < MIN_COMPARE_SECONDS:
+                continue
+            ratio = seconds / old
+            flag = ''
+            if ratio > REGRESSION_RATIO:
+                flag = '  <-- slower'
+                regressions.append((case['format'], case['rows'], stage, ratio))
+            print(f"  {case['format']} {case['rows']:>9,} {stage:<24} "
+                  f"{old * 1000:9.1f} -> {seconds * 1000:9.1f} ms  ({ratio:.2f}x){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time parsing, normalization and each figure")
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 1000, 10000],
+                        help="Dataset sizes in videos (default: 10 1000 10000)")
+    parser.add_argument("--format", nargs="+", choices=["csv", "tsv"], default=["csv", "tsv"],
+                        help="Export layouts to generate (default: csv tsv)")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="Timing repetitions, best is reported (default: 1)")
+    parser.add_argument("--only", metavar="FIGURES",
+                        help="Time only these figures, by number or name (see generate_visualizations.py --list)")
+    parser.add_argument("--no-figures", action="store_true",
+                        help="Only time parsing and normalization")
+    parser.add_argument("--compare", metavar="RESULT_JSON",
+                        help="Earlier result file to compare against")
+    parser.add_argument("--no-save", action="store_true",
+                        help=f"Don't write the results to {RESULTS_DIR.name}/")
+    args = parser.parse_args()
+
+    figures = [] if args.no_figures else (
+        gv.select_figures(args.only) if args.only else list(range(len(gv.FIGURES))))
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cases': [],
+    }
+    print(f"Benchmark suite @ {results['commit']}")
+    print("=" * 50)
+
+    # Import pandas, matplotlib and seaborn up front so the first case doesn't pay for it
+    gv.pd.DataFrame, gv.plt.figure, gv.sns.heatmap
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.format:
+            for rows in args.rows:
+                path = Path(tmp) / f"bench_{rows}.{fmt}"
+                write_dataset(path, rows, fmt)
+                size_mb = path.stat().st_size / 1e6
+                print(f"\n{fmt} {rows:,} videos ({size_mb:.1f} MB)")
+                timings = run_case(path, fmt, rows, args.repeat, figures, tmp)
+                for stage, seconds in timings.items():
+                    print(f"  {stage:<24} {seconds * 1000:10.1f} ms")
+                results['cases'].append({'format': fmt, 'rows': rows, 'size_mb': round(size_mb, 2),
+                                         'timings': {k: round(v, 4) for k, v in timings.items()}})
+                path.unlink()
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        out = RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{results['commit']}.json"
+        with open(out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved to {out}")
+
+    if args.compare:
+        regressions = compare(results, args.compare)
+        if regressions:
+            print(f"\n✗ {len(regressions)} stage(s) more than {REGRESSION_RATIO:.2f}x slower")
+            sys.exit(1)
+        print("\n✓ No regressions")
+
+
+if __name__ == "__main__":
+    main()
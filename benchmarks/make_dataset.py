@@ -0,0 +1,228 @@
+"""
+Write synthetic YouTube metrics exports for benchmarking.
+
+Two layouts, matching what the generator reads:
+  csv  the comparison spreadsheet: four banner-delimited sections, comma
+       counts ("12,859"), percent strings, H:MM:SS durations and N/A retention
+  tsv  the extension's batch export (29 columns, with or without header row),
+       long-form rows marked "N/A - Long-form" in Stayed to Watch
+
+Values are drawn from skewed distributions so bar heights, CTRs and changes
+look like real channels; the same --seed always writes the same file.
+
+Usage:
+  python benchmarks/make_dataset.py --rows 100000 --output big.csv
+  python benchmarks/make_dataset.py --rows 1000000 --format tsv --output big.tsv
+"""
+
+import argparse
+import csv
+from datetime import date, timedelta
+
+import numpy as np
+
+SECTIONS = [
+    ('Long Form Videos - Equal Duration Comparison',
+     'Comparing equal time periods before vs. after treatment date '
+     '(e.g., 10 days before vs. 10 days after)',
+     'Long form', 'Equal'),
+    ('Long Form Videos - Lifetime Comparison',
+     'Metrics from video publish date to treatment vs. video publish date to extraction date',
+     'Long form', 'Lifetime'),
+    ('Shorts - Equal Duration Comparison',
+     'Comparing equal time periods before vs. after treatment date',
+     'Shorts', 'Equal'),
+    ('Shorts - Lifetime Comparison',
+     'Metrics from video publish date to treatment vs. video publish date to extraction date',
+     'Shorts', 'Lifetime'),
+]
+
+TSV_HEADER = (
+    ['URL', 'Video Title', 'Video ID', 'Publish Date', 'Treatment Date']
+    + ['Equal ' + name for name in (
+        'Pre Period', 'Post Period', 'Pre Impressions', 'Post Impressions', 'Pre CTR', 'Post CTR',
+        'Pre Views', 'Post Views', 'Pre AWT', 'Post AWT', 'Pre Retention', 'Post Retention',
+        'Pre Stayed to Watch', 'Post Stayed to Watch')]
+    + ['Lifetime ' + name for name in (
+        'Pre Period', 'Post Period', 'Pre Impressions', 'Post Impressions', 'Pre CTR', 'Post CTR',
+        'Pre Views', 'Post Views', 'Pre AWT', 'Post AWT')]
+)
+
+WORDS = ('Why', 'How', 'Meetings', 'Work', 'Leader', 'Interview', 'Corporate', 'Secret',
+         'Boss', 'Email', 'Career', 'Truth', 'Team', 'Never', 'Really', 'Quiz', 'Office')
+
+EXTRACTION_DATE = date(2025, 11, 4)
+GENERATE_BLOCK = 50000
+
+
+def _dmy(day, sep='.'):
+    return day.strftime(f'%d{sep}%m{sep}%Y')
+
+
+def _hms(seconds):
+    sign = '-' if seconds < 0 else ''
+    seconds = abs(int(seconds))
+    return f"{sign}{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _ms(seconds):
+    return f"{int(seconds) // 60}:{int(seconds) % 60:02d}"
+
+
+def _pct(value, decimals=2):
+    return f"{value:.{decimals}f}%"
+
+
+def _metrics(rng, n):
+    """Before/after metric arrays for n videos."""
+    m = {}
+    for period in ('before', 'after'):
+        impressions = np.maximum(rng.lognormal(6.5, 1.6, n), 1).astype(np.int64)
+        ctr = np.clip(rng.gamma(2.0, 2.0, n), 0, 40).round(1)
+        views = np.maximum((impressions * ctr / 100 * rng.uniform(0.8, 3.0, n)), 0).astype(np.int64)
+        m[period] = {
+            'impressions': impressions,
+            'ctr': ctr,
+            'views': views,
+            'awt': rng.integers(20, 420, n),
+            'retention': np.clip(rng.normal(35, 12, n), 1, 99).round(1),
+            'stayed': np.clip(rng.normal(65, 12, n), 1, 99).round(1),
+        }
+    return m
+
+
+def _titles(rng, start, n):
+    picks = rng.integers(0, len(WORDS), size=(n, 4))
+    # A few titles carry commas and quotes, which the CSV must escape; some
+    # start with a quote, which the (unescaped) batch TSV keeps as is
+    return [f"{WORDS[a]} {WORDS[b]}, {WORDS[c]} \"{WORDS[d]}\" #{start + i}" if i % 7 == 0
+            else f"\"{WORDS[a]} {WORDS[b]} {WORDS[c]} {WORDS[d]} #{start + i}" if i % 11 == 0
+            else f"{WORDS[a]} {WORDS[b]} {WORDS[c]} {WORDS[d]} #{start + i}"
+            for i, (a, b, c, d) in enumerate(picks)]
+
+
+def _sheet_rows(rng, start, n, period, na_rate):
+    m = _metrics(rng, n)
+    b, a = m['before'], m['after']
+    titles = _titles(rng, start, n)
+    publish_offsets = rng.integers(20, 400, n)
+    treatment = date(2025, 9, 15)
+    missing_before = rng.random(n) < na_rate
+    missing_after = missing_before | (rng.random(n) < na_rate)
+    for i in range(n):
+        ret_b = 'N/A' if missing_before[i] else _pct(b['retention'][i])
+        ret_a = 'N/A' if missing_after[i] else _pct(a['retention'][i])
+        ret_c = 'N/A' if missing_after[i] else _pct(a['retention'][i] - b['retention'][i])
+        yield ['', titles[i], _dmy(treatment - timedelta(days=int(publish_offsets[i]))),
+               _dmy(treatment), _dmy(EXTRACTION_DATE),
+               f"{b['impressions'][i]:,}", f"{a['impressions'][i]:,}",
+               f"{a['impressions'][i] - b['impressions'][i]:,.2f}",
+               f"{b['views'][i]:,}", f"{a['views'][i]:,}", f"{a['views'][i] - b['views'][i]:,}",
+               _pct(b['ctr'][i]), _pct(a['ctr'][i]), _pct(a['ctr'][i] - b['ctr'][i]),
+               _hms(b['awt'][i]), _hms(a['awt'][i]), _hms(a['awt'][i] - b['awt'][i]),
+               ret_b, ret_a, ret_c]
+
+
+def write_sheet_csv(path, rows, seed=0, na_rate=0.1):
+    """Write a comparison-spreadsheet CSV with `rows` videos spread over the four sections."""
+    rng = np.random.default_rng(seed)
+    width = 20
+    blank = [''] * width
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(blank)
+        start = 0
+        for s_index, (banner, description, kind, period) in enumerate(SECTIONS):
+            n = rows // len(SECTIONS) + (s_index < rows % len(SECTIONS))
+            writer.writerow(['', banner] + blank[2:])
+            writer.writerow(['', description] + blank[2:])
+            writer.writerow(['', kind, f'{period} Durations Metrics'] + blank[3:])
+            writer.writerow(['', 'Video Title', 'Publish Date', 'Treatment Date', 'Extraction Date']
+                            + [f'{period} {side} {metric}' if side else 'Change'
+                               for metric in ('Impressions', 'Views', 'CTR', 'AWT', 'Retention')
+                               for side in ('Before', 'After', None)])
+            for block in range(0, n, GENERATE_BLOCK):
+                size = min(GENERATE_BLOCK, n - block)
+                writer.writerows(_sheet_rows(rng, start, size, period, na_rate))
+                start += size
+            writer.writerow(blank)
+            writer.writerow(blank)
+
+
+def _tsv_rows(rng, start, n, shorts_rate, na_rate):
+    equal, lifetime = _metrics(rng, n), _metrics(rng, n)
+    titles = _titles(rng, start, n)
+    shorts = rng.random(n) < shorts_rate
+    missing = rng.random(n) < na_rate
+    publish_offsets = rng.integers(20, 400, n)
+    treatment = date(2025, 9, 15)
+    pre = f"{_dmy(treatment - timedelta(days=14))}-{_dmy(treatment - timedelta(days=1))}"
+    post = f"{_dmy(treatment)}-{_dmy(treatment + timedelta(days=13))}"
+    for i in range(n):
+        video_id = f"SYN{start + i:08d}"
+        publish = treatment - timedelta(days=int(publish_offsets[i]))
+        b, a = equal['before'], equal['after']
+        lb, la = lifetime['before'], lifetime['after']
+        if shorts[i]:
+            stayed = [_pct(b['stayed'][i], 1), _pct(a['stayed'][i], 1)]
+        else:
+            stayed = ['N/A - Long-form'] * 2
+        retention = (['N/A', 'N/A'] if missing[i]
+                     else [_pct(b['retention'][i], 1), _pct(a['retention'][i], 1)])
+        yield ([f"https://studio.youtube.com/video/{video_id}/analytics", titles[i], video_id,
+                _dmy(publish), _dmy(treatment, '/'), pre, post,
+                f"{b['impressions'][i]:,}", f"{a['impressions'][i]:,}",
+                _pct(b['ctr'][i], 1), _pct(a['ctr'][i], 1),
+                f"{b['views'][i]:,}", f"{a['views'][i]:,}",
+                _ms(b['awt'][i]), _ms(a['awt'][i])] + retention + stayed +
+               [f"{_dmy(publish)}-{_dmy(treatment)}", f"{_dmy(publish)}-{_dmy(EXTRACTION_DATE)}",
+                f"{lb['impressions'][i] * 4:,}", f"{la['impressions'][i] * 5:,}",
+                _pct(lb['ctr'][i], 1), _pct(la['ctr'][i], 1),
+                f"{lb['views'][i] * 4:,}", f"{la['views'][i] * 5:,}",
+                _ms(lb['awt'][i]), _ms(la['awt'][i])])
+
+
+def write_batch_tsv(path, rows, seed=0, header=True, shorts_rate=0.5, na_rate=0.1):
+    """Write an extension batch export (29-column TSV) with `rows` videos.
+
+    Cells are joined with tabs and nothing is quoted or escaped, as
+    content-batch.js writes them.
+    """
+    rng = np.random.default_rng(seed)
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        if header:
+            f.write('\t'.join(TSV_HEADER) + '\n')
+        for block in range(0, rows, GENERATE_BLOCK):
+            size = min(GENERATE_BLOCK, rows - block)
+            f.writelines('\t'.join(row) + '\n'
+                         for row in _tsv_rows(rng, block, size, shorts_rate, na_rate))
+
+
+def write_dataset(path, rows, fmt='csv', seed=0):
+    if fmt == 'csv':
+        write_sheet_csv(path, rows, seed)
+    else:
+        write_batch_tsv(path, rows, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic metrics export")
+    parser.add_argument("--rows", type=int, default=1000,
+                        help="Number of videos (default: 1000; the CSV splits them over 4 sections)")
+    parser.add_argument("--format", choices=["csv", "tsv"], default="csv",
+                        help="Comparison spreadsheet CSV or extension batch TSV (default: csv)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--no-header", action="store_true",
+                        help="TSV only: omit the header row, like a clipboard copy")
+    parser.add_argument("--output", "-o", required=True, help="File to write")
+    args = parser.parse_args()
+
+    if args.format == 'csv':
+        write_sheet_csv(args.output, args.rows, args.seed)
+    else:
+        write_batch_tsv(args.output, args.rows, args.seed, header=not args.no_header)
+    print(f"Wrote {args.rows:,} videos to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -509,6 +509,7 @@ YTTreatmentHelper.BatchMode = {
         // Need to navigate - save state and navigate
         state.currentIndex = i;
         state.results = this.batchResults;
+        state.navigationStartedAt = Date.now();
         await safeStorage.set({ batchInProgress: state });
 
         console.log(`Navigating to video ${video.videoId}...`);
@@ -523,12 +524,20 @@ YTTreatmentHelper.BatchMode = {
       console.log(`On correct video page: ${video.videoId}`);
       await new Promise(resolve => setTimeout(resolve, 100)); // Reduced from 300ms
 
+      // Time from leaving the previous page until this video is ready (null if no navigation)
+      const navigationMs = state.navigationStartedAt ? Date.now() - state.navigationStartedAt : null;
+      state.navigationStartedAt = null;
+
+      // Step timeline for this video, logged once when it finishes
+      const timing = { startedAt: Date.now(), steps: [] };
+
       // We're on the right page - extract metrics
       try {
         console.log(`📊 Starting extraction for video ${i + 1} of ${videos.length}: ${video.videoId}`);
 
         // Create progress callback that updates batch progress
         const progressCallback = (stepNum, totalSteps, stepDescription) => {
+          timing.steps.push([stepNum, stepDescription, Date.now() - timing.startedAt]);
           const overallStep = stepsCompletedBefore + stepNum;
           const progressPercent = Math.round((overallStep / totalBatchSteps) * 100);
 
@@ -548,6 +557,7 @@ YTTreatmentHelper.BatchMode = {
 
         // Result will always be returned (success, partial, or error)
         this.batchResults.push(result);
+        this.logVideoTiming(video, i, videos.length, extractionMode, result, timing, navigationMs);
 
         // Log and show status based on result
         if (result.status === 'success') {
@@ -584,6 +594,8 @@ YTTreatmentHelper.BatchMode = {
           dateRanges: null,
           errors: [`Unexpected error: ${error.message || error.toString()}`]
         });
+        this.logVideoTiming(video, i, videos.length, extractionMode,
+          this.batchResults[this.batchResults.length - 1], timing, navigationMs);
         this.updateStatus(`Error on video ${i + 1}: ${error.message}`, 'error');
 
         // Update state in storage
@@ -682,6 +694,27 @@ YTTreatmentHelper.BatchMode = {
     return stayedToWatch || '';
   },
 
+  /**
+   * Log one video's step timeline: a single entry per video keeps exported logs
+   * small (analyze_batch_logs.py rebuilds per-step durations from it)
+   * @param {Object} timing - { startedAt, steps: [[stepNum, description, msSinceStart], ...] }
+   */
+  logVideoTiming: function(video, index, total, extractionMode, result, timing, navigationMs) {
+    if (!window.ExtensionLogger) return;
+    window.ExtensionLogger.logInfo('Batch video timing', {
+      videoId: video.videoId,
+      index: index,
+      total: total,
+      mode: extractionMode,
+      status: result.status,
+      errors: result.errors,
+      navigationMs: navigationMs,
+      startedAt: new Date(timing.startedAt).toISOString(),
+      totalMs: Date.now() - timing.startedAt,
+      steps: timing.steps
+    });
+  },
+
   /**
    * Extract metrics for a single video
    * Returns result object with all metrics (or partial data with errors)
@@ -520,6 +520,9 @@ YTTreatmentHelper.API = {
     if (!customOption) {
       // Wait a bit and retry all strategies
       console.log('Custom option not found, waiting 1 second and retrying...');
+      if (window.ExtensionLogger) {
+        window.ExtensionLogger.logWarning('Retry: custom date option not found');
+      }
       await new Promise(resolve => setTimeout(resolve, 1000));
 
       // Retry all strategies
@@ -967,6 +970,13 @@ YTTreatmentHelper.API = {
 
         // Not a minimum date error - try alternate date format
         console.log('⚠️ First attempt failed with YouTube validation error, retrying with alternate date format...');
+        if (window.ExtensionLogger) {
+          window.ExtensionLogger.logWarning('Retry: date range rejected, trying alternate format', {
+            startDate: startDate,
+            endDate: endDate,
+            error: error.message
+          });
+        }
 
         // Try to intelligently pick the alternate format by looking at the error message
         let formatToTry = null;
@@ -3,16 +3,82 @@ Generate static visualization images from YouTube metrics comparison data.
 Creates PNG files that can be pasted into spreadsheets or presentations.
 """
 
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import numpy as np
+import argparse
+import codecs
+import contextlib
+import csv
+import glob
+import hashlib
+import html
+import importlib
+import importlib.util
+import io
+import itertools
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import OrderedDict, namedtuple
 from pathlib import Path
 
-# Set style for professional-looking charts
-sns.set_style("whitegrid")
-plt.rcParams['figure.facecolor'] = 'white'
-plt.rcParams['font.size'] = 10
+class _LazyModule:
+    """Stand-in for a heavy module, imported by `loader` on first attribute access.
+
+    Keeps --help, --list and up-to-date runs from paying for pandas and
+    matplotlib; everything else uses pd/np/plt/sns as if imported normally.
+    """
+
+    def __init__(self, loader):
+        self._loader = loader
+        self._module = None
+
+    def __getattr__(self, name):
+        if self._module is None:
+            self._module = self._loader()
+        return getattr(self._module, name)
+
+# seaborn's "whitegrid" axes style, so only the heatmap has to import seaborn
+WHITEGRID_STYLE = {
+    'figure.facecolor': 'white', 'axes.facecolor': 'white', 'axes.edgecolor': '.8',
+    'axes.grid': True, 'axes.axisbelow': True, 'axes.labelcolor': '.15',
+    'axes.spines.left': True, 'axes.spines.bottom': True,
+    'axes.spines.right': True, 'axes.spines.top': True,
+    'grid.color': '.8', 'grid.linestyle': '-', 'text.color': '.15',
+    'xtick.color': '.15', 'ytick.color': '.15',
+    'xtick.direction': 'out', 'ytick.direction': 'out',
+    'xtick.top': False, 'ytick.right': False, 'xtick.bottom': False, 'ytick.left': False,
+    'font.family': ['sans-serif'],
+    'font.sans-serif': ['Arial', 'DejaVu Sans', 'Liberation Sans', 'Bitstream Vera Sans', 'sans-serif'],
+    'lines.solid_capstyle': 'round', 'patch.edgecolor': 'w', 'patch.force_edgecolor': True,
+}
+
+def _import_pyplot():
+    import matplotlib
+    # Render straight to files; never probe for a GUI backend
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    # Set style for professional-looking charts
+    plt.rcParams.update(WHITEGRID_STYLE)
+    plt.rcParams['figure.facecolor'] = 'white'
+    plt.rcParams['font.size'] = 10
+    return plt
+
+def _import_seaborn():
+    plt.rcParams  # style and backend first
+    import seaborn
+    return seaborn
+
+pd = _LazyModule(lambda: importlib.import_module('pandas'))
+np = _LazyModule(lambda: importlib.import_module('numpy'))
+plt = _LazyModule(_import_pyplot)
+sns = _LazyModule(_import_seaborn)
 
 def load_data(csv_path):
     """Load and parse the CSV data."""
@@ -24,105 +90,717 @@ def load_data(csv_path):
 
     return df
 
-def parse_csv_sections(csv_path):
-    """Parse the CSV into separate dataframes for each section."""
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    sections = {
-        'longform_equal': [],
-        'longform_lifetime': [],
-        'shorts_equal': [],
-        'shorts_lifetime': []
-    }
-
+# Section banner text -> internal section key
+SECTION_BANNERS = (
+    ('Long Form Videos - Equal Duration', 'longform_equal'),
+    ('Long Form Videos - Lifetime', 'longform_lifetime'),
+    ('Shorts - Equal Duration', 'shorts_equal'),
+    ('Shorts - Lifetime', 'shorts_lifetime'),
+)
+
+# Count columns exported with thousands separators ("12,859")
+COUNT_COLUMNS = ['Equal Before Impressions', 'Equal After Impressions',
+                 'Equal Before Views', 'Equal After Views',
+                 'Lifetime Before Impressions', 'Lifetime After Impressions',
+                 'Lifetime Before Views', 'Lifetime After Views']
+
+# Cell values treated as missing (same as pandas' defaults we relied on)
+NA_VALUES = frozenset(['', 'N/A', 'NA', 'nan', 'NaN'])
+
+# Text columns that are (nearly) unique per row and not worth interning
+UNIQUE_TEXT_COLUMNS = frozenset(['Video Title', 'Video ID', 'URL'])
+
+# Data rows are buffered and transposed into columns in chunks of this size
+PARSE_CHUNK_ROWS = 4096
+
+def _match_banner(row):
+    """Return the section key if the row is a section banner, else None."""
+    # Banners are the only non-empty cell on their row; skip data rows cheaply
+    if row.count('') < len(row) - 1:
+        return None
+    for cell in row:
+        if cell:
+            for banner, section in SECTION_BANNERS:
+                if cell.startswith(banner):
+                    return section
+    return None
+
+def _column_names(header):
+    """Name header cells the way pandas.read_csv does (Unnamed: N, Change.1, ...)."""
+    names = []
+    seen = {}
+    for i, name in enumerate(header):
+        if not name:
+            name = f'Unnamed: {i}'
+        if name in seen:
+            seen[name] += 1
+            name = f'{name}.{seen[name]}'
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def _parse_counts(cells):
+    """Parse comma-formatted counts ("12,859") into floats, 0 when missing."""
+    cleaned = [cell.replace(',', '') for cell in cells]
+    try:
+        return np.array(cleaned, dtype=np.float64)
+    except ValueError:
+        # Blank or N/A cells in this chunk: fall back to coercing them to 0
+        values = pd.to_numeric(pd.Series(cleaned, dtype=object), errors='coerce')
+        return values.fillna(0).to_numpy(dtype=np.float64)
+
+class _SectionColumns:
+    """Typed column accumulators for one CSV section.
+
+    Rows are buffered in small chunks and transposed column-wise: count
+    columns are converted chunk by chunk into float arrays, text columns
+    into lists that share one object per distinct value. With `columns`
+    (a set of names) every other column is dropped as it is read, and
+    every text column is interned through the `interned` dicts, which the
+    caller shares between sections so a title in several sections is one
+    string.
+    """
+
+    def __init__(self, header, columns=None, interned=None):
+        self.names = _column_names(header)
+        self.width = len(self.names)
+        self.kept = [(index, name) for index, name in enumerate(self.names)
+                     if columns is None or name in columns]
+        self.names = [name for _, name in self.kept]
+        self.counts = {name: [] for name in self.names if name in COUNT_COLUMNS}
+        self.texts = {name: [] for name in self.names if name not in COUNT_COLUMNS}
+        if interned is None:
+            self.interned = {name: dict.fromkeys(NA_VALUES) for name in self.texts
+                             if name not in UNIQUE_TEXT_COLUMNS}
+        else:
+            self.interned = {name: interned.setdefault(name, dict.fromkeys(NA_VALUES))
+                             for name in self.texts}
+        self.pending = []
+
+    def append(self, row):
+        if len(row) != self.width:
+            row = (row + [''] * self.width)[:self.width]
+        self.pending.append(row)
+        if len(self.pending) >= PARSE_CHUNK_ROWS:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        transposed = list(zip(*self.pending))
+        for index, name in self.kept:
+            cells = transposed[index]
+            if name in self.counts:
+                self.counts[name].append(_parse_counts(cells))
+            elif name in self.interned:
+                cache = self.interned[name]
+                self.texts[name].extend(map(cache.setdefault, cells, cells))
+            else:
+                self.texts[name].extend(None if cell in NA_VALUES else cell for cell in cells)
+        self.pending.clear()
+
+    def to_frame(self):
+        self.flush()
+        data = {}
+        for name in self.names:
+            if name in self.counts:
+                chunks = self.counts[name]
+                values = np.concatenate(chunks) if chunks else np.empty(0)
+                if not np.any(np.mod(values, 1)):
+                    values = values.astype(np.int64)
+                data[name] = values
+            else:
+                data[name] = self.texts[name]
+        return pd.DataFrame(data)
+
+def _parse_sheet_rows(rows, columns=None):
+    """Split spreadsheet rows into typed section columns (see parse_csv_sections)."""
+    sections = {}
     current_section = None
-    header_row = None
-
-    for i, line in enumerate(lines):
-        if 'Long Form Videos - Equal Duration' in line:
-            current_section = 'longform_equal'
-            header_row = None
-        elif 'Long Form Videos - Lifetime' in line:
-            current_section = 'longform_lifetime'
-            header_row = None
-        elif 'Shorts - Equal Duration' in line:
-            current_section = 'shorts_equal'
-            header_row = None
-        elif 'Shorts - Lifetime' in line:
-            current_section = 'shorts_lifetime'
-            header_row = None
-        elif current_section and 'Video Title' in line:
-            header_row = line
-            sections[current_section].append(line)
-        elif current_section and header_row and line.strip() and not line.startswith(',,,'):
-            sections[current_section].append(line)
-
-    # Convert to dataframes
-    dfs = {}
-    for section, data in sections.items():
-        if data:
-            from io import StringIO
-            df = pd.read_csv(StringIO(''.join(data)))
+    current = None
+    interned = None if columns is None else {}
 
-            # Clean numeric columns - remove commas and convert to numeric
-            numeric_cols = ['Equal Before Impressions', 'Equal After Impressions',
-                          'Equal Before Views', 'Equal After Views',
-                          'Lifetime Before Impressions', 'Lifetime After Impressions',
-                          'Lifetime Before Views', 'Lifetime After Views']
+    for row in rows:
+        section = _match_banner(row)
+        if section:
+            current_section = section
+            current = None
+            continue
 
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = df[col].astype(str).str.replace(',', '').replace('nan', '0')
-                    df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        if current_section is None:
+            continue
 
-            dfs[section] = df
+        if current is None:
+            if 'Video Title' in row:
+                current = sections[current_section] = _SectionColumns(row, columns, interned)
+            continue
 
-    return dfs
-
-def create_summary_stats(dfs):
-    """Create a summary statistics visualization."""
-    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
-    fig.suptitle('YouTube Treatment Analysis - Summary Statistics', fontsize=16, fontweight='bold')
-
-    # Long Form Equal Duration Summary
-    df = dfs['longform_equal']
-    ax = axes[0, 0]
-
-    metrics = {
-        'CTR Improved': (df['Equal After CTR'].str.rstrip('%').astype(float) >
-                         df['Equal Before CTR'].str.rstrip('%').astype(float)).sum(),
-        'Views Improved': (df['Equal After Views'] > df['Equal Before Views']).sum(),
-        'Retention Improved': (df['Equal After Retention'].str.rstrip('%').astype(float) >
-                              df['Equal Before Retention'].str.rstrip('%').astype(float)).sum()
-    }
+        if any(row):
+            current.append(row)
 
-    total_videos = len(df)
-    colors = ['#10b981' if v > total_videos/2 else '#ef4444' for v in metrics.values()]
-
-    bars = ax.bar(metrics.keys(), metrics.values(), color=colors, alpha=0.7)
-    ax.axhline(y=total_videos/2, color='gray', linestyle='--', label='50% threshold')
-    ax.set_ylim(0, total_videos)
-    ax.set_ylabel('Number of Videos')
-    ax.set_title('Long Form - Equal Duration\nVideos Showing Improvement', fontweight='bold')
-    ax.legend()
-
-    # Add value labels on bars
-    for bar in bars:
-        height = bar.get_height()
-        ax.text(bar.get_x() + bar.get_width()/2., height,
-                f'{int(height)}/{total_videos}',
-                ha='center', va='bottom', fontweight='bold')
+    # Convert to dataframes
+    return {section: columns.to_frame() for section, columns in sections.items()}
 
-    # Shorts Equal Duration Summary
-    df = dfs['shorts_equal']
-    ax = axes[0, 1]
+def parse_csv_sections(csv_path):
+    """Parse the CSV into separate dataframes for each section.
+
+    Streams the file once: banner rows switch the current section, the
+    'Video Title' row fixes its columns, and data rows after it are
+    converted straight into typed columns without re-reading any text.
+    """
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        return _parse_sheet_rows(csv.reader(f))
+
+# Batch export headers, as written by content-batch.js formatResultsAsTSV().
+# The clipboard copy omits the header row, so the layout is told apart by width.
+TSV_METADATA_COLUMNS = ['URL', 'Video Title', 'Video ID', 'Publish Date', 'Treatment Date']
+TSV_EQUAL_COLUMNS = ['Pre Period', 'Post Period', 'Pre Impressions', 'Post Impressions',
+                     'Pre CTR', 'Post CTR', 'Pre Views', 'Post Views', 'Pre AWT', 'Post AWT',
+                     'Pre Retention', 'Post Retention',
+                     'Pre Stayed to Watch', 'Post Stayed to Watch']
+TSV_LIFETIME_COLUMNS = TSV_EQUAL_COLUMNS[:10]
+TSV_LAYOUTS = {
+    # column count -> (period for unprefixed metric columns, header)
+    29: (None, TSV_METADATA_COLUMNS + ['Equal ' + name for name in TSV_EQUAL_COLUMNS]
+         + ['Lifetime ' + name for name in TSV_LIFETIME_COLUMNS]),
+    19: ('Equal', TSV_METADATA_COLUMNS + TSV_EQUAL_COLUMNS),
+    15: ('Lifetime', TSV_METADATA_COLUMNS + TSV_LIFETIME_COLUMNS),
+}
+
+# Marker the extension writes into Stayed to Watch for long-form videos
+LONGFORM_MARKER = 'N/A - Long-form'
+
+def _tsv_column(header, default_period):
+    """Map an export header onto the sheet's naming.
+
+    Returns (period, name): 'Equal Pre CTR' -> ('Equal', 'Equal Before CTR'),
+    'Pre Views' in an equal-periods export -> ('Equal', 'Equal Before Views'),
+    metadata columns -> (None, header).
+    """
+    words = header.split()
+    period = default_period
+    if words and words[0] in ('Equal', 'Lifetime'):
+        period, words = words[0], words[1:]
+    if not words or words[0].upper() not in ('PRE', 'POST'):
+        return None, header
+    side = 'Before' if words[0].upper() == 'PRE' else 'After'
+    metric = ' '.join(words[1:])
+    if metric.lower() == 'stayed to watch':
+        metric = 'Stayed to watch'
+    return period, f'{period} {side} {metric}'
+
+def _tsv_content_type(cells, default):
+    """Decide whether an export row is a long-form video or a Short."""
+    url, stayed = cells
+    if stayed.startswith(LONGFORM_MARKER):
+        return 'longform'
+    if '/shorts/' in url:
+        return 'shorts'
+    if stayed and stayed != 'ERROR':
+        return 'shorts'
+    return default
+
+def _parse_tsv_rows(rows, content_type='auto', columns=None):
+    """Route batch export rows into the same sections the spreadsheet uses.
+
+    Complete Analysis rows feed both the equal and lifetime sections. Rows
+    go to long form or Shorts by the extension's long-form marker or the
+    URL; content_type forces one or sets the fallback ('auto' = longform).
+    Rows whose extraction failed outright (title 'ERROR: ...') are skipped.
+    """
+    rows = iter(rows)
+    for first in rows:
+        if any(first):
+            break
+    else:
+        return {}
+
+    if first[0] == 'URL':
+        header = first
+    else:
+        header = TSV_LAYOUTS.get(len(first), (None, None))[1]
+        if header is None:
+            raise ValueError(f"Unrecognized batch export layout ({len(first)} columns)")
+        rows = itertools.chain([first], rows)
+    default_period = TSV_LAYOUTS.get(len(header), ('Equal', None))[0]
+
+    # Column indices feeding each period's section
+    meta = []
+    periods = {}
+    stayed_index = None
+    for index, name in enumerate(header):
+        period, mapped = _tsv_column(name, default_period)
+        if period is None:
+            meta.append((index, mapped))
+        else:
+            periods.setdefault(period, []).append((index, mapped))
+            if stayed_index is None and mapped.endswith('Stayed to watch'):
+                stayed_index = index
+
+    # Only the wanted columns are copied out of each row
+    periods = {period: [(i, n) for i, n in meta + pairs if columns is None or n in columns]
+               for period, pairs in periods.items()}
+    layouts = {period: ([i for i, _ in pairs], [n for _, n in pairs])
+               for period, pairs in periods.items()}
+    url_index = header.index('URL') if 'URL' in header else None
+    title_index = header.index('Video Title')
+    fallback = 'longform' if content_type == 'auto' else content_type
+
+    sections = {}
+    for row in rows:
+        if not any(row):
+            continue
+        if len(row) < len(header):
+            row = row + [''] * (len(header) - len(row))
+        if row[title_index].startswith('ERROR'):
+            continue
+
+        if content_type == 'auto':
+            kind = _tsv_content_type((row[url_index] if url_index is not None else '',
+                                      row[stayed_index] if stayed_index is not None else ''),
+                                     fallback)
+        else:
+            kind = content_type
+
+        for period, (indices, names) in layouts.items():
+            section = f'{kind}_{period.lower()}'
+            table = sections.get(section)
+            if table is None:
+                table = sections[section] = _SectionColumns(names)
+            table.append([row[i] for i in indices])
+
+    return {section: columns.to_frame() for section, columns in sections.items()}
+
+def parse_tsv_export(tsv_path, content_type='auto'):
+    """Parse a batch-mode TSV export (Complete Analysis, Equal Periods or Lifetime)."""
+    with open(tsv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        return _parse_tsv_rows(csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE), content_type)
+
+def load_sections(path, content_type='auto', columns=None):
+    """Parse a comparison sheet CSV or a batch TSV export; '-' reads stdin.
+
+    `path` may also be a binary file object. The format is sniffed from the
+    first line: the extension's "Download" button writes tab-separated text
+    even under a .csv name. With `columns` only those columns are kept (see
+    compact_columns).
+    """
+    if str(path) == '-':
+        f = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8-sig', newline='')
+    elif hasattr(path, 'read'):
+        f = io.TextIOWrapper(path, encoding='utf-8-sig', newline='')
+    else:
+        f = open(path, 'r', encoding='utf-8-sig', newline='')
+    with f:
+        first = f.readline()
+        lines = itertools.chain([first], f)
+        if '\t' in first:
+            # The extension joins cells with tabs and escapes nothing: a title
+            # starting with '"' is a literal quote, not a quoted field
+            return _parse_tsv_rows(csv.reader(lines, delimiter='\t', quoting=csv.QUOTE_NONE),
+                                   content_type, columns)
+        return _parse_sheet_rows(csv.reader(lines), columns)
+
+# Metric name suffixes exported as percent strings ("7.70%")
+PERCENT_METRICS = ('CTR', 'Retention', 'Stayed to watch')
+
+# Date format used by the sheet ("15.09.2025")
+DATE_FORMAT = '%d.%m.%Y'
+
+def _column_kind(name, previous_kind):
+    """Classify a section column by its header so it can be typed once."""
+    if name.startswith('Unnamed:'):
+        return 'drop'
+    if name in ('Video Title', 'URL', 'Video ID'):
+        return 'text'
+    if name.startswith('Change'):
+        # Change columns follow the metric they compare
+        return 'duration' if previous_kind == 'duration' else 'number'
+    if name.endswith('Date'):
+        return 'date'
+    if name.endswith('Period'):
+        return 'text'
+    if name.endswith('AWT'):
+        return 'duration'
+    if name.endswith(PERCENT_METRICS):
+        return 'percent'
+    if name.endswith(('Impressions', 'Views')):
+        return 'count'
+    return 'number'
+
+def _per_unique(values, convert):
+    """Run a text converter once per distinct value and broadcast the result.
+
+    Exported metrics repeat heavily ("2.50%", "0:00:24", dates), so most of
+    the string work turns into a hash lookup.
+    """
+    codes, uniques = pd.factorize(values)
+    # A trailing None catches the -1 codes factorize gives missing cells
+    converted = convert(pd.Series(list(uniques) + [None], dtype=object)).to_numpy()
+    return pd.Series(converted.take(codes), index=values.index, name=values.name)
+
+def _to_number(values):
+    """Strip '%' and thousands separators and convert to float, NaN when missing."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    return _per_unique(values, lambda v: pd.to_numeric(v.str.replace(r'[,%]', '', regex=True),
+                                                       errors='coerce').astype(float))
+
+def _to_count(values):
+    """Convert counts to int64, treating missing counts as 0."""
+    if not pd.api.types.is_numeric_dtype(values):
+        values = _to_number(values)
+    return values.fillna(0).round().astype(np.int64)
+
+def _to_duration(values):
+    """Convert H:MM:SS or M:SS durations (optionally negative) to seconds."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+
+    def convert(unique):
+        # Studio shows short durations as M:SS; to_timedelta needs the hours
+        unique = unique.where(unique.str.count(':') != 1,
+                              unique.str.replace(r'^(-?)', r'\g<1>0:', regex=True))
+        return pd.to_timedelta(unique, errors='coerce').dt.total_seconds()
+    return _per_unique(values, convert)
+
+def _to_date(values):
+    """Parse DD.MM.YYYY (or DD/MM/YYYY) dates, NaT when missing."""
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    return _per_unique(values, lambda v: pd.to_datetime(v.str.replace('/', '.', regex=False),
+                                                        format=DATE_FORMAT, errors='coerce'))
+
+_CONVERTERS = {
+    'count': _to_count,
+    'percent': _to_number,
+    'number': _to_number,
+    'duration': _to_duration,
+    'date': _to_date,
+}
+
+def normalize_section(df):
+    """Return a typed copy of one parsed section.
+
+    Percents become floats (7.7 for "7.70%"), counts int64, AWT durations
+    seconds, dates datetime64, and N/A cells NaN. Already-typed columns are
+    left alone, so normalizing twice is a no-op.
+    """
+    data = {}
+    kind = None
+    for name in df.columns:
+        kind = _column_kind(name, kind)
+        if kind == 'drop':
+            continue
+        convert = _CONVERTERS.get(kind)
+        data[name] = convert(df[name]) if convert else df[name]
+    return pd.DataFrame(data, index=df.index)
+
+def normalize_sections(dfs):
+    """Normalize every parsed section once; charts only read the typed tables."""
+    return {section: normalize_section(df) for section, df in dfs.items()}
+
+def compact_columns(indices, html=False):
+    """Names of the columns the given figures (or the HTML report) read.
+
+    section_summary() reads the CTR, view and impression changes of every
+    section, so those are always included.
+    """
+    metrics = {'CTR', 'Views', 'Impressions'}
+    for index in indices:
+        metrics.update(FIGURES[index].columns)
+    if html:
+        metrics.update(REPORT_METRICS)
+        metrics.add('Video Title')
+    columns = {'Video Title'} & metrics
+    for metric in metrics - columns:
+        columns.update(f'{period} {side} {metric}'
+                       for period in ('Equal', 'Lifetime') for side in ('Before', 'After'))
+    return columns
+
+def compact_section(df):
+    """Shrink a normalized section's dtypes for very large exports.
+
+    Counts become int32 where they fit and other numbers float32. Text
+    columns whose values repeat become categorical; mostly-unique ones
+    (titles) stay strings, already interned by the parser, since codes plus
+    categories would take more room than one pointer per row.
+    """
+    data = {}
+    for name in df.columns:
+        values = df[name]
+        if pd.api.types.is_integer_dtype(values):
+            info = np.iinfo(np.int32)
+            if not len(values) or (values.min() >= info.min and values.max() <= info.max):
+                values = values.astype(np.int32)
+        elif pd.api.types.is_float_dtype(values):
+            values = values.astype(np.float32)
+        elif values.dtype == object or pd.api.types.is_string_dtype(values):
+            if values.nunique() <= len(values) // 2:
+                values = values.astype('category')
+        data[name] = values
+    return pd.DataFrame(data, index=df.index)
+
+def table_megabytes(dfs):
+    """Memory held by a dict of tables; a string shared by several cells counts once."""
+    total = 0
+    strings = {}
+    for df in dfs.values():
+        total += int(df.memory_usage(index=False).sum())
+        for name in df.columns:
+            values = df[name]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.cat.categories
+            if values.dtype == object or pd.api.types.is_string_dtype(values):
+                strings.update((id(value), value) for value in values if isinstance(value, str))
+    return (total + sum(map(sys.getsizeof, strings.values()))) / 1e6
+
+def empty_section(section):
+    """An empty typed table for a section the input did not contain."""
+    period = 'Equal' if section.endswith('_equal') else 'Lifetime'
+    names = ['Video Title'] + [f'{period} {side} {metric}'
+                               for metric in ('Impressions', 'Views', 'CTR', 'AWT', 'Retention')
+                               for side in ('Before', 'After')]
+    return normalize_section(pd.DataFrame({name: pd.Series(dtype=object) for name in names}))
+
+class StageProfiler:
+    """Nested wall/CPU timings, peak RSS and extra counters for --profile.
+
+    Stages are identified by their path from the root ("run;figure:heatmap;savefig"),
+    the same shape as flamegraph collapsed stacks.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._stack = []
+        self._origin = time.perf_counter()
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self._stack.append(name)
+        record = {'stage': ';'.join(self._stack)}
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            end = time.perf_counter()
+            record.update(start_s=round(wall - self._origin, 6), wall_s=round(end - wall, 6),
+                          cpu_s=round(time.process_time() - cpu, 6), peak_rss_mb=_peak_rss_mb())
+            self._stack.pop()
+            self.records.append(record)
+
+    def folded(self):
+        """Self wall time per stage path in microseconds, as collapsed-stack lines."""
+        totals = {}
+        for record in self.records:
+            totals[record['stage']] = totals.get(record['stage'], 0) + record['wall_s']
+            parent = record['stage'].rpartition(';')[0]
+            if parent:
+                totals[parent] = totals.get(parent, 0) - record['wall_s']
+        return [f"{path} {max(0, round(seconds * 1e6))}" for path, seconds in totals.items()]
+
+    def write(self, path):
+        """Write the JSON report to path and the collapsed stacks next to it (.folded)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        report = {'pid': os.getpid(), 'argv': sys.argv,
+                  'stages': sorted(self.records, key=lambda record: record['start_s'])}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        with open(path.with_suffix('.folded'), 'w', encoding='utf-8') as f:
+            f.write('\n'.join(self.folded()) + '\n')
+        return path
+
+def _peak_rss_mb():
+    """The process's peak resident set size so far, or None where unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1 << 20 if sys.platform == 'darwin' else 1 << 10), 1)
+
+PROFILE_NAME = "profile.json"
+# Set by --profile; while None every stage is a shared no-op context
+_profiler = None
+_NO_STAGE = contextlib.nullcontext()
+
+def profile_stage(name):
+    """Time a block under --profile; yields the stage's record dict, or None when off."""
+    return _NO_STAGE if _profiler is None else _profiler.stage(name)
+
+# Above this many videos, per-video bars and markers give way to histograms and
+# hexbins, so rendering cost and legibility no longer depend on the video count
+AGGREGATE_ROWS = 150
+HISTOGRAM_BINS = 40
+
+def _draw_no_data(ax):
+    """Mark a panel whose section has no rows in this input."""
+    ax.text(0.5, 0.5, 'No data', transform=ax.transAxes, ha='center', va='center',
+            fontsize=14, color='gray')
+    ax.set_xticks([])
+    ax.set_yticks([])
+
+# Bootstrap confidence intervals for the mean before -> after change
+BOOTSTRAP_REPLICATES = 2000
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_SEED = 0  # fixed, so re-rendering the same data gives the same figure
+# Resampled values held in memory at once (replicates x videos)
+BOOTSTRAP_BLOCK_CELLS = 1 << 18
+
+def bootstrap_mean_ci(values, replicates=BOOTSTRAP_REPLICATES,
+                      confidence=BOOTSTRAP_CONFIDENCE, seed=BOOTSTRAP_SEED):
+    """Mean of `values` (NaNs dropped) and its percentile bootstrap interval.
+
+    Replicates are drawn as one (replicates x n) index matrix and averaged
+    along rows, in blocks of at most BOOTSTRAP_BLOCK_CELLS resampled values.
+    Returns (mean, low, high); all NaN when there are no values.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if n == 0:
+        return (np.nan, np.nan, np.nan)
+
+    rng = np.random.default_rng(seed)
+    index_dtype = np.int32 if n < 2**31 else np.int64
+    block = max(1, BOOTSTRAP_BLOCK_CELLS // n)
+    means = np.empty(replicates)
+    for start in range(0, replicates, block):
+        stop = min(start + block, replicates)
+        picks = rng.integers(0, n, size=(stop - start, n), dtype=index_dtype)
+        means[start:stop] = values[picks].mean(axis=1)
+
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.percentile(means, [tail, 100 - tail])
+    return (values.mean(), low, high)
+
+def section_change_cis(df, period='Equal'):
+    """Bootstrap CIs of the mean CTR (pp), views and impressions change for a section."""
+    return {metric: bootstrap_mean_ci(df[f'{period} After {metric}'] - df[f'{period} Before {metric}'])
+            for metric in ('CTR', 'Views', 'Impressions')}
+
+def _annotate_change_cis(ax, cis):
+    """Error bar on the average CTR change bar, plus views/impressions CIs as text."""
+    avg_change, low, high = cis['CTR']
+    if np.isnan(avg_change):
+        return
+    ax.errorbar([0], [avg_change], yerr=[[avg_change - low], [high - avg_change]],
+                fmt='none', ecolor='black', elinewidth=1.5, capsize=8)
+    level = f'{BOOTSTRAP_CONFIDENCE:.0%} CI'
+    lines = [f'CTR: {low:+.2f} to {high:+.2f} pp']
+    for metric in ('Views', 'Impressions'):
+        mean, low, high = cis[metric]
+        lines.append(f'{metric}: {mean:+,.0f} per video ({low:+,.0f} to {high:+,.0f})')
+    # Make room beside the bar for the intervals
+    ax.set_xlim(-0.6, 1.6)
+    ax.text(0.98, 0.5, f'{level} (bootstrap)\n' + '\n'.join(lines),
+            transform=ax.transAxes, fontsize=8.5, ha='right', va='center', multialignment='left',
+            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
 
-    metrics = {
-        'CTR Improved': (df['Equal After CTR'].str.rstrip('%').astype(float) >
-                         df['Equal Before CTR'].str.rstrip('%').astype(float)).sum(),
-        'Views Improved': (df['Equal After Views'] > df['Equal Before Views']).sum()
-    }
+# Rows shown by the ranking charts as (bottom, top) counts; --top-k sets both
+RANKING_K = {
+    'top-performers': (5, 5),
+    'lifetime': (10, 10),
+    'heatmap': (7, 8),
+}
+
+def ranking_k(name, top_k=None):
+    """(bottom, top) row counts for a ranking figure, overridden by --top-k."""
+    return (top_k, top_k) if top_k else RANKING_K[name]
+
+class RankingIndex:
+    """Top/bottom-K lookups over every Before -> After change in a section.
+
+    The change of each metric with numeric Before/After columns is computed
+    once. Lookups select with np.argpartition and only sort the K rows they
+    return, so each is linear in the section size. Rows with no change
+    (missing Before or After) are never ranked.
+    """
+
+    def __init__(self, df, period='Equal'):
+        self.period = period
+        self.changes = {}
+        prefix = f'{period} Before '
+        for name in df.columns:
+            if not name.startswith(prefix):
+                continue
+            metric = name[len(prefix):]
+            before, after = df[name], df.get(f'{period} After {metric}')
+            if (after is not None and pd.api.types.is_numeric_dtype(before)
+                    and pd.api.types.is_numeric_dtype(after)):
+                change = after.to_numpy(dtype=float) - before.to_numpy(dtype=float)
+                valid = np.flatnonzero(~np.isnan(change))
+                self.changes[metric] = (change, valid)
+
+    def change(self, metric):
+        """Per-row After - Before values of a metric, NaN where either is missing."""
+        return self.changes[metric][0]
+
+    def _select(self, metric, k, largest):
+        change, valid = self.changes[metric]
+        if k <= 0:
+            return valid[:0]
+        if k < len(valid):
+            values = change[valid]
+            split = len(valid) - k if largest else k - 1
+            part = np.argpartition(values, split)
+            valid = valid[part[split:] if largest else part[:k]]
+        return valid[np.argsort(change[valid], kind='stable')]
+
+    def bottom(self, metric, k):
+        """Positions of the k rows with the smallest change, ascending."""
+        return self._select(metric, k, largest=False)
+
+    def top(self, metric, k):
+        """Positions of the k rows with the largest change, ascending."""
+        return self._select(metric, k, largest=True)
+
+    def extremes(self, metric, bottom_k, top_k):
+        """Bottom then top positions, ascending; every ranked row when they overlap."""
+        if bottom_k + top_k >= len(self.changes[metric][1]):
+            return self.bottom(metric, bottom_k + top_k)
+        return np.concatenate([self.bottom(metric, bottom_k), self.top(metric, top_k)])
+
+# Ranking indexes of the section tables still alive, by table identity
+_rankings = {}
+
+def section_ranking(df, period='Equal'):
+    """The RankingIndex of a section table, built on first use by any figure."""
+    key = (id(df), period)
+    entry = _rankings.get(key)
+    if entry is None or entry[0]() is not df:
+        entry = _rankings[key] = (weakref.ref(df, lambda _, key=key: _rankings.pop(key, None)),
+                                  RankingIndex(df, period))
+    return entry[1]
+
+# Metrics counted in the summary chart's "Videos Showing Improvement" panels
+SUMMARY_METRICS = {
+    'longform_equal': ('CTR', 'Views', 'Retention'),
+    'shorts_equal': ('CTR', 'Views'),
+}
+
+def improvement_counts(df, metrics, period='Equal'):
+    """Number of videos whose After value beats Before, per metric."""
+    return {f'{metric} Improved': int((df[f'{period} After {metric}'] >
+                                       df[f'{period} Before {metric}']).sum())
+            for metric in metrics}
+
+def _section_period(section):
+    return 'Lifetime' if section.endswith('_lifetime') else 'Equal'
+
+# A figure is a ChartSpec: its title, subplot grid and one Panel per axes, in
+# row order. Each panel draws one chart type (a key of PANEL_CHARTS) from one
+# section's metric; `ranked` panels show only the figure's top/bottom videos
+# by that metric's change, and `title` may name them with '{shown}'.
+ChartSpec = namedtuple('ChartSpec', ['title', 'shape', 'figsize', 'panels'])
+Panel = namedtuple('Panel', ['chart', 'section', 'metric', 'title', 'label', 'ranked', 'style'],
+                   defaults=(None, False, {}))
+
+def _improved_panel(ax, df, panel, rows):
+    """Videos whose After beats Before for each metric in panel.metric."""
+    metrics = improvement_counts(df, panel.metric, _section_period(panel.section))
 
     total_videos = len(df)
     colors = ['#10b981' if v > total_videos/2 else '#ef4444' for v in metrics.values()]
@@ -130,391 +808,141 @@ def create_summary_stats(dfs):
     bars = ax.bar(metrics.keys(), metrics.values(), color=colors, alpha=0.7)
     ax.axhline(y=total_videos/2, color='gray', linestyle='--', label='50% threshold')
     ax.set_ylim(0, total_videos)
-    ax.set_ylabel('Number of Videos')
-    ax.set_title('Shorts - Equal Duration\nVideos Showing Improvement', fontweight='bold')
+    ax.set_ylabel(panel.label)
     ax.legend()
 
+    # Add value labels on bars
     for bar in bars:
         height = bar.get_height()
         ax.text(bar.get_x() + bar.get_width()/2., height,
                 f'{int(height)}/{total_videos}',
                 ha='center', va='bottom', fontweight='bold')
 
-    # Average CTR Change - Long Form
-    df = dfs['longform_equal']
-    ax = axes[1, 0]
-
-    df['CTR_Change'] = (df['Equal After CTR'].str.rstrip('%').astype(float) -
-                        df['Equal Before CTR'].str.rstrip('%').astype(float))
-
-    avg_change = df['CTR_Change'].mean()
+def _mean_change_panel(ax, df, panel, rows):
+    """Average change of panel.metric with its bootstrap CI (and the other changes' CIs)."""
+    cis = section_change_cis(df, _section_period(panel.section))
+    avg_change = cis[panel.metric][0]
     color = '#10b981' if avg_change > 0 else '#ef4444'
 
-    ax.bar(['Average CTR Change'], [avg_change], color=color, alpha=0.7, width=0.4)
+    ax.bar([f'Average {panel.metric} Change'], [avg_change], color=color, alpha=0.7, width=0.4)
     ax.axhline(y=0, color='black', linewidth=0.8)
-    ax.set_ylabel('Percentage Points')
-    ax.set_title('Long Form - Average CTR Change\n(Equal Duration)', fontweight='bold')
+    ax.set_ylabel(panel.label)
     ax.text(0, avg_change, f'{avg_change:.2f}%', ha='center',
             va='bottom' if avg_change > 0 else 'top', fontweight='bold', fontsize=14)
+    _annotate_change_cis(ax, cis)
 
-    # Average CTR Change - Shorts
-    df = dfs['shorts_equal']
-    ax = axes[1, 1]
+def _change_barh_panel(ax, df, panel, rows):
+    """A horizontal change bar per video (or per ranked video), labelled by title.
 
-    df['CTR_Change'] = (df['Equal After CTR'].str.rstrip('%').astype(float) -
-                        df['Equal Before CTR'].str.rstrip('%').astype(float))
+    Style keys: title_length and fontsize of the tick labels, and
+    value_labels to print each change beside its bar.
+    """
+    change = section_ranking(df, _section_period(panel.section)).change(panel.metric)
+    titles = df['Video Title'].to_numpy()
+    if rows is not None:
+        change, titles = change[rows], titles[rows]
+    length = panel.style.get('title_length', 25)
 
-    avg_change = df['CTR_Change'].mean()
-    color = '#10b981' if avg_change > 0 else '#ef4444'
-
-    ax.bar(['Average CTR Change'], [avg_change], color=color, alpha=0.7, width=0.4)
-    ax.axhline(y=0, color='black', linewidth=0.8)
-    ax.set_ylabel('Percentage Points')
-    ax.set_title('Shorts - Average CTR Change\n(Equal Duration)', fontweight='bold')
-    ax.text(0, avg_change, f'{avg_change:.2f}%', ha='center',
-            va='bottom' if avg_change > 0 else 'top', fontweight='bold', fontsize=14)
-
-    plt.tight_layout()
-    return fig
+    colors = ['#10b981' if x > 0 else '#ef4444' for x in change]
+    y_pos = np.arange(len(change))
 
-def create_top_performers(dfs):
-    """Create a chart showing top and bottom performers by CTR change."""
-    fig, axes = plt.subplots(1, 2, figsize=(16, 8))
-    fig.suptitle('Top & Bottom Performers by CTR Change (Equal Duration)',
-                 fontsize=16, fontweight='bold')
-
-    # Long Form
-    df = dfs['longform_equal'].copy()
-    df['CTR_Change'] = (df['Equal After CTR'].str.rstrip('%').astype(float) -
-                        df['Equal Before CTR'].str.rstrip('%').astype(float))
-    df = df.sort_values('CTR_Change')
-
-    # Get top 5 and bottom 5
-    bottom_5 = df.head(5)
-    top_5 = df.tail(5)
-    combined = pd.concat([bottom_5, top_5])
-
-    ax = axes[0]
-    colors = ['#ef4444' if x < 0 else '#10b981' for x in combined['CTR_Change']]
-
-    y_pos = np.arange(len(combined))
-    ax.barh(y_pos, combined['CTR_Change'], color=colors, alpha=0.7)
+    ax.barh(y_pos, change, color=colors, alpha=0.7)
     ax.set_yticks(y_pos)
-    ax.set_yticklabels([title[:40] + '...' if len(title) > 40 else title
-                        for title in combined['Video Title']], fontsize=9)
-    ax.set_xlabel('CTR Change (Percentage Points)')
-    ax.set_title('Long Form Videos', fontweight='bold')
+    ax.set_yticklabels([title[:length] + '...' if len(title) > length else title
+                        for title in titles], fontsize=panel.style.get('fontsize', 8))
+    ax.set_xlabel(panel.label)
     ax.axvline(x=0, color='black', linewidth=0.8)
 
-    # Add value labels
-    for i, v in enumerate(combined['CTR_Change']):
-        ax.text(v, i, f' {v:.1f}%', va='center',
-                ha='left' if v > 0 else 'right', fontweight='bold')
-
-    # Shorts
-    df = dfs['shorts_equal'].copy()
-    df['CTR_Change'] = (df['Equal After CTR'].str.rstrip('%').astype(float) -
-                        df['Equal Before CTR'].str.rstrip('%').astype(float))
-    df = df.sort_values('CTR_Change')
-
-    bottom_5 = df.head(5)
-    top_5 = df.tail(5)
-    combined = pd.concat([bottom_5, top_5])
-
-    ax = axes[1]
-    colors = ['#ef4444' if x < 0 else '#10b981' for x in combined['CTR_Change']]
-
-    y_pos = np.arange(len(combined))
-    ax.barh(y_pos, combined['CTR_Change'], color=colors, alpha=0.7)
-    ax.set_yticks(y_pos)
-    ax.set_yticklabels([title[:40] + '...' if len(title) > 40 else title
-                        for title in combined['Video Title']], fontsize=9)
-    ax.set_xlabel('CTR Change (Percentage Points)')
-    ax.set_title('Shorts', fontweight='bold')
-    ax.axvline(x=0, color='black', linewidth=0.8)
-
-    for i, v in enumerate(combined['CTR_Change']):
-        ax.text(v, i, f' {v:.1f}%', va='center',
-                ha='left' if v > 0 else 'right', fontweight='bold')
-
-    plt.tight_layout()
-    return fig
-
-def create_metrics_comparison(dfs):
-    """Create before/after comparison for multiple metrics."""
-    fig, axes = plt.subplots(2, 3, figsize=(18, 10))
-    fig.suptitle('Long Form Videos - Before vs After Comparison (Equal Duration)',
-                 fontsize=16, fontweight='bold')
-
-    df = dfs['longform_equal'].copy()
-
-    # CTR
-    ax = axes[0, 0]
-    before = df['Equal Before CTR'].str.rstrip('%').astype(float)
-    after = df['Equal After CTR'].str.rstrip('%').astype(float)
-
-    x = np.arange(len(df))
-    width = 0.35
-
-    ax.bar(x - width/2, before, width, label='Before', color='#94a3b8', alpha=0.7)
-    ax.bar(x + width/2, after, width, label='After', color='#667eea', alpha=0.7)
-    ax.set_ylabel('CTR (%)')
-    ax.set_title('Click-Through Rate', fontweight='bold')
-    ax.legend()
-    ax.set_xticks([])
-
-    # Views
-    ax = axes[0, 1]
-    before = df['Equal Before Views']
-    after = df['Equal After Views']
-
-    ax.bar(x - width/2, before, width, label='Before', color='#94a3b8', alpha=0.7)
-    ax.bar(x + width/2, after, width, label='After', color='#667eea', alpha=0.7)
-    ax.set_ylabel('Views')
-    ax.set_title('Views', fontweight='bold')
-    ax.legend()
-    ax.set_xticks([])
-
-    # Impressions
-    ax = axes[0, 2]
-    before = df['Equal Before Impressions'].astype(float)
-    after = df['Equal After Impressions'].astype(float)
-
-    ax.bar(x - width/2, before, width, label='Before', color='#94a3b8', alpha=0.7)
-    ax.bar(x + width/2, after, width, label='After', color='#667eea', alpha=0.7)
-    ax.set_ylabel('Impressions')
-    ax.set_title('Impressions', fontweight='bold')
-    ax.legend()
-    ax.set_xticks([])
-
-    # Distribution of CTR Changes
-    ax = axes[1, 0]
-    ctr_change = (df['Equal After CTR'].str.rstrip('%').astype(float) -
-                  df['Equal Before CTR'].str.rstrip('%').astype(float))
-
-    colors = ['#10b981' if x > 0 else '#ef4444' for x in ctr_change]
-    ax.bar(x, ctr_change, color=colors, alpha=0.7)
-    ax.axhline(y=0, color='black', linewidth=0.8)
-    ax.set_ylabel('CTR Change (pp)')
-    ax.set_title('CTR Change Distribution', fontweight='bold')
-    ax.set_xticks([])
-
-    # Distribution of View Changes
-    ax = axes[1, 1]
-    view_change = df['Equal After Views'] - df['Equal Before Views']
-
-    colors = ['#10b981' if x > 0 else '#ef4444' for x in view_change]
-    ax.bar(x, view_change, color=colors, alpha=0.7)
-    ax.axhline(y=0, color='black', linewidth=0.8)
-    ax.set_ylabel('View Change')
-    ax.set_title('View Change Distribution', fontweight='bold')
-    ax.set_xticks([])
-
-    # Retention comparison
-    ax = axes[1, 2]
-    # Filter out N/A values
-    df_retention = df[df['Equal Before Retention'] != 'N/A'].copy()
-    before = df_retention['Equal Before Retention'].str.rstrip('%').astype(float)
-    after = df_retention['Equal After Retention'].str.rstrip('%').astype(float)
-
-    x_ret = np.arange(len(df_retention))
-    ax.bar(x_ret - width/2, before, width, label='Before', color='#94a3b8', alpha=0.7)
-    ax.bar(x_ret + width/2, after, width, label='After', color='#667eea', alpha=0.7)
-    ax.set_ylabel('Retention (%)')
-    ax.set_title('Retention Rate', fontweight='bold')
-    ax.legend()
-    ax.set_xticks([])
-
-    plt.tight_layout()
-    return fig
-
-def create_shorts_metrics_comparison(dfs):
-    """Create before/after comparison for Shorts metrics."""
-    fig, axes = plt.subplots(2, 3, figsize=(18, 10))
-    fig.suptitle('Shorts - Before vs After Comparison (Equal Duration)',
-                 fontsize=16, fontweight='bold')
-
-    df = dfs['shorts_equal'].copy()
-
-    # CTR
-    ax = axes[0, 0]
-    before = df['Equal Before CTR'].str.rstrip('%').astype(float)
-    after = df['Equal After CTR'].str.rstrip('%').astype(float)
+    if panel.style.get('value_labels'):
+        for i, v in enumerate(change):
+            ax.text(v, i, f' {v:.1f}%', va='center',
+                    ha='left' if v > 0 else 'right', fontweight='bold')
+
+def _paired_bars(ax, before, after, color, label):
+    """Before/after bars per video, or both distributions for large sets."""
+    if len(before) > AGGREGATE_ROWS:
+        before, after = before.dropna(), after.dropna()
+        bins = np.histogram_bin_edges(np.concatenate([before, after]), bins=HISTOGRAM_BINS)
+        ax.stairs(np.histogram(before, bins)[0], bins, fill=True,
+                  label='Before', color='#94a3b8', alpha=0.6)
+        ax.stairs(np.histogram(after, bins)[0], bins, fill=True,
+                  label='After', color=color, alpha=0.6)
+        ax.set_xlabel(label)
+        ax.set_ylabel('Videos')
+        ax.legend()
+        return
 
-    x = np.arange(len(df))
+    x = np.arange(len(before))
     width = 0.35
 
     ax.bar(x - width/2, before, width, label='Before', color='#94a3b8', alpha=0.7)
-    ax.bar(x + width/2, after, width, label='After', color='#f59e0b', alpha=0.7)
-    ax.set_ylabel('CTR (%)')
-    ax.set_title('Click-Through Rate', fontweight='bold')
-    ax.legend()
-    ax.set_xticks([])
-
-    # Views
-    ax = axes[0, 1]
-    before = df['Equal Before Views']
-    after = df['Equal After Views']
-
-    ax.bar(x - width/2, before, width, label='Before', color='#94a3b8', alpha=0.7)
-    ax.bar(x + width/2, after, width, label='After', color='#f59e0b', alpha=0.7)
-    ax.set_ylabel('Views')
-    ax.set_title('Views', fontweight='bold')
+    ax.bar(x + width/2, after, width, label='After', color=color, alpha=0.7)
+    ax.set_ylabel(label)
     ax.legend()
     ax.set_xticks([])
 
-    # Impressions
-    ax = axes[0, 2]
-    before = df['Equal Before Impressions'].astype(float)
-    after = df['Equal After Impressions'].astype(float)
-
-    ax.bar(x - width/2, before, width, label='Before', color='#94a3b8', alpha=0.7)
-    ax.bar(x + width/2, after, width, label='After', color='#f59e0b', alpha=0.7)
-    ax.set_ylabel('Impressions')
-    ax.set_title('Impressions', fontweight='bold')
-    ax.legend()
-    ax.set_xticks([])
-
-    # Distribution of CTR Changes
-    ax = axes[1, 0]
-    ctr_change = (df['Equal After CTR'].str.rstrip('%').astype(float) -
-                  df['Equal Before CTR'].str.rstrip('%').astype(float))
-
-    colors = ['#10b981' if x > 0 else '#ef4444' for x in ctr_change]
-    ax.bar(x, ctr_change, color=colors, alpha=0.7)
-    ax.axhline(y=0, color='black', linewidth=0.8)
-    ax.set_ylabel('CTR Change (pp)')
-    ax.set_title('CTR Change Distribution', fontweight='bold')
-    ax.set_xticks([])
-
-    # Distribution of View Changes
-    ax = axes[1, 1]
-    view_change = df['Equal After Views'] - df['Equal Before Views']
-
-    colors = ['#10b981' if x > 0 else '#ef4444' for x in view_change]
-    ax.bar(x, view_change, color=colors, alpha=0.7)
-    ax.axhline(y=0, color='black', linewidth=0.8)
-    ax.set_ylabel('View Change')
-    ax.set_title('View Change Distribution', fontweight='bold')
-    ax.set_xticks([])
-
-    # Impressions change
-    ax = axes[1, 2]
-    impression_change = df['Equal After Impressions'].astype(float) - df['Equal Before Impressions'].astype(float)
+def _paired_panel(ax, df, panel, rows):
+    """Before/after values of panel.metric; style: color, and dropna to skip
+    videos without a Before value (N/A retention)."""
+    period = _section_period(panel.section)
+    before, after = df[f'{period} Before {panel.metric}'], df[f'{period} After {panel.metric}']
+    if panel.style.get('dropna'):
+        kept = before.notna()
+        before, after = before[kept], after[kept]
+    _paired_bars(ax, before, after, panel.style['color'], panel.label)
+
+def _change_bars(ax, change, label):
+    """Green/red change bar per video, or a histogram of changes for large sets."""
+    if len(change) > AGGREGATE_ROWS:
+        change = change.dropna()
+        # Split the bins at zero so no bar mixes gains and losses
+        bins = np.union1d(np.histogram_bin_edges(change, bins=HISTOGRAM_BINS), [0])
+        # Bins closed on the right (the negated changes over mirrored edges),
+        # so a change of exactly 0 is red as in the per-video bars
+        counts = np.histogram(-change, -bins[::-1])[0][::-1]
+        gained = bins[:-1] >= 0
+        ax.stairs(np.where(gained, counts, 0), bins, fill=True, color='#10b981', alpha=0.7)
+        ax.stairs(np.where(gained, 0, counts), bins, fill=True, color='#ef4444', alpha=0.7)
+        ax.axvline(x=0, color='black', linewidth=0.8)
+        ax.set_xlabel(label)
+        ax.set_ylabel('Videos')
+        return
 
-    colors = ['#10b981' if x > 0 else '#ef4444' for x in impression_change]
-    ax.bar(x, impression_change, color=colors, alpha=0.7)
+    colors = ['#10b981' if x > 0 else '#ef4444' for x in change]
+    ax.bar(np.arange(len(change)), change, color=colors, alpha=0.7)
     ax.axhline(y=0, color='black', linewidth=0.8)
-    ax.set_ylabel('Impression Change')
-    ax.set_title('Impression Change Distribution', fontweight='bold')
+    ax.set_ylabel(label)
     ax.set_xticks([])
 
-    plt.tight_layout()
-    return fig
-
-def create_lifetime_comparison(dfs):
-    """Create lifetime duration comparison charts."""
-    fig, axes = plt.subplots(2, 2, figsize=(16, 10))
-    fig.suptitle('Lifetime Duration Analysis - Overall Performance Trends',
-                 fontsize=16, fontweight='bold')
-
-    # Long Form CTR
-    df = dfs['longform_lifetime'].copy()
-    ax = axes[0, 0]
-
-    df['CTR_Change'] = (df['Lifetime After CTR'].str.rstrip('%').astype(float) -
-                        df['Lifetime Before CTR'].str.rstrip('%').astype(float))
-
-    colors = ['#10b981' if x > 0 else '#ef4444' for x in df['CTR_Change']]
-    y_pos = np.arange(len(df))
-
-    ax.barh(y_pos, df['CTR_Change'], color=colors, alpha=0.7)
-    ax.set_yticks(y_pos)
-    ax.set_yticklabels([title[:25] + '...' if len(title) > 25 else title
-                        for title in df['Video Title']], fontsize=8)
-    ax.set_xlabel('CTR Change (pp)')
-    ax.set_title('Long Form - CTR Change (Lifetime)', fontweight='bold')
-    ax.axvline(x=0, color='black', linewidth=0.8)
-
-    # Long Form Views
-    ax = axes[0, 1]
-    df['View_Change'] = df['Lifetime After Views'] - df['Lifetime Before Views']
-
-    colors = ['#10b981' if x > 0 else '#ef4444' for x in df['View_Change']]
-    ax.barh(y_pos, df['View_Change'], color=colors, alpha=0.7)
-    ax.set_yticks(y_pos)
-    ax.set_yticklabels([title[:25] + '...' if len(title) > 25 else title
-                        for title in df['Video Title']], fontsize=8)
-    ax.set_xlabel('View Change')
-    ax.set_title('Long Form - View Change (Lifetime)', fontweight='bold')
-    ax.axvline(x=0, color='black', linewidth=0.8)
-
-    # Shorts CTR
-    df = dfs['shorts_lifetime'].copy()
-    ax = axes[1, 0]
-
-    df['CTR_Change'] = (df['Lifetime After CTR'].str.rstrip('%').astype(float) -
-                        df['Lifetime Before CTR'].str.rstrip('%').astype(float))
-
-    # Get top 10 and bottom 10
-    df_sorted = df.sort_values('CTR_Change')
-    df_display = pd.concat([df_sorted.head(10), df_sorted.tail(10)])
-
-    colors = ['#10b981' if x > 0 else '#ef4444' for x in df_display['CTR_Change']]
-    y_pos = np.arange(len(df_display))
-
-    ax.barh(y_pos, df_display['CTR_Change'], color=colors, alpha=0.7)
-    ax.set_yticks(y_pos)
-    ax.set_yticklabels([title[:25] + '...' if len(title) > 25 else title
-                        for title in df_display['Video Title']], fontsize=7)
-    ax.set_xlabel('CTR Change (pp)')
-    ax.set_title('Shorts - CTR Change (Lifetime, Top/Bottom 10)', fontweight='bold')
-    ax.axvline(x=0, color='black', linewidth=0.8)
-
-    # Shorts Views
-    ax = axes[1, 1]
-    df['View_Change'] = df['Lifetime After Views'] - df['Lifetime Before Views']
-    df_sorted = df.sort_values('View_Change')
-    df_display = pd.concat([df_sorted.head(10), df_sorted.tail(10)])
-
-    colors = ['#10b981' if x > 0 else '#ef4444' for x in df_display['View_Change']]
-    y_pos = np.arange(len(df_display))
-
-    ax.barh(y_pos, df_display['View_Change'], color=colors, alpha=0.7)
-    ax.set_yticks(y_pos)
-    ax.set_yticklabels([title[:25] + '...' if len(title) > 25 else title
-                        for title in df_display['Video Title']], fontsize=7)
-    ax.set_xlabel('View Change')
-    ax.set_title('Shorts - View Change (Lifetime, Top/Bottom 10)', fontweight='bold')
-    ax.axvline(x=0, color='black', linewidth=0.8)
-
-    plt.tight_layout()
-    return fig
-
-def create_ctr_scatter(dfs):
-    """Create scatter plot showing before vs after CTR."""
-    fig, axes = plt.subplots(1, 2, figsize=(16, 7))
-    fig.suptitle('CTR: Before vs After (Equal Duration) - Scatter Analysis',
-                 fontsize=16, fontweight='bold')
-
-    # Long Form
-    df = dfs['longform_equal'].copy()
-    ax = axes[0]
-
-    before = df['Equal Before CTR'].str.rstrip('%').astype(float)
-    after = df['Equal After CTR'].str.rstrip('%').astype(float)
-
-    colors = ['#10b981' if a > b else '#ef4444' for b, a in zip(before, after)]
-
-    ax.scatter(before, after, s=150, alpha=0.6, c=colors, edgecolors='black', linewidth=1.5)
+def _change_panel(ax, df, panel, rows):
+    period = _section_period(panel.section)
+    _change_bars(ax, df[f'{period} After {panel.metric}'] - df[f'{period} Before {panel.metric}'],
+                 panel.label)
+
+def _scatter_panel(ax, df, panel, rows):
+    """After against Before per video, or a hexbin density for large sets."""
+    period = _section_period(panel.section)
+    before_column = f'{period} Before {panel.metric}'
+    after_column = f'{period} After {panel.metric}'
+    before = df[before_column]
+    after = df[after_column]
+
+    if len(df) > AGGREGATE_ROWS:
+        # Binned density instead of one marker per video
+        both = df[[before_column, after_column]].dropna()
+        hexes = ax.hexbin(both[before_column], both[after_column], gridsize=40,
+                          mincnt=1, bins='log', cmap='viridis')
+        ax.figure.colorbar(hexes, ax=ax, label='Videos')
+    else:
+        colors = ['#10b981' if a > b else '#ef4444' for b, a in zip(before, after)]
+        ax.scatter(before, after, s=150, alpha=0.6, c=colors, edgecolors='black', linewidth=1.5)
 
     # Add diagonal line (no change line)
     max_val = max(before.max(), after.max())
     ax.plot([0, max_val], [0, max_val], 'k--', alpha=0.3, label='No change line')
 
-    ax.set_xlabel('Before CTR (%)', fontsize=12)
-    ax.set_ylabel('After CTR (%)', fontsize=12)
-    ax.set_title('Long Form Videos', fontweight='bold')
+    ax.set_xlabel(f'Before {panel.label}', fontsize=12)
+    ax.set_ylabel(f'After {panel.label}', fontsize=12)
     ax.legend()
     ax.grid(alpha=0.3)
 
@@ -524,187 +952,2193 @@ def create_ctr_scatter(dfs):
             transform=ax.transAxes, fontsize=11, verticalalignment='top',
             bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
 
-    # Shorts
-    df = dfs['shorts_equal'].copy()
-    ax = axes[1]
-
-    before = df['Equal Before CTR'].str.rstrip('%').astype(float)
-    after = df['Equal After CTR'].str.rstrip('%').astype(float)
+# Heatmaps above this many rows lose per-cell annotations and title labels and
+# are drawn as one image; above HEATMAP_MAX_ROWS, consecutive rows are averaged
+# into tiles so the image stays within the figure's pixel height
+HEATMAP_ANNOTATE_ROWS = 40
+HEATMAP_MAX_ROWS = 600
 
-    colors = ['#10b981' if a > b else '#ef4444' for b, a in zip(before, after)]
+def _heatmap_changes(df):
+    """CTR change (pp) and view/impression change (%) per video, indexed by short title."""
+    return pd.DataFrame({
+        'CTR': (df['Equal After CTR'] - df['Equal Before CTR']).to_numpy(),
+        'Views': ((df['Equal After Views'] - df['Equal Before Views']) /
+                  df['Equal Before Views'].replace(0, 1) * 100).to_numpy(),
+        'Impressions': ((df['Equal After Impressions'] - df['Equal Before Impressions']) /
+                        df['Equal Before Impressions'].replace(0, 1) * 100).to_numpy(),
+    }, index=[title[:30] + '...' if len(title) > 30 else title
+              for title in df['Video Title']])
 
-    ax.scatter(before, after, s=150, alpha=0.6, c=colors, edgecolors='black', linewidth=1.5)
+def _draw_heatmap(ax, changes):
+    if changes.empty:
+        _draw_no_data(ax)
+        return
+    if len(changes) <= HEATMAP_ANNOTATE_ROWS:
+        sns.heatmap(changes, annot=True, fmt='.1f', cmap='RdYlGn', center=0,
+                    cbar_kws={'label': 'Change (%)'}, ax=ax, linewidths=0.5)
+        return
 
-    max_val = max(before.max(), after.max())
-    ax.plot([0, max_val], [0, max_val], 'k--', alpha=0.3, label='No change line')
+    values = changes.to_numpy(dtype=float)
+    rows_per_tile = -(-len(values) // HEATMAP_MAX_ROWS)
+    if rows_per_tile > 1:
+        padded = np.full((-(-len(values) // rows_per_tile) * rows_per_tile, values.shape[1]), np.nan)
+        padded[:len(values)] = values
+        with np.errstate(invalid='ignore'):
+            values = np.nanmean(padded.reshape(-1, rows_per_tile, values.shape[1]), axis=1)
+
+    limit = np.nanmax(np.abs(values)) if np.isfinite(values).any() else 1.0
+    image = ax.imshow(values, aspect='auto', interpolation='nearest', cmap='RdYlGn',
+                      vmin=-limit, vmax=limit,
+                      extent=(-0.5, values.shape[1] - 0.5, len(changes), 0))
+    ax.figure.colorbar(image, ax=ax, label='Change (%)')
+    ax.set_xticks(range(values.shape[1]))
+    ax.set_xticklabels(changes.columns)
+    ax.grid(False)
+    ax.text(1.0, -0.06, f"{len(changes)} videos" +
+            (f", {rows_per_tile} per row (mean)" if rows_per_tile > 1 else ""),
+            transform=ax.transAxes, ha='right', va='top', fontsize=9, color='gray')
+
+def _heatmap_panel(ax, df, panel, rows):
+    """CTR, view and impression changes of every (or every ranked) video."""
+    _draw_heatmap(ax, _heatmap_changes(df if rows is None else df.iloc[rows]))
+    ax.set_xlabel(panel.label)
+    ax.set_ylabel('')
 
-    ax.set_xlabel('Before CTR (%)', fontsize=12)
-    ax.set_ylabel('After CTR (%)', fontsize=12)
-    ax.set_title('Shorts', fontweight='bold')
-    ax.legend()
-    ax.grid(alpha=0.3)
+# Chart types: the drawer, called as draw(ax, df, panel, rows) with the ranked
+# row positions or None, and the columns it reads besides panel.metric's pair
+PanelChart = namedtuple('PanelChart', ['draw', 'columns'])
+PANEL_CHARTS = {
+    'improved': PanelChart(_improved_panel, ()),
+    'mean-change': PanelChart(_mean_change_panel, ('CTR', 'Views', 'Impressions')),
+    'change-barh': PanelChart(_change_barh_panel, ('Video Title',)),
+    'paired': PanelChart(_paired_panel, ()),
+    'change': PanelChart(_change_panel, ()),
+    'scatter': PanelChart(_scatter_panel, ()),
+    'heatmap': PanelChart(_heatmap_panel, ('Video Title', 'CTR', 'Views', 'Impressions')),
+}
+
+# Figures are drawn into one reusable template per grid and size: the figure
+# and its axes are created once per process, and each render clears what the
+# previous one drew (including colorbars, which take space from their axes)
+_chart_templates = {}
+
+def chart_template(spec):
+    """A cleared figure and its axes (in row order) for a ChartSpec's layout."""
+    key = (spec.shape, spec.figsize)
+    template = _chart_templates.get(key)
+    if template is None or not plt.fignum_exists(template[0].number):
+        fig, axes = plt.subplots(*spec.shape, figsize=spec.figsize, squeeze=False)
+        axes = list(axes.ravel())
+        # clear() keeps spine visibility, which seaborn's heatmap turns off
+        state = [(ax.get_subplotspec(),
+                  {name: spine.get_visible() for name, spine in ax.spines.items()})
+                 for ax in axes]
+        _chart_templates[key] = (fig, axes, state)
+        return fig, axes
+
+    fig, axes, state = template
+    for ax in fig.axes:
+        if ax not in axes:
+            ax.remove()
+    for ax, (subplotspec, spines) in zip(axes, state):
+        ax.clear()
+        ax.set_subplotspec(subplotspec)
+        for name, visible in spines.items():
+            ax.spines[name].set_visible(visible)
+    fig.subplots_adjust(**{name: plt.rcParams[f'figure.subplot.{name}']
+                           for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+    return fig, axes
+
+def draw_chart(spec, dfs, k=None):
+    """Draw a ChartSpec into its template; k is the (bottom, top) count of ranked panels."""
+    fig, axes = chart_template(spec)
+    fig.suptitle(spec.title, fontsize=16, fontweight='bold')
+
+    for ax, panel in zip(axes, spec.panels):
+        df = dfs[panel.section]
+        rows, title = None, panel.title
+        if panel.ranked:
+            shown = f'Top/Bottom {k[1]}' if k[0] == k[1] else f'Bottom {k[0]}/Top {k[1]}'
+            title = title.format(shown=shown)
+        ax.set_title(title, fontweight='bold')
+        # A section missing from the input is an empty table
+        if df.empty:
+            _draw_no_data(ax)
+            continue
+        if panel.ranked:
+            rows = section_ranking(df, _section_period(panel.section)).extremes(panel.metric, *k)
+        PANEL_CHARTS[panel.chart].draw(ax, df, panel, rows)
 
-    improved = (after > before).sum()
-    ax.text(0.05, 0.95, f'Improved: {improved}/{len(df)}',
-            transform=ax.transAxes, fontsize=11, verticalalignment='top',
-            bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
+    return fig
 
-    plt.tight_layout()
+def _metrics_comparison_chart(section, title, color, last_panel):
+    """The 6-panel before/after comparison of one section."""
+    return ChartSpec(title, (2, 3), (18, 10), [
+        Panel('paired', section, 'CTR', 'Click-Through Rate', 'CTR (%)', style={'color': color}),
+        Panel('paired', section, 'Views', 'Views', 'Views', style={'color': color}),
+        Panel('paired', section, 'Impressions', 'Impressions', 'Impressions',
+              style={'color': color}),
+        # Distribution of changes
+        Panel('change', section, 'CTR', 'CTR Change Distribution', 'CTR Change (pp)'),
+        Panel('change', section, 'Views', 'View Change Distribution', 'View Change'),
+        last_panel,
+    ])
+
+SUMMARY_CHART = ChartSpec('YouTube Treatment Analysis - Summary Statistics', (2, 2), (14, 10), [
+    Panel('improved', 'longform_equal', SUMMARY_METRICS['longform_equal'],
+          'Long Form - Equal Duration\nVideos Showing Improvement', 'Number of Videos'),
+    Panel('improved', 'shorts_equal', SUMMARY_METRICS['shorts_equal'],
+          'Shorts - Equal Duration\nVideos Showing Improvement', 'Number of Videos'),
+    Panel('mean-change', 'longform_equal', 'CTR',
+          'Long Form - Average CTR Change\n(Equal Duration)', 'Percentage Points'),
+    Panel('mean-change', 'shorts_equal', 'CTR',
+          'Shorts - Average CTR Change\n(Equal Duration)', 'Percentage Points'),
+])
+
+TOP_PERFORMERS_STYLE = {'title_length': 40, 'fontsize': 9, 'value_labels': True}
+TOP_PERFORMERS_CHART = ChartSpec(
+    'Top & Bottom Performers by CTR Change (Equal Duration)', (1, 2), (16, 8), [
+        Panel('change-barh', 'longform_equal', 'CTR', 'Long Form Videos',
+              'CTR Change (Percentage Points)', True, TOP_PERFORMERS_STYLE),
+        Panel('change-barh', 'shorts_equal', 'CTR', 'Shorts',
+              'CTR Change (Percentage Points)', True, TOP_PERFORMERS_STYLE),
+    ])
+
+LONGFORM_METRICS_CHART = _metrics_comparison_chart(
+    'longform_equal', 'Long Form Videos - Before vs After Comparison (Equal Duration)', '#667eea',
+    Panel('paired', 'longform_equal', 'Retention', 'Retention Rate', 'Retention (%)',
+          style={'color': '#667eea', 'dropna': True}))
+
+SHORTS_METRICS_CHART = _metrics_comparison_chart(
+    'shorts_equal', 'Shorts - Before vs After Comparison (Equal Duration)', '#f59e0b',
+    Panel('change', 'shorts_equal', 'Impressions', 'Impression Change Distribution',
+          'Impression Change'))
+
+LIFETIME_CHART = ChartSpec(
+    'Lifetime Duration Analysis - Overall Performance Trends', (2, 2), (16, 10), [
+        Panel('change-barh', 'longform_lifetime', 'CTR', 'Long Form - CTR Change (Lifetime)',
+              'CTR Change (pp)'),
+        Panel('change-barh', 'longform_lifetime', 'Views', 'Long Form - View Change (Lifetime)',
+              'View Change'),
+        # Shorts: top and bottom videos only
+        Panel('change-barh', 'shorts_lifetime', 'CTR', 'Shorts - CTR Change (Lifetime, {shown})',
+              'CTR Change (pp)', True, {'fontsize': 7}),
+        Panel('change-barh', 'shorts_lifetime', 'Views',
+              'Shorts - View Change (Lifetime, {shown})', 'View Change', True, {'fontsize': 7}),
+    ])
+
+CTR_SCATTER_CHART = ChartSpec(
+    'CTR: Before vs After (Equal Duration) - Scatter Analysis', (1, 2), (16, 7), [
+        Panel('scatter', 'longform_equal', 'CTR', 'Long Form Videos', 'CTR (%)'),
+        Panel('scatter', 'shorts_equal', 'CTR', 'Shorts', 'CTR (%)'),
+    ])
+
+HEATMAP_CHART = ChartSpec(
+    'Performance Heatmap - All Metrics Change (Equal Duration)', (1, 2), (18, 12), [
+        Panel('heatmap', 'longform_equal', 'CTR', 'Long Form Videos', 'Metrics'),
+        Panel('heatmap', 'shorts_equal', 'CTR', 'Shorts (Top/Bottom by CTR)', 'Metrics', True),
+    ])
+
+DEFAULT_INPUT = "JSTB spreadsheet (Extension) - YouTube Metrics Comparison.csv"
+OUTPUT_DIR = "visualizations"
+
+SECTION_LABELS = {
+    'longform_equal': 'Long Form Equal',
+    'longform_lifetime': 'Long Form Lifetime',
+    'shorts_equal': 'Shorts Equal',
+    'shorts_lifetime': 'Shorts Lifetime',
+}
+
+class Figure(namedtuple('Figure', ['name', 'filename', 'label', 'summary', 'chart'])):
+    """One output figure, drawn from its ChartSpec."""
+
+    @property
+    def sections(self):
+        """The sections the figure's panels read, in panel order."""
+        return tuple(dict.fromkeys(panel.section for panel in self.chart.panels))
+
+    @property
+    def columns(self):
+        """What the panels read: 'Video Title' and metrics with Before/After pairs."""
+        columns = set()
+        for panel in self.chart.panels:
+            columns.update((panel.metric,) if isinstance(panel.metric, str) else panel.metric)
+            columns.update(PANEL_CHARTS[panel.chart].columns)
+        return tuple(sorted(columns))
+
+# Figures in output order
+FIGURES = [
+    Figure("summary", "1_summary_stats.png", "Summary Statistics",
+           "Summary Statistics (overview)", SUMMARY_CHART),
+    Figure("top-performers", "2_top_performers.png", "Top & Bottom Performers",
+           "Top & Bottom Performers (CTR)", TOP_PERFORMERS_CHART),
+    Figure("longform-metrics", "3_longform_metrics_comparison.png", "Long Form - Metrics Comparison",
+           "Long Form - Detailed Metrics", LONGFORM_METRICS_CHART),
+    Figure("shorts-metrics", "4_shorts_metrics_comparison.png", "Shorts - Metrics Comparison",
+           "Shorts - Detailed Metrics", SHORTS_METRICS_CHART),
+    Figure("lifetime", "5_lifetime_comparison.png", "Lifetime Duration Analysis",
+           "Lifetime Duration Analysis", LIFETIME_CHART),
+    Figure("ctr-scatter", "6_ctr_scatter.png", "CTR Scatter Analysis",
+           "CTR Scatter Plot (correlation)", CTR_SCATTER_CHART),
+    Figure("heatmap", "7_performance_heatmap.png", "Performance Heatmap",
+           "Performance Heatmap (all metrics)", HEATMAP_CHART),
+]
+
+SAVE_KWARGS = dict(dpi=300, bbox_inches='tight')
+
+# How figures are written: file format, final or quick preview quality, the
+# rows per end of the ranking charts (None: each chart's RANKING_K), and the
+# output set (None: one file in `format`; see parse_outputs)
+RenderOptions = namedtuple('RenderOptions', ['format', 'preview', 'top_k', 'outputs'],
+                           defaults=(None, None))
+OUTPUT_FORMATS = ('png', 'svg', 'pdf', 'webp')
+FINAL_RENDER = RenderOptions('png', False)
+
+# One file written per figure: its format and dpi (None: the render's own,
+# 300 or the preview dpi). Raster formats are drawn once, at the largest dpi
+# asked for, and resampled for the others.
+Output = namedtuple('Output', ['format', 'dpi'])
+RASTER_FORMATS = ('png', 'webp')
+
+# Preview mode skips the tight layout and tight bbox passes: figures are saved
+# at low dpi with fixed margins in inches (wider where tick labels are video titles)
+PREVIEW_DPI = 72
+PREVIEW_MARGINS = dict(left=1.1, right=0.5, bottom=0.8, top=1.0, wspace=0.3, hspace=0.4)
+PREVIEW_MARGIN_OVERRIDES = {
+    'top-performers': dict(left=3.2, wspace=0.75),
+    'lifetime': dict(left=2.7, wspace=0.65),
+    'heatmap': dict(left=3.1, wspace=0.55),
+    'channel-summary': dict(left=2.4, wspace=0.45),
+}
+
+# Collections and bar sets with at least this many elements are rasterized in
+# SVG/PDF output; axes, labels and text stay vector
+RASTERIZE_MIN_ELEMENTS = 500
+
+def parse_outputs(spec):
+    """Turn a comma-separated list of FORMAT[@DPI] ('png,png@96,svg,webp@40') into Outputs."""
+    outputs = []
+    for token in filter(None, (part.strip().lower() for part in spec.split(','))):
+        fmt, _, dpi = token.partition('@')
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"unknown format '{fmt}' (choose from {', '.join(OUTPUT_FORMATS)})")
+        if dpi and not (dpi.isdigit() and int(dpi) > 0):
+            raise ValueError(f"'{token}': dpi must be a positive whole number")
+        output = Output(fmt, int(dpi) if dpi else None)
+        if output not in outputs:
+            outputs.append(output)
+    if not outputs:
+        raise ValueError("needs at least one format")
+    return tuple(outputs)
+
+def render_outputs(options=FINAL_RENDER):
+    return options.outputs or (Output(options.format, None),)
+
+def output_filenames(figure, options=FINAL_RENDER):
+    """Every file a figure is written to: '6_ctr_scatter.png', '6_ctr_scatter-96dpi.png', ..."""
+    return stem_filenames(Path(figure.filename).stem, options)
+
+def stem_filenames(stem, options=FINAL_RENDER):
+    return [f"{stem}{f'-{output.dpi}dpi' if output.dpi else ''}.{output.format}"
+            for output in render_outputs(options)]
+
+def output_filename(figure, options=FINAL_RENDER):
+    """The figure's first output file, which the manifest and progress lines name."""
+    return output_filenames(figure, options)[0]
+
+def save_kwargs(options=FINAL_RENDER):
+    return dict(dpi=PREVIEW_DPI) if options.preview else SAVE_KWARGS
+
+def tight_bbox(fig, dpi):
+    """The region savefig(bbox_inches='tight') crops to at `dpi`, worked out once
+    so every output of a figure reuses it instead of laying the figure out again."""
+    original_dpi = fig.dpi
+    fig.dpi = dpi
+    try:
+        fig.draw_without_rendering()
+        bbox = fig.get_tightbbox()
+    finally:
+        fig.dpi = original_dpi
+    return bbox.padded(plt.rcParams['savefig.pad_inches'])
+
+def figure_outputs(fig, options=FINAL_RENDER):
+    """Write a laid-out figure to every output of `options`; yields (Output, bytes).
+
+    The crop box is computed once. PNG and WebP outputs share one Agg
+    drawing at the largest raster dpi; smaller sizes are resampled from it
+    rather than drawn again. SVG and PDF each need their own renderer pass.
+    """
+    from PIL import Image
+
+    kwargs = save_kwargs(options)
+    default_dpi = kwargs['dpi']
+    outputs = render_outputs(options)
+    raster_dpi = max((output.dpi or default_dpi for output in outputs
+                      if output.format in RASTER_FORMATS), default=default_dpi)
+    bbox = tight_bbox(fig, raster_dpi) if kwargs.get('bbox_inches') == 'tight' else None
+
+    drawn = image = None
+    for output in outputs:
+        dpi = output.dpi or default_dpi
+        buffer = io.BytesIO()
+        if output.format not in RASTER_FORMATS:
+            with profile_stage(f'savefig:{output.format}'):
+                fig.savefig(buffer, format=output.format, dpi=dpi, bbox_inches=bbox)
+            yield output, buffer.getvalue()
+            continue
+        if drawn is None:
+            with profile_stage('savefig:png'):
+                fig.savefig(buffer, format='png', dpi=raster_dpi, bbox_inches=bbox)
+            drawn, buffer = buffer.getvalue(), io.BytesIO()
+        if output.format == 'png' and dpi == raster_dpi:
+            yield output, drawn
+            continue
+        with profile_stage(f'resample:{output.format}'):
+            if image is None:
+                image = Image.open(io.BytesIO(drawn))
+                image.load()
+            resized = image
+            if dpi != raster_dpi:
+                scale = dpi / raster_dpi
+                resized = image.resize((max(1, round(image.width * scale)),
+                                        max(1, round(image.height * scale))), Image.LANCZOS)
+            resized.save(buffer, format=output.format, dpi=(dpi, dpi))
+        yield output, buffer.getvalue()
+
+def apply_layout(fig, name, options=FINAL_RENDER):
+    """Tight layout for final output, fixed margins in preview mode."""
+    with profile_stage('layout'):
+        if options.preview:
+            margins = {**PREVIEW_MARGINS, **PREVIEW_MARGIN_OVERRIDES.get(name, {})}
+            width, height = fig.get_size_inches()
+            fig.subplots_adjust(left=margins['left'] / width, right=1 - margins['right'] / width,
+                                bottom=margins['bottom'] / height, top=1 - margins['top'] / height,
+                                wspace=margins['wspace'], hspace=margins['hspace'])
+        else:
+            fig.tight_layout()
+
+def _element_count(collection):
+    array = collection.get_array()
+    return array.size if array is not None else len(collection.get_offsets())
+
+def rasterize_dense_layers(fig):
+    """Mark per-video bars, scatter points, hexbins and heatmap cells as rasterized.
+
+    Only vector formats are affected (the PNG renderer rasterizes everything
+    anyway); consecutive rasterized artists are merged into one embedded image.
+    """
+    for ax in fig.axes:
+        if len(ax.patches) >= RASTERIZE_MIN_ELEMENTS:
+            for patch in ax.patches:
+                patch.set_rasterized(True)
+        for collection in ax.collections:
+            if _element_count(collection) >= RASTERIZE_MIN_ELEMENTS:
+                collection.set_rasterized(True)
+
+def select_figures(spec):
+    """Turn a comma-separated list of figure numbers or names into FIGURES indices."""
+    indices = []
+    for token in filter(None, (part.strip().lower() for part in spec.split(','))):
+        for index, figure in enumerate(FIGURES):
+            if token in (str(index + 1), figure.name):
+                break
+        else:
+            raise ValueError(f"unknown figure '{token}' (see --list)")
+        if index not in indices:
+            indices.append(index)
+    return sorted(indices)
+
+def print_figure_list():
+    print("Available figures:")
+    for index, figure in enumerate(FIGURES):
+        print(f"  {index + 1}. {figure.name:<17} {figure.filename:<36} {figure.summary}")
+
+def draw_figure(index, dfs, options=FINAL_RENDER):
+    """Draw one figure from FIGURES into its reusable template, laid out for `options`."""
+    figure = FIGURES[index]
+    k = ranking_k(figure.name, options.top_k) if figure.name in RANKING_K else None
+    with profile_stage('build'):
+        fig = draw_chart(figure.chart, dfs, k)
+    apply_layout(fig, figure.name, options)
+    rasterize_dense_layers(fig)
     return fig
 
-def create_heatmap(dfs):
-    """Create heatmap showing all videos and their metric changes."""
-    fig, axes = plt.subplots(1, 2, figsize=(18, 12))
-    fig.suptitle('Performance Heatmap - All Metrics Change (Equal Duration)',
-                 fontsize=16, fontweight='bold')
+def render_figure(index, dfs, output_dir, options=FINAL_RENDER):
+    """Draw one figure and write each of its outputs; returns the first output's file name."""
+    figure = FIGURES[index]
+    filenames = output_filenames(figure, options)
+    with profile_stage(f'figure:{figure.name}') as record:
+        fig = draw_figure(index, dfs, options)
+        if record is not None:
+            record['artists'] = sum(1 for _ in fig.findobj())
+        with profile_stage('savefig'):
+            for filename, (_, data) in zip(filenames, figure_outputs(fig, options)):
+                (Path(output_dir) / filename).write_bytes(data)
+    return filenames[0]
+
+# Build manifest kept next to the rendered figures
+MANIFEST_NAME = ".build_manifest.json"
+MANIFEST_VERSION = 3
+
+def file_sha256(path):
+    """Hash a file's contents in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def section_fingerprint(df):
+    """Hash a normalized section's column names and values."""
+    digest = hashlib.sha256('\x1f'.join(map(str, df.columns)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _installed_package_id(name):
+    """Location and timestamp of an installed package, found without importing it."""
+    origin = importlib.util.find_spec(name).origin
+    return f"{origin}:{os.stat(origin).st_mtime_ns}"
+
+def render_settings_key(options=FINAL_RENDER):
+    """Identify the code and settings every figure is rendered with."""
+    settings = json.dumps({'save': save_kwargs(options), 'options': options._asdict(),
+                           'matplotlib': _installed_package_id('matplotlib')}, sort_keys=True)
+    return hashlib.sha256((file_sha256(__file__) + settings).encode('utf-8')).hexdigest()
+
+def figure_key(figure, section_hashes, settings_key):
+    """Hash everything a figure's pixels depend on."""
+    parts = [settings_key, figure.filename] + [section_hashes.get(s, '') for s in figure.sections]
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()
+
+def load_manifest(output_dir):
+    """Read the build manifest, or an empty one if missing or outdated."""
+    try:
+        with open(Path(output_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if manifest.get('version') == MANIFEST_VERSION else {}
+
+def save_manifest(output_dir, manifest):
+    manifest['version'] = MANIFEST_VERSION
+    path = Path(output_dir) / MANIFEST_NAME
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def is_up_to_date(manifest, output_dir, source_key, settings_key, filenames):
+    """True when the source and code match the manifest and each of the given
+    figures was either rendered and still exists or skipped for lack of data."""
+    figures = manifest.get('figures', {})
+    skipped = manifest.get('skipped', ())
+    return (source_key is not None
+            and manifest.get('source_key') == source_key
+            and manifest.get('settings') == settings_key
+            and all(filename in skipped
+                    or (filename in figures and (Path(output_dir) / filename).exists())
+                    for filename in filenames))
+
+# Bump whenever parsing or normalization output changes, to invalidate caches
+PARSER_VERSION = 2
+
+# Parsed, normalized sections are cached here, one folder per source/parser key
+CACHE_DIR = ".viz_cache"
+CACHE_KEEP = 8
+
+def dataset_cache_key(source_sha256, content_type, columns=None):
+    """Cache key for a source file's normalized sections (compact ones: their columns)."""
+    raw = f"{source_sha256}:{content_type}:{PARSER_VERSION}:{pd.__version__}"
+    if columns is not None:
+        raw += ':compact:' + ','.join(sorted(columns))
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:32]
+
+def save_cached_sections(cache_root, key, dfs, keep=CACHE_KEEP):
+    """Write normalized sections as one .npy file per column.
+
+    Numbers and dates are stored raw so they can be memory-mapped back;
+    text and categorical columns are stored as int32 codes plus a JSON
+    list of values.
+    """
+    cache_root = Path(cache_root)
+    target = cache_root / key
+    if target.exists():
+        return target
+    tmp = cache_root / f".{key}.{os.getpid()}.tmp"
+    tmp.mkdir(parents=True, exist_ok=True)
+
+    meta = {'version': PARSER_VERSION, 'sections': {}}
+    for s_index, (section, df) in enumerate(dfs.items()):
+        columns = []
+        for c_index, name in enumerate(df.columns):
+            values = df[name]
+            stem = f"{s_index}_{c_index}"
+            if pd.api.types.is_datetime64_any_dtype(values):
+                np.save(tmp / f"{stem}.npy", values.to_numpy().view(np.int64))
+                columns.append({'name': name, 'kind': 'datetime', 'dtype': str(values.dtype)})
+            elif pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+                np.save(tmp / f"{stem}.npy", values.to_numpy())
+                columns.append({'name': name, 'kind': 'numeric'})
+            elif isinstance(values.dtype, pd.CategoricalDtype):
+                np.save(tmp / f"{stem}.npy", values.cat.codes.to_numpy().astype(np.int32))
+                with open(tmp / f"{stem}.json", 'w', encoding='utf-8') as f:
+                    json.dump([str(value) for value in values.cat.categories], f, ensure_ascii=False)
+                columns.append({'name': name, 'kind': 'category'})
+            else:
+                codes, uniques = pd.factorize(values, use_na_sentinel=True)
+                np.save(tmp / f"{stem}.npy", codes.astype(np.int32))
+                with open(tmp / f"{stem}.json", 'w', encoding='utf-8') as f:
+                    json.dump([str(value) for value in uniques], f, ensure_ascii=False)
+                columns.append({'name': name, 'kind': 'text'})
+        meta['sections'][section] = {'stem': s_index, 'rows': len(df), 'columns': columns}
+
+    with open(tmp / "meta.json", 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        # Another run cached the same key first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    # Keep only the most recently used entries
+    entries = sorted((p for p in cache_root.iterdir() if p.is_dir() and not p.name.startswith('.')),
+                     key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in entries[keep:]:
+        shutil.rmtree(stale, ignore_errors=True)
+    return target
+
+def load_cached_sections(cache_root, key):
+    """Load cached sections, memory-mapping numeric columns; None on a miss."""
+    folder = Path(cache_root) / key
+    try:
+        with open(folder / "meta.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != PARSER_VERSION:
+        return None
 
-    # Long Form
-    df = dfs['longform_equal'].copy()
-    ax = axes[0]
+    dfs = {}
+    for section, info in meta['sections'].items():
+        data = {}
+        for c_index, column in enumerate(info['columns']):
+            stem = folder / f"{info['stem']}_{c_index}"
+            values = np.load(f"{stem}.npy", mmap_mode='r')
+            if column['kind'] == 'datetime':
+                values = values.view(column['dtype'])
+            elif column['kind'] == 'text':
+                with open(f"{stem}.json", 'r', encoding='utf-8') as f:
+                    uniques = np.array(json.load(f) + [None], dtype=object)
+                # NA codes are -1, which take() maps onto the trailing None
+                values = uniques.take(values)
+            elif column['kind'] == 'category':
+                with open(f"{stem}.json", 'r', encoding='utf-8') as f:
+                    values = pd.Categorical.from_codes(values, categories=json.load(f))
+            data[column['name']] = values
+        dfs[section] = pd.DataFrame(data, copy=False) if data else pd.DataFrame(index=range(info['rows']))
+    os.utime(folder)
+    return dfs
 
-    # Calculate changes
-    changes = pd.DataFrame({
-        'CTR': (df['Equal After CTR'].str.rstrip('%').astype(float) -
-                df['Equal Before CTR'].str.rstrip('%').astype(float)),
-        'Views': ((df['Equal After Views'] - df['Equal Before Views']) /
-                  df['Equal Before Views'].replace(0, 1) * 100),
-        'Impressions': ((df['Equal After Impressions'].astype(float) -
-                        df['Equal Before Impressions'].astype(float)) /
-                       df['Equal Before Impressions'].astype(float).replace(0, 1) * 100)
-    }, index=[title[:30] + '...' if len(title) > 30 else title
-              for title in df['Video Title']])
+# Metrics store: an SQLite database that accumulates exports across runs and
+# channels. --ingest adds exports to it; passing the database as --input
+# draws the latest extraction of every treated video without parsing a sheet.
+STORE_VERSION = 2
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    source_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    sha256 TEXT NOT NULL UNIQUE,
+    channel TEXT,
+    ingested_at TEXT NOT NULL,
+    rows INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS source_marks (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    prefix_sha256 TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    channel TEXT,
+    title TEXT,
+    url TEXT,
+    content_type TEXT NOT NULL,
+    publish_date TEXT
+);
+CREATE TABLE IF NOT EXISTS treatments (
+    treatment_id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL REFERENCES videos (video_id),
+    treatment_date TEXT NOT NULL,
+    UNIQUE (video_id, treatment_date)
+);
+CREATE TABLE IF NOT EXISTS periods (
+    period_id INTEGER PRIMARY KEY,
+    treatment_id INTEGER NOT NULL REFERENCES treatments (treatment_id),
+    period_type TEXT NOT NULL,
+    extraction_date TEXT NOT NULL,
+    before_range TEXT,
+    after_range TEXT,
+    source_id INTEGER REFERENCES sources (source_id),
+    row_hash INTEGER,
+    UNIQUE (treatment_id, period_type, extraction_date)
+);
+CREATE TABLE IF NOT EXISTS metric_values (
+    period_id INTEGER NOT NULL REFERENCES periods (period_id),
+    metric TEXT NOT NULL,
+    before REAL,
+    after REAL,
+    PRIMARY KEY (period_id, metric)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS videos_by_channel ON videos (channel);
+CREATE INDEX IF NOT EXISTS treatments_by_date ON treatments (treatment_date);
+CREATE INDEX IF NOT EXISTS periods_by_extraction ON periods (extraction_date);
+"""
 
-    sns.heatmap(changes, annot=True, fmt='.1f', cmap='RdYlGn', center=0,
-                cbar_kws={'label': 'Change (%)'}, ax=ax, linewidths=0.5)
-    ax.set_title('Long Form Videos', fontweight='bold')
-    ax.set_xlabel('Metrics')
-    ax.set_ylabel('')
+# Steps from each older store version to the next; STORE_SCHEMA then adds
+# any new tables
+STORE_MIGRATIONS = {
+    1: "ALTER TABLE periods ADD COLUMN row_hash INTEGER;",
+}
+
+# Metrics kept per period, in the sheet's column order
+STORE_METRICS = ('Impressions', 'Views', 'CTR', 'AWT', 'Retention', 'Stayed to watch')
+
+# Video IDs in Studio, watch, Shorts and short links
+VIDEO_ID_PATTERN = r'(?:/video/|/shorts/|[?&]v=|youtu\.be/)([\w-]{11})'
+
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+def is_metrics_store(path):
+    """True when the input is a metrics store rather than an export."""
+    if str(path) == '-' or not Path(path).is_file():
+        return False
+    with open(path, 'rb') as f:
+        return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+
+def open_store(path):
+    """Open (creating if needed) a metrics store."""
+    conn = sqlite3.connect(path)
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version > STORE_VERSION:
+        conn.close()
+        raise ValueError(f"{path} is a metrics store of version {version}, "
+                         f"this script reads up to version {STORE_VERSION}")
+    if version < STORE_VERSION:
+        # A new store (version 0) gets the current schema directly
+        for step in range(version, STORE_VERSION) if version else ():
+            conn.executescript(STORE_MIGRATIONS[step])
+        conn.executescript(STORE_SCHEMA)
+        conn.execute(f"PRAGMA user_version = {STORE_VERSION}")
+    return conn
+
+def store_revision(conn):
+    """Counter bumped by every ingest that changed the store."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+    return int(row[0]) if row else 0
+
+def _iso_dates(values):
+    """datetime64 values as YYYY-MM-DD strings, '' when missing."""
+    return values.dt.strftime('%Y-%m-%d').fillna('').tolist()
+
+def _video_ids(df):
+    """Video ID per row: the export's, else parsed from the URL, else 'title:<title>'."""
+    ids = pd.Series(np.nan, index=df.index, dtype=object)
+    if 'Video ID' in df:
+        ids = df['Video ID'].astype(object).where(df['Video ID'].notna() & (df['Video ID'] != ''))
+    if 'URL' in df:
+        ids = ids.fillna(df['URL'].astype(str).str.extract(VIDEO_ID_PATTERN, expand=False))
+    return ids.fillna('title:' + df['Video Title'].astype(object).fillna('').astype(str))
+
+# The extension's lifetime POST window ends this many days before the
+# extraction ran, and Equal POST windows no later (Studio lags behind; see
+# extractVideoMetrics)
+LIFETIME_LAG_DAYS = 3
+
+def _extraction_dates(dfs):
+    """Extraction date per (Video ID, treatment date), read off the end of the
+    lifetime After range; exports without an Extraction Date column carry it
+    only there.
+
+    Treatments with only Equal rows take the end of the Equal After range
+    instead, the earliest day the extraction could have run: it comes from
+    the export's content, so downloading the same export again on another
+    day maps its rows to the same periods.
+    """
+    found = {'Equal': {}, 'Lifetime': {}}
+    for section, df in dfs.items():
+        period = _section_period(section)
+        name = f'{period} After Period'
+        if name not in df or 'Treatment Date' not in df:
+            continue
+        ends = pd.to_datetime(df[name].astype(str).str.rsplit('-', n=1).str[-1],
+                              format=DATE_FORMAT, errors='coerce')
+        dates = _iso_dates(ends + pd.Timedelta(days=LIFETIME_LAG_DAYS))
+        keys = zip(_video_ids(df).tolist(), _iso_dates(df['Treatment Date']))
+        found[period].update((key, date) for key, date in zip(keys, dates) if date)
+    return {**found['Equal'], **found['Lifetime']}
+
+def _staged_rows(df, section, channel, extraction_date, extracted_by_treatment=None):
+    """A normalized section as store rows and {metric: (before, after)} arrays.
+
+    Each row ends with a hash of everything stored for it, so a row that an
+    earlier export already wrote can be recognized before its values are
+    staged (see _staged_values).
+    """
+    period = _section_period(section)
+    kind = section.rsplit('_', 1)[0]
+    n = len(df)
+    extracted_by_treatment = extracted_by_treatment or {}
+
+    def text(name):
+        return df[name].astype(object).where(df[name].notna(), None).tolist() if name in df else [None] * n
+
+    def dates(name):
+        return _iso_dates(df[name]) if name in df else [''] * n
+
+    video_ids = _video_ids(df).tolist()
+    treated = dates('Treatment Date')
+    extracted = [value or extracted_by_treatment.get(key, extraction_date)
+                 for value, key in zip(dates('Extraction Date'), zip(video_ids, treated))]
+    fields = [video_ids, [channel] * n, text('Video Title'), text('URL'), [kind] * n,
+              dates('Publish Date'), treated, [period] * n, extracted,
+              text(f'{period} Before Period'), text(f'{period} After Period')]
+
+    metrics = {}
+    for metric in STORE_METRICS:
+        before_name, after_name = f'{period} Before {metric}', f'{period} After {metric}'
+        if before_name in df and after_name in df:
+            metrics[metric] = (df[before_name].to_numpy(dtype=float),
+                               df[after_name].to_numpy(dtype=float))
+    hashed = dict(enumerate(fields))
+    hashed.update((f'{metric} {side}', values) for metric, pair in metrics.items()
+                  for side, values in enumerate(pair))
+    # hash_pandas_object uses a fixed key, so hashes are stable across runs
+    row_hashes = pd.util.hash_pandas_object(pd.DataFrame(hashed), index=False)
+    rows = list(zip(*fields, row_hashes.to_numpy().view(np.int64).tolist()))
+    return rows, metrics
+
+def _staged_values(metrics, rows, offset):
+    """(seq, metric, before, after) for the given rows, skipping metrics missing on both sides."""
+    values = []
+    for metric, (before, after) in metrics.items():
+        keep = rows[~(np.isnan(before[rows]) & np.isnan(after[rows]))]
+        sides = []
+        for side in (before[keep], after[keep]):
+            side = side.astype(object)
+            side[np.isnan(side.astype(float))] = None
+            sides.append(side.tolist())
+        values.extend(zip((keep + offset).tolist(), itertools.repeat(metric), *sides))
+    return values
+
+def ingest_sections(conn, dfs, source_path, sha256, channel=None, extraction_date=None):
+    """Upsert normalized sections into the store.
+
+    Rows are keyed by (Video ID, treatment date, period type, extraction
+    date): a later export of the same extraction replaces its values. Rows
+    without an Extraction Date column take it from their After ranges (see
+    _extraction_dates), else `extraction_date` (the export's date). Rows stored before
+    with identical values are dropped before any upsert, so the work done
+    follows the number of new or changed rows. Returns a dict with the rows
+    read and the rows written; a source whose content was ingested before
+    is skipped (both 0).
+    """
+    if conn.execute("SELECT 1 FROM sources WHERE sha256 = ?", (sha256,)).fetchone():
+        return {'rows': 0, 'written': 0}
+    extraction_date = extraction_date or time.strftime('%Y-%m-%d')
+    extracted_by_treatment = _extraction_dates(dfs)
+
+    with conn:
+        conn.execute("""CREATE TEMP TABLE IF NOT EXISTS staging (
+            seq INTEGER PRIMARY KEY, video_id TEXT, channel TEXT, title TEXT, url TEXT,
+            content_type TEXT, publish_date TEXT, treatment_date TEXT, period_type TEXT,
+            extraction_date TEXT, before_range TEXT, after_range TEXT, row_hash INTEGER)""")
+        conn.execute("""CREATE TEMP TABLE IF NOT EXISTS staging_values (
+            seq INTEGER, metric TEXT, before REAL, after REAL)""")
+        conn.execute("DELETE FROM staging")
+        conn.execute("DELETE FROM staging_values")
+
+        offset = 0
+        staged = []
+        for section, df in dfs.items():
+            rows, metrics = _staged_rows(df, section, channel, extraction_date,
+                                         extracted_by_treatment)
+            conn.executemany("INSERT INTO staging VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                             ((offset + i,) + row for i, row in enumerate(rows)))
+            staged.append((offset, len(rows), metrics))
+            offset += len(rows)
+
+        # Drop rows the store already holds unchanged; only the rest get values
+        conn.execute("""
+            DELETE FROM staging WHERE EXISTS (
+                SELECT 1 FROM treatments t JOIN periods p USING (treatment_id)
+                WHERE t.video_id = staging.video_id
+                  AND t.treatment_date = staging.treatment_date
+                  AND p.period_type = staging.period_type
+                  AND p.extraction_date = staging.extraction_date
+                  AND p.row_hash = staging.row_hash)""")
+        seqs = np.array([seq for seq, in conn.execute("SELECT seq FROM staging ORDER BY seq")],
+                        dtype=np.int64)
+        written = len(seqs)
+        for start, count, metrics in staged:
+            rows = seqs[(seqs >= start) & (seqs < start + count)] - start
+            conn.executemany("INSERT INTO staging_values VALUES (?, ?, ?, ?)",
+                             _staged_values(metrics, rows, start))
+
+        source_id = conn.execute(
+            "INSERT INTO sources (path, sha256, channel, ingested_at, rows) VALUES (?, ?, ?, ?, ?)",
+            (str(source_path), sha256, channel, time.strftime('%Y-%m-%dT%H:%M:%S'), offset)
+        ).lastrowid
+        if written:
+            _upsert_staging(conn, source_id)
+        conn.execute("DELETE FROM staging")
+        conn.execute("DELETE FROM staging_values")
+    return {'rows': offset, 'written': written}
+
+def _upsert_staging(conn, source_id):
+    """Write the staged rows and their values into the store tables."""
+    # Later rows win, so upserts run in staging order
+    conn.execute("""
+        INSERT INTO videos (video_id, channel, title, url, content_type, publish_date)
+        SELECT video_id, channel, title, url, content_type, publish_date
+        FROM staging WHERE true ORDER BY seq
+        ON CONFLICT (video_id) DO UPDATE SET
+            channel = coalesce(excluded.channel, channel),
+            title = coalesce(excluded.title, title),
+            url = coalesce(excluded.url, url),
+            content_type = excluded.content_type,
+            publish_date = coalesce(nullif(excluded.publish_date, ''), publish_date)""")
+    conn.execute("""
+        INSERT INTO treatments (video_id, treatment_date)
+        SELECT DISTINCT video_id, treatment_date FROM staging WHERE true
+        ON CONFLICT DO NOTHING""")
+    conn.execute("""
+        INSERT INTO periods (treatment_id, period_type, extraction_date,
+                             before_range, after_range, source_id, row_hash)
+        SELECT t.treatment_id, s.period_type, s.extraction_date,
+               s.before_range, s.after_range, ?, s.row_hash
+        FROM staging s JOIN treatments t USING (video_id, treatment_date)
+        WHERE true ORDER BY s.seq
+        ON CONFLICT (treatment_id, period_type, extraction_date) DO UPDATE SET
+            before_range = excluded.before_range,
+            after_range = excluded.after_range,
+            source_id = excluded.source_id,
+            row_hash = excluded.row_hash""", (source_id,))
+    # A changed row replaces all of its values, including ones now missing
+    conn.execute("""
+        DELETE FROM metric_values WHERE period_id IN (
+            SELECT p.period_id FROM staging s
+            JOIN treatments t USING (video_id, treatment_date)
+            JOIN periods p ON p.treatment_id = t.treatment_id
+                          AND p.period_type = s.period_type
+                          AND p.extraction_date = s.extraction_date)""")
+    conn.execute("""
+        INSERT INTO metric_values (period_id, metric, before, after)
+        SELECT p.period_id, v.metric, v.before, v.after
+        FROM staging_values v
+        JOIN staging s USING (seq)
+        JOIN treatments t USING (video_id, treatment_date)
+        JOIN periods p ON p.treatment_id = t.treatment_id
+                      AND p.period_type = s.period_type
+                      AND p.extraction_date = s.extraction_date
+        WHERE true ORDER BY v.seq
+        ON CONFLICT (period_id, metric) DO UPDATE SET
+            before = excluded.before,
+            after = excluded.after""")
+    conn.execute("""
+        INSERT INTO meta (key, value) VALUES ('revision', '1')
+        ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1""")
+
+EXPORT_SETTLE = 2.0  # an export modified this recently may still be being written
+
+def _appended_rows(data, mark):
+    """The rows a batch export gained since its high-water mark, or None.
+
+    Only a TSV that grew by appending qualifies: its bytes up to the mark
+    must hash as they did. The header line is kept so columns map the same.
+    """
+    if mark is None or len(data) <= mark['offset']:
+        return None
+    first = data[:data.find(b'\n') + 1]
+    if b'\t' not in first:
+        return None
+    if hashlib.sha256(data[:mark['offset']]).hexdigest() != mark['prefix_sha256']:
+        return None
+    header = first if first.lstrip(codecs.BOM_UTF8).startswith(b'URL\t') else b''
+    return header + data[mark['offset']:]
+
+def ingest_export(conn, path, content_type='auto', channel=None):
+    """Parse one export (or stdin) and ingest it.
+
+    Each file keeps a high-water mark in the store: its size and mtime, and
+    the offset and hash of the bytes consumed. An untouched file is not
+    read again, and a batch export that only grew is parsed from the mark
+    on. A last line without its newline is held back while the file was
+    modified in the last EXPORT_SETTLE seconds, as it may still be being written;
+    exports end without one, so it is consumed once the file settles.
+    Returns ingest_sections' counts plus 'mode': 'unchanged', 'appended'
+    or 'full'.
+    """
+    if str(path) == '-':
+        data = sys.stdin.buffer.read()
+        dfs = normalize_sections(load_sections(io.BytesIO(data), content_type))
+        result = ingest_sections(conn, dfs, path, hashlib.sha256(data).hexdigest(), channel)
+        return dict(result, mode='full')
+
+    resolved = str(Path(path).resolve())
+    stat = os.stat(path)
+    cursor = conn.execute(
+        "SELECT size, mtime_ns, offset, prefix_sha256 FROM source_marks WHERE path = ?",
+        (resolved,))
+    row = cursor.fetchone()
+    mark = dict(zip((column[0] for column in cursor.description), row)) if row else None
+    if (mark and (mark['size'], mark['mtime_ns']) == (stat.st_size, stat.st_mtime_ns)
+            and mark['offset'] == mark['size']):
+        return {'rows': 0, 'written': 0, 'mode': 'unchanged'}
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    offset = len(data)
+    if not data.endswith(b'\n') and time.time() - stat.st_mtime < EXPORT_SETTLE:
+        offset = data.rfind(b'\n') + 1
+    consumed = data[:offset]
+    consumed_sha256 = hashlib.sha256(consumed).hexdigest()
+
+    if mark and offset == mark['offset'] and consumed_sha256 == mark['prefix_sha256']:
+        # Nothing but a held-back line since the last ingest
+        result, mode = {'rows': 0, 'written': 0}, 'unchanged'
+    else:
+        appended = _appended_rows(consumed, mark)
+        dfs = normalize_sections(load_sections(
+            io.BytesIO(consumed if appended is None else appended), content_type))
+        # Exports are written at extraction time
+        extraction_date = time.strftime('%Y-%m-%d', time.localtime(stat.st_mtime))
+        result = ingest_sections(conn, dfs, path, consumed_sha256, channel, extraction_date)
+        mode = 'full' if appended is None else 'appended'
+
+    with conn:
+        conn.execute("""
+            INSERT INTO source_marks (path, size, mtime_ns, offset, prefix_sha256)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (path) DO UPDATE SET
+                size = excluded.size, mtime_ns = excluded.mtime_ns,
+                offset = excluded.offset, prefix_sha256 = excluded.prefix_sha256""",
+            (resolved, len(data), stat.st_mtime_ns, offset, consumed_sha256))
+    return dict(result, mode=mode)
+
+# The latest extraction of each treatment in one section, with every metric's
+# Before/After pair; each join is a primary-key or unique-index lookup.
+# {filters} takes the channel and treatment date conditions that are set, so
+# the planner can start from their indexes.
+STORE_QUERY = """
+SELECT v.video_id, v.title, v.url, v.publish_date, t.treatment_date,
+       p.extraction_date, p.before_range, p.after_range, {metric_columns}
+FROM videos v
+JOIN treatments t ON t.video_id = v.video_id
+JOIN periods p ON p.treatment_id = t.treatment_id AND p.period_type = :period
+{metric_joins}
+WHERE v.content_type = :kind{filters}
+  AND p.extraction_date = (SELECT max(q.extraction_date) FROM periods q
+                           WHERE q.treatment_id = t.treatment_id AND q.period_type = :period)
+ORDER BY p.period_id
+"""
+STORE_METRIC_COLUMNS = ', '.join(f'm{i}.before, m{i}.after' for i in range(len(STORE_METRICS)))
+STORE_METRIC_JOINS = '\n'.join(f'LEFT JOIN metric_values m{i} ON m{i}.period_id = p.period_id '
+                               f'AND m{i}.metric = :metric{i}' for i in range(len(STORE_METRICS)))
+
+def query_store(conn, channel=None, treated_since=None, columns=None):
+    """Typed sections (as normalize_sections() returns) from a metrics store.
+
+    Each treated video appears once per section, with its latest extraction.
+    `channel` and `treated_since` (a date) narrow the videos; `columns`
+    keeps only those columns, as in compact mode.
+    """
+    since = treated_since and pd.Timestamp(treated_since).strftime('%Y-%m-%d')
+    dfs = {}
+    for section in SECTION_LABELS:
+        period = _section_period(section)
+        params = {'period': period, 'kind': section.rsplit('_', 1)[0],
+                  'channel': channel, 'since': since,
+                  **{f'metric{i}': metric for i, metric in enumerate(STORE_METRICS)}}
+        rows = conn.execute(STORE_QUERY.format(
+            metric_columns=STORE_METRIC_COLUMNS, metric_joins=STORE_METRIC_JOINS,
+            filters=(' AND v.channel = :channel' if channel else '')
+            + (' AND t.treatment_date >= :since' if since else '')), params).fetchall()
+        if not rows:
+            continue
+        cells = list(zip(*rows))
+        data = {
+            'Video Title': cells[1],
+            'Video ID': cells[0],
+            'URL': cells[2],
+            'Publish Date': pd.to_datetime(pd.Series(cells[3]).replace('', None)),
+            'Treatment Date': pd.to_datetime(pd.Series(cells[4]).replace('', None)),
+            'Extraction Date': pd.to_datetime(pd.Series(cells[5]).replace('', None)),
+            f'{period} Before Period': cells[6],
+            f'{period} After Period': cells[7],
+        }
+        for i, metric in enumerate(STORE_METRICS):
+            before, after = cells[8 + 2 * i], cells[9 + 2 * i]
+            # Metrics no export in the selection had are left out, as when parsing
+            if any(value is not None for value in before + after):
+                data[f'{period} Before {metric}'] = np.array(before, dtype=float)
+                data[f'{period} After {metric}'] = np.array(after, dtype=float)
+
+        df = pd.DataFrame(data)
+        if columns is not None:
+            df = df[[name for name in df.columns if name in columns]]
+        # Counts become int64 (missing: 0) as when parsing an export
+        dfs[section] = normalize_section(df)
+    return dfs
 
-    # Shorts (show top 15)
-    df = dfs['shorts_equal'].copy()
-    ax = axes[1]
-
-    # Calculate changes
-    df['CTR_Change'] = (df['Equal After CTR'].str.rstrip('%').astype(float) -
-                        df['Equal Before CTR'].str.rstrip('%').astype(float))
-
-    # Sort by CTR change and take top 8 and bottom 7
-    df_sorted = df.sort_values('CTR_Change')
-    df_display = pd.concat([df_sorted.head(7), df_sorted.tail(8)])
-
-    changes = pd.DataFrame({
-        'CTR': (df_display['Equal After CTR'].str.rstrip('%').astype(float) -
-                df_display['Equal Before CTR'].str.rstrip('%').astype(float)),
-        'Views': ((df_display['Equal After Views'] - df_display['Equal Before Views']) /
-                  df_display['Equal Before Views'].replace(0, 1) * 100),
-        'Impressions': ((df_display['Equal After Impressions'].astype(float) -
-                        df_display['Equal Before Impressions'].astype(float)) /
-                       df_display['Equal Before Impressions'].astype(float).replace(0, 1) * 100)
-    }, index=[title[:30] + '...' if len(title) > 30 else title
-              for title in df_display['Video Title']])
+def read_store(path, channel=None, treated_since=None, columns=None):
+    """query_store() on a store file."""
+    conn = open_store(path)
+    try:
+        return query_store(conn, channel, treated_since, columns)
+    finally:
+        conn.close()
+
+def source_fingerprint(input_path, args):
+    """Identify an input's data: a hash of its bytes, or for a metrics store
+    of its revision and the --channel/--treated-since filters; None for stdin."""
+    if input_path == '-':
+        return None
+    if not is_metrics_store(input_path):
+        return file_sha256(input_path)
+    conn = open_store(input_path)
+    try:
+        revision = store_revision(conn)
+    finally:
+        conn.close()
+    raw = f"store:{Path(input_path).resolve()}:{revision}:{args.channel}:{args.treated_since}"
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def ingest_inputs(store_path, inputs, args):
+    """Add exports to a metrics store, one channel per file (--channel, else the file name)."""
+    names = channel_names(inputs)
+    conn = open_store(store_path)
+    try:
+        for path, name in zip(inputs, names):
+            channel = args.channel or (None if path == '-' else name)
+            start = time.perf_counter()
+            result = ingest_export(conn, path, args.content_type, channel)
+            label = 'stdin' if path == '-' else path
+            if result['mode'] == 'unchanged':
+                print(f"  - {label}: unchanged since the last ingest")
+            elif not result['rows']:
+                print(f"  - {label}: already in the store")
+            else:
+                appended = ' appended' if result['mode'] == 'appended' else ''
+                print(f"  ✓ {label}: {result['written']} new or changed of {result['rows']}"
+                      f"{appended} rows as channel {channel or '-'} "
+                      f"({time.perf_counter() - start:.2f}s)")
+        videos, periods = conn.execute(
+            "SELECT (SELECT count(*) FROM videos), (SELECT count(*) FROM periods)").fetchone()
+    finally:
+        conn.close()
+    print(f"\n✓ {store_path}: {videos} videos, {periods} extracted periods")
+
+# Parsed sections as seen by pool workers. With the fork start method the
+# parent sets this before the pool starts and workers inherit it without a
+# copy; otherwise it is shipped once per worker through the initializer.
+_worker_dfs = None
+
+def _init_worker(dfs):
+    global _worker_dfs
+    if dfs is not None:
+        _worker_dfs = dfs
+
+def _render_in_worker(index, output_dir, options):
+    return render_figure(index, _worker_dfs, output_dir, options)
+
+def render_figures_parallel(dfs, output_dir, jobs, indices, options=FINAL_RENDER):
+    """Render the given figures in a process pool, yielding (index, file name) in order."""
+    import multiprocessing as mp
+    from concurrent.futures import ProcessPoolExecutor
+
+    global _worker_dfs
+    if 'fork' in mp.get_all_start_methods():
+        context = mp.get_context('fork')
+        _worker_dfs, initargs = dfs, (None,)
+    else:
+        context = mp.get_context()
+        initargs = (dfs,)
+
+    workers = min(jobs, len(indices))
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker, initargs=initargs) as pool:
+            filenames = pool.map(_render_in_worker, indices, [output_dir] * len(indices),
+                                 [options] * len(indices))
+            yield from zip(indices, filenames)
+    finally:
+        _worker_dfs = None
+
+def section_summary(dfs, reuse=None):
+    """Small per-section statistics kept in the manifest for cross-channel summaries.
+
+    `reuse` maps sections known to be unchanged to their earlier statistics,
+    which are kept instead of re-running the bootstrap.
+    """
+    summary = {}
+    for section, df in dfs.items():
+        if not len(df):
+            continue
+        if reuse and section in reuse:
+            summary[section] = reuse[section]
+            continue
+        period = 'Lifetime' if section.endswith('lifetime') else 'Equal'
+        cis = section_change_cis(df, period)
+        summary[section] = {
+            'videos': len(df),
+            'ctr_improved': int((df[f'{period} After CTR'] > df[f'{period} Before CTR']).sum()),
+            'ctr_change': [float(v) for v in cis['CTR']],
+            'views_change': [float(v) for v in cis['Views']],
+            'impressions_change': [float(v) for v in cis['Impressions']],
+        }
+    return summary
+
+def unchanged_summary(previous, section_hashes):
+    """Statistics from an earlier build's manifest for sections whose data is unchanged."""
+    hashes = previous.get('sections', {})
+    return {section: stats for section, stats in previous.get('summary', {}).items()
+            if hashes.get(section) == section_hashes.get(section)}
+
+def normalize_changed_sections(raw, memo, compact=False):
+    """Normalize only the parsed sections that differ from the previous call.
+
+    `memo` (a dict kept by the caller between calls) maps each section to
+    the fingerprint of its raw text table and its normalized table.
+    """
+    dfs = {}
+    for section, df in raw.items():
+        digest = section_fingerprint(df)
+        previous = memo.get(section)
+        if previous is None or previous[0] != digest:
+            df = normalize_section(df)
+            previous = memo[section] = (digest, compact_section(df) if compact else df)
+        dfs[section] = previous[1].copy()
+    for section in set(memo) - set(raw):
+        del memo[section]
+    return dfs
 
-    sns.heatmap(changes, annot=True, fmt='.1f', cmap='RdYlGn', center=0,
-                cbar_kws={'label': 'Change (%)'}, ax=ax, linewidths=0.5)
-    ax.set_title('Shorts (Top/Bottom by CTR)', fontweight='bold')
-    ax.set_xlabel('Metrics')
-    ax.set_ylabel('')
+def load_dataset(input_path, args, source_sha256, memo=None, columns=None):
+    """Parse and normalize an input, or load it from the dataset cache.
+
+    With a `memo` dict (watch mode) the disk cache is skipped and only
+    sections that changed since the last call are normalized again. With
+    `columns` (compact mode) only those columns are read, and the tables
+    are shrunk with compact_section().
+    Returns (dfs, has_data): every section, with empty tables standing in
+    for sections the input lacks, and the FIGURES indices that have any data.
+    """
+    print(f"\nLoading data from: {'stdin' if input_path == '-' else input_path}")
+
+    # A metrics store is queried directly; it needs no dataset cache
+    store = is_metrics_store(input_path)
+    cache_key = None
+    typed_mb = None
+    if source_sha256 and not args.no_cache and memo is None and not store:
+        cache_key = dataset_cache_key(source_sha256, args.content_type, columns)
+    with profile_stage('cache_load'):
+        dfs = load_cached_sections(args.cache_dir, cache_key) if cache_key else None
+    if dfs is not None:
+        print(f"✓ Successfully loaded data (from cache {args.cache_dir})")
+    elif memo is not None and not store:
+        with profile_stage('parse'):
+            dfs = load_sections(input_path, args.content_type, columns)
+        with profile_stage('normalize'):
+            dfs = normalize_changed_sections(dfs, memo.setdefault('raw', {}), columns is not None)
+        print(f"✓ Successfully loaded data")
+    else:
+        if store:
+            with profile_stage('store_query'):
+                dfs = read_store(input_path, args.channel, args.treated_since, columns)
+        else:
+            with profile_stage('parse'):
+                dfs = load_sections(input_path, args.content_type, columns)
+            with profile_stage('normalize'):
+                dfs = normalize_sections(dfs)
+        if columns is not None:
+            typed_mb = table_megabytes(dfs)
+            with profile_stage('compact'):
+                # One section at a time, so only one full-width copy is alive
+                for section in dfs:
+                    dfs[section] = compact_section(dfs[section])
+        if cache_key:
+            with profile_stage('cache_save'):
+                save_cached_sections(args.cache_dir, cache_key, dfs,
+                                     keep=getattr(args, 'cache_keep', CACHE_KEEP))
+        print(f"✓ Successfully loaded data" + (" (from metrics store)" if store else ""))
+    for section, label in SECTION_LABELS.items():
+        if section in dfs:
+            print(f"  - {label}: {len(dfs[section])} videos")
+    if columns is not None:
+        kept = sum(len(df.columns) for df in dfs.values())
+        print(f"✓ Compact mode: {kept} columns, {table_megabytes(dfs):.1f} MB in memory"
+              + (f" ({typed_mb:.1f} MB before downcasting)" if typed_mb is not None else ""))
+
+    # Batch exports may only cover some sections: draw figures that have
+    # any data, with empty tables standing in for the missing sections
+    has_data = [index for index, figure in enumerate(FIGURES)
+                if any(len(dfs.get(section, ())) for section in figure.sections)]
+    for section in SECTION_LABELS:
+        if section not in dfs:
+            dfs[section] = empty_section(section)
+    return dfs, has_data
+
+def render_options(args):
+    outputs = parse_outputs(args.outputs) if args.outputs else None
+    return RenderOptions(outputs[0].format if outputs else args.format, args.preview,
+                         args.top_k, outputs)
+
+def build_visualizations(input_path, output_dir, args, selected, jobs=1, memo=None):
+    """Render the selected figures for one input into output_dir.
+
+    Returns the run's summary: figures rendered and available, and the
+    per-section statistics from section_summary().
+    """
+    output_dir = Path(output_dir)
+    options = render_options(args)
+    settings_key = render_settings_key(options)
+    # stdin can't be hashed up front; its figures are still checked section by section
+    with profile_stage('hash_source'):
+        source_sha256 = source_fingerprint(input_path, args)
+    source_key = source_sha256 and f"{source_sha256}:{args.content_type}"
+    manifest = {} if args.force else load_manifest(output_dir)
+
+    if is_up_to_date(manifest, output_dir, source_key, settings_key,
+                     [filename for index in selected
+                      for filename in output_filenames(FIGURES[index], options)]):
+        print(f"\n✓ All {len(selected)} {'selected ' if args.only else ''}visualizations "
+              f"are up to date with {input_path}")
+        print(f"  (use --force to re-render) Output: {output_dir.absolute()}")
+        return {'rendered': 0,
+                'figures': sum(output_filename(figure, options) in manifest['figures']
+                               for figure in FIGURES),
+                'sections': manifest.get('summary', {})}
+
+    columns = compact_columns(selected) if args.compact else None
+    dfs, has_data = load_dataset(input_path, args, source_sha256, memo, columns)
+    available = [index for index in selected if index in has_data]
+
+    # Create output directory
+    output_dir.mkdir(parents=True, exist_ok=True)
+    print(f"\n✓ Created output directory: {output_dir}")
+
+    # Work out which figures' inputs changed since the last build
+    with profile_stage('fingerprint'):
+        section_hashes = {section: section_fingerprint(df) for section, df in dfs.items()}
+    keys = [figure_key(figure, section_hashes, settings_key) for figure in FIGURES]
+    # Each of a figure's output files is recorded under the figure's key
+    outputs = [output_filenames(figure, options) for figure in FIGURES]
+    filenames = [names[0] for names in outputs]
+    built = manifest.get('figures', {})
+    stale = [index for index in available
+             if any(built.get(filename) != keys[index] or not (output_dir / filename).exists()
+                    for filename in outputs[index])]
+
+    # Carry over every output that still matches its key, selected or not,
+    # so a later run over a different selection can trust the manifest
+    with profile_stage('section_summary'):
+        summary = section_summary(dfs, unchanged_summary(manifest, section_hashes)
+                                  if manifest.get('settings') == settings_key else None)
+    manifest = {
+        'source': str(input_path),
+        'source_key': source_key,
+        'settings': settings_key,
+        'sections': section_hashes,
+        'summary': summary,
+        'figures': {filename: keys[index] for index in has_data if index not in stale
+                    for filename in outputs[index] if built.get(filename) == keys[index]},
+        'skipped': [filename for index in range(len(FIGURES)) if index not in has_data
+                    for filename in outputs[index]],
+    }
+
+    # Generate visualizations
+    if jobs > 1 and len(stale) > 1:
+        print(f"\nGenerating visualizations ({min(jobs, len(stale))} workers)...")
+        rendered = render_figures_parallel(dfs, output_dir, jobs, stale, options)
+    else:
+        print("\nGenerating visualizations...")
+        rendered = ((index, render_figure(index, dfs, output_dir, options)) for index in stale)
+
+    try:
+        for index in selected:
+            figure = FIGURES[index]
+            print(f"  {index + 1}. {figure.label}...")
+            if index not in available:
+                print(f"     - Skipped: no data for {', '.join(figure.sections)}")
+                continue
+            if index not in stale:
+                print(f"     ✓ Up to date: {filenames[index]}")
+                continue
+            _, filename = next(rendered)
+            manifest['figures'].update(dict.fromkeys(outputs[index], keys[index]))
+            more = len(outputs[index]) - 1
+            print(f"     ✓ Saved: {filename}" + (f" (+{more} more)" if more else ""))
+    finally:
+        rendered.close()
+        save_manifest(output_dir, manifest)
+
+    print("\n" + "=" * 50)
+    print("✓ All visualizations generated successfully!")
+    print(f"\nGenerated {len(stale)} of {len(available)} visualization files "
+          f"({len(available) - len(stale)} up to date):")
+    for index in available:
+        print(f"  {index + 1}. {FIGURES[index].summary}")
+    print(f"\nOutput files saved in: {output_dir.absolute()}")
+    return {'rendered': len(stale), 'figures': len(available), 'sections': summary}
+
+# Self-contained HTML report: the normalized data is embedded once as JSON and
+# report_template.html draws every chart from it in the browser
+HTML_REPORT_NAME = "report.html"
+HTML_TEMPLATE = Path(__file__).with_name("report_template.html")
+# Before/After columns embedded per video, when the section has them
+REPORT_METRICS = ('CTR', 'Views', 'Impressions', 'AWT', 'Retention')
+
+def _report_column(values, decimals=2):
+    """A column as a JSON-ready list: rounded, whole numbers as ints, NaN as null."""
+    values = np.round(np.asarray(values, dtype=float), decimals).tolist()
+    return [None if v != v else int(v) if v.is_integer() else v for v in values]
+
+def report_payload(dfs, indices, summary, top_k=None):
+    """Everything report_template.html draws, using the same metric definitions as the PNGs.
+
+    Per section: titles and Before/After values per video, the summary
+    chart's improvement counts, the bootstrap CIs from section_summary(),
+    and for equal-duration sections the heatmap's change columns.
+    """
+    sections = {}
+    for section, label in SECTION_LABELS.items():
+        df = dfs[section]
+        if not len(df):
+            continue
+        period = 'Lifetime' if section.endswith('lifetime') else 'Equal'
+        entry = {
+            'label': label,
+            'period': period,
+            'titles': df['Video Title'].astype(object).fillna('').astype(str).tolist(),
+            'metrics': {metric: [_report_column(df[f'{period} Before {metric}']),
+                                 _report_column(df[f'{period} After {metric}'])]
+                        for metric in REPORT_METRICS if f'{period} Before {metric}' in df},
+            'cis': {metric: [None if v != v else round(v, 4) for v in summary[section][key]]
+                    for metric, key in (('CTR', 'ctr_change'), ('Views', 'views_change'),
+                                        ('Impressions', 'impressions_change'))},
+        }
+        if section in SUMMARY_METRICS:
+            entry['improved'] = improvement_counts(df, SUMMARY_METRICS[section])
+        if period == 'Equal':
+            changes = _heatmap_changes(df)
+            entry['changes'] = {column: _report_column(changes[column], 1)
+                                for column in changes.columns}
+        sections[section] = entry
+    return {
+        'figures': [{'name': FIGURES[index].name, 'label': FIGURES[index].summary}
+                    for index in indices],
+        'sections': sections,
+        'settings': {'aggregate_rows': AGGREGATE_ROWS, 'histogram_bins': HISTOGRAM_BINS,
+                     'heatmap_annotate_rows': HEATMAP_ANNOTATE_ROWS,
+                     'confidence': BOOTSTRAP_CONFIDENCE,
+                     'ranking': {name: ranking_k(name, top_k) for name in RANKING_K}},
+    }
+
+def write_html_report(path, payload, source):
+    """Fill report_template.html with the payload; returns the report's size in bytes."""
+    with open(HTML_TEMPLATE, 'r', encoding='utf-8') as f:
+        template = f.read()
+    # Compact JSON, with "</" escaped so a title can't close the script element
+    data = json.dumps(payload, separators=(',', ':'), ensure_ascii=False).replace('</', '<\\/')
+    report = (template.replace('{{SOURCE}}', html.escape(source))
+                      .replace('{{REPORT_DATA}}', data))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(report)
+    return len(report.encode('utf-8'))
+
+def build_html_report(input_path, output_dir, args, selected, jobs=1, memo=None):
+    """Write one self-contained HTML report with the selected figures' charts.
+
+    Parses the input once and never imports matplotlib. Returns the same
+    summary as build_visualizations().
+    """
+    output_dir = Path(output_dir)
+    with profile_stage('hash_source'):
+        source_sha256 = source_fingerprint(input_path, args)
+    columns = compact_columns(selected, html=True) if args.compact else None
+    dfs, has_data = load_dataset(input_path, args, source_sha256, memo, columns)
+    available = [index for index in selected if index in has_data]
+
+    with profile_stage('section_summary'):
+        if memo is None:
+            summary = section_summary(dfs)
+        else:
+            # Watch mode: keep the statistics of sections that didn't change
+            section_hashes = {section: section_fingerprint(df) for section, df in dfs.items()}
+            summary = section_summary(dfs, unchanged_summary(memo.get('report', {}), section_hashes))
+            memo['report'] = {'sections': section_hashes, 'summary': summary}
+    with profile_stage('report'):
+        payload = report_payload(dfs, available, summary, args.top_k)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        path = output_dir / HTML_REPORT_NAME
+        size = write_html_report(path, payload, 'stdin' if input_path == '-' else Path(input_path).name)
+
+    print("\n" + "=" * 50)
+    print(f"✓ HTML report with {len(available)} charts: {path.absolute()} ({size / 1024:,.0f} KB)")
+    for index in selected:
+        if index not in available:
+            print(f"  - Skipped {FIGURES[index].summary}: no data for "
+                  f"{', '.join(FIGURES[index].sections)}")
+    return {'rendered': len(available), 'figures': len(available), 'sections': summary}
+
+# Watch mode: poll the input file and rebuild in this already-warm process
+WATCH_INTERVAL = 0.25  # seconds between checks of the input file
+WATCH_SETTLE = 0.1  # the file must look unchanged this long before it is read
+
+def _file_state(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def watch_input(input_path, output_dir, args, selected, jobs=1):
+    """Rebuild whenever the input changes, until interrupted.
+
+    Imports, fonts and the normalized sections stay loaded between builds;
+    each rebuild re-normalizes only changed sections and re-renders only
+    the figures whose sections changed.
+    """
+    global _profiler
+    build = build_html_report if args.html else build_visualizations
+    memo = {}
+    built_state = None
+    print(f"\nWatching {input_path} for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            state = _file_state(input_path)
+            if state is None or state == built_state:
+                time.sleep(WATCH_INTERVAL)
+                continue
+            # Give an editor or export still writing the file time to finish
+            time.sleep(WATCH_SETTLE)
+            if _file_state(input_path) != state:
+                continue
+            built_state = state
+            if args.profile:
+                _profiler = StageProfiler()
+            start = time.perf_counter()
+            try:
+                with profile_stage('run'):
+                    build(input_path, output_dir, args, selected, jobs, memo=memo)
+            except Exception as e:
+                print(f"\n✗ ERROR: {str(e)}")
+                traceback.print_exc()
+            if _profiler is not None:
+                _profiler.write(Path(output_dir) / PROFILE_NAME)
+            print(f"\n✓ Refreshed in {time.perf_counter() - start:.2f} s "
+                  f"- watching {input_path} (Ctrl+C to stop)")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+# In-process rendering: a dashboard imports render() (or talks to --serve)
+# instead of starting this script and reading files back for every image
+SERVE_HOST = '127.0.0.1'
+CACHE_MB = 256
+OUTPUT_MEDIA_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml',
+                      'pdf': 'application/pdf', 'webp': 'image/webp'}
+
+def figure_index(name):
+    """FIGURES index of one figure name or number."""
+    indices = select_figures(str(name))
+    if len(indices) != 1:
+        raise ValueError(f"expected one figure, got '{name}'")
+    return indices[0]
+
+def load_figure_data(source, content_type='auto', channel=None, treated_since=None):
+    """Normalized sections for render(), from an export or metrics store path or
+    an export's bytes; sections the input lacks are empty tables."""
+    if isinstance(source, (bytes, bytearray)):
+        dfs = normalize_sections(load_sections(io.BytesIO(source), content_type))
+    elif is_metrics_store(source):
+        dfs = read_store(source, channel, treated_since)
+    else:
+        dfs = normalize_sections(load_sections(source, content_type))
+    for section in SECTION_LABELS:
+        if section not in dfs:
+            dfs[section] = empty_section(section)
+    return dfs
+
+def render(figure_name, data, fmt='png', dpi=None, preview=False, top_k=None):
+    """Render one figure to image bytes in memory.
+
+    `data` is what load_figure_data() returns, or anything it accepts (then
+    parsed on every call). `fmt` is one of OUTPUT_FORMATS and `dpi` defaults
+    to the file output's. Not thread-safe: figures are drawn into shared
+    templates.
+
+        dfs = load_figure_data('export.tsv')
+        png = render('heatmap', dfs)
+        svg = render('top-performers', dfs, 'svg', top_k=10)
+    """
+    index = figure_index(figure_name)
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"unknown format '{fmt}' (choose from {', '.join(OUTPUT_FORMATS)})")
+    dfs = data if isinstance(data, dict) else load_figure_data(data)
+    figure = FIGURES[index]
+    if not any(len(dfs.get(section, ())) for section in figure.sections):
+        raise ValueError(f"no data for {', '.join(figure.sections)}")
+    options = RenderOptions(fmt, preview, top_k, (Output(fmt, dpi),))
+    fig = draw_figure(index, dfs, options)
+    return next(figure_outputs(fig, options))[1]
+
+class RenderCache:
+    """Rendered images by key; the least recently used go first once the
+    total passes `max_bytes`."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        self.size += len(data) - len(self._entries.pop(key, b''))
+        self._entries[key] = data
+        while self.size > self.max_bytes:
+            _, dropped = self._entries.popitem(last=False)
+            self.size -= len(dropped)
+
+class RenderService:
+    """What --serve keeps warm: each input's normalized sections, re-read only
+    when its file changes, and rendered images keyed by the input's data hash
+    and the render options."""
+
+    def __init__(self, input_path, args):
+        self.args = args
+        self.input_path = input_path
+        self.batch = Path(input_path).is_dir() or glob.has_magic(input_path)
+        paths = find_inputs(input_path) if self.batch else [Path(input_path)]
+        self.inputs = dict(zip(channel_names(paths), paths))
+        self.cache = RenderCache(args.cache_mb * 1024 * 1024)
+        self.lock = threading.Lock()
+        self._datasets = {}
+
+    def dataset(self, channel=None):
+        """(data hash, sections) of one export, or of a store's channel."""
+        if self.batch:
+            if channel is None and len(self.inputs) == 1:
+                channel = next(iter(self.inputs))
+            if channel not in self.inputs:
+                raise LookupError(f"unknown channel '{channel}' (see /)" if channel else
+                                  "pass ?channel= to pick an export (see /)")
+            path, store_channel = self.inputs[channel], None
+        else:
+            path, store_channel = Path(self.input_path), channel or self.args.channel
+        key = (path, store_channel)
+        state = _file_state(path)
+        entry = self._datasets.get(key)
+        if entry is None or entry[0] != state:
+            args = argparse.Namespace(**{**vars(self.args), 'channel': store_channel})
+            fingerprint = source_fingerprint(path, args)
+            if entry is None or entry[1] != fingerprint:
+                dfs = load_figure_data(path, self.args.content_type, store_channel,
+                                       self.args.treated_since)
+            else:
+                dfs = entry[2]
+            entry = self._datasets[key] = (state, fingerprint, dfs)
+        return entry[1], entry[2]
+
+    def image(self, figure_name, fmt='png', dpi=None, preview=False, top_k=None, channel=None):
+        """(cache key, bytes) of a figure, rendered only on a cache miss."""
+        try:
+            name = FIGURES[figure_index(figure_name)].name
+        except ValueError as e:
+            raise LookupError(str(e)) from None
+        with self.lock:
+            fingerprint, dfs = self.dataset(channel)
+            key = (fingerprint, self.args.content_type, name, fmt, dpi, preview, top_k)
+            data = self.cache.get(key)
+            if data is None:
+                data = render(name, dfs, fmt, dpi, preview, top_k)
+                self.cache.put(key, data)
+        return key, data
+
+    def index(self):
+        return {
+            'figures': [{'name': figure.name, 'number': number + 1, 'label': figure.label,
+                         'path': f'/figures/{figure.name}.png'}
+                        for number, figure in enumerate(FIGURES)],
+            'formats': list(OUTPUT_FORMATS),
+            'channels': list(self.inputs) if self.batch else [],
+            'cache': {'images': len(self.cache), 'bytes': self.cache.size,
+                      'max_bytes': self.cache.max_bytes,
+                      'hits': self.cache.hits, 'misses': self.cache.misses},
+        }
+
+def _query_int(query, name):
+    value = query.get(name, [None])[-1]
+    if value is None:
+        return None
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError(f"{name} must be a positive whole number")
+    return int(value)
+
+def figure_server(input_path, args):
+    """An HTTP server on SERVE_HOST:args.serve answering from a RenderService.
+
+    GET /                               figures, formats, channels and cache stats (JSON)
+    GET /figures/<name>.<format>        one figure; query: dpi, top_k, preview=1,
+                                        channel (batch folder or metrics store)
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlsplit
+
+    service = RenderService(input_path, args)
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body, media_type, etag=None):
+            self.send_response(status)
+            self.send_header('Content-Type', media_type)
+            self.send_header('Content-Length', str(len(body)))
+            if etag:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status, payload):
+            self._send(status, json.dumps(payload, indent=2).encode('utf-8'), 'application/json')
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            query = parse_qs(url.query)
+            if url.path in ('', '/'):
+                self._send_json(200, service.index())
+                return
+            match = re.fullmatch(r'/figures/([\w-]+)\.(\w+)', url.path)
+            if not match:
+                self._send_json(404, {'error': f"no such path: {url.path}"})
+                return
+            try:
+                key, data = service.image(
+                    match.group(1), match.group(2).lower(), _query_int(query, 'dpi'),
+                    query.get('preview', ['0'])[-1] not in ('', '0', 'false'),
+                    _query_int(query, 'top_k'), query.get('channel', [None])[-1])
+            except LookupError as e:
+                self._send_json(404, {'error': str(e)})
+                return
+            except ValueError as e:
+                self._send_json(400, {'error': str(e)})
+                return
+            etag = '"' + hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:32] + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            self._send(200, data, OUTPUT_MEDIA_TYPES[key[3]], etag)
+
+        def log_message(self, format, *log_args):
+            print(f"  {self.address_string()} {format % log_args}")
+
+    return ThreadingHTTPServer((SERVE_HOST, args.serve), Handler)
+
+def serve_figures(input_path, args):
+    """Run figure_server() until interrupted."""
+    server = figure_server(input_path, args)
+    print(f"\nServing figures for {input_path} on http://{SERVE_HOST}:{server.server_port}/ "
+          f"(cache {args.cache_mb} MB, Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopped serving")
+    finally:
+        server.server_close()
+
+# Batch mode: one export per channel, each built in its own worker process
+EXPORT_SUFFIXES = ('.csv', '.tsv', '.txt')
+BATCH_SUMMARY_CSV = "channel_summary.csv"
+BATCH_SUMMARY_CHART = "channel_summary"  # written in every --format/--outputs
+BATCH_LOG_NAME = "build.log"
+
+def find_inputs(pattern):
+    """Expand --input into export files: a file, '-', a directory or a glob."""
+    if pattern == '-':
+        return ['-']
+    path = Path(pattern)
+    if path.is_dir():
+        return sorted(p for p in path.iterdir()
+                      if p.is_file() and p.suffix.lower() in EXPORT_SUFFIXES)
+    if glob.has_magic(pattern):
+        return sorted(Path(p) for p in glob.glob(pattern) if Path(p).is_file())
+    return [path]
+
+def channel_names(paths):
+    """Output folder name per export: its file name stem, made unique."""
+    names, seen = [], {}
+    for path in paths:
+        base = re.sub(r'[^\w.-]+', '_', Path(path).stem).strip('._') or 'channel'
+        seen[base] = seen.get(base, 0) + 1
+        names.append(base if seen[base] == 1 else f"{base}-{seen[base]}")
+    return names
+
+def _init_batch_worker(megabytes):
+    # One BLAS thread per worker: the pool already has one worker per core,
+    # and per-thread buffers count against --worker-memory
+    for name in ('OPENBLAS_NUM_THREADS', 'OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ.setdefault(name, '1')
+    if megabytes:
+        import resource
+        limit = megabytes * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+def _build_channel(input_path, output_dir, args, selected):
+    """Batch worker: build one channel, logging to its folder instead of stdout."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    global _profiler
+    log = io.StringIO()
+    if args.profile:
+        _profiler = StageProfiler()
+    try:
+        build = build_html_report if args.html else build_visualizations
+        with contextlib.redirect_stdout(log), profile_stage('run'):
+            result = build(input_path, output_dir, args, selected)
+        result['error'] = None
+    except Exception as e:
+        traceback.print_exc(file=log)
+        result = {'rendered': 0, 'figures': 0, 'sections': {},
+                  'error': f"{type(e).__name__}: {e}" if str(e) else type(e).__name__}
+    with open(output_dir / BATCH_LOG_NAME, 'w', encoding='utf-8') as f:
+        f.write(log.getvalue())
+    if _profiler is not None:
+        _profiler.write(output_dir / PROFILE_NAME)
+    return result
+
+def _run_batch_pool(tasks, args, selected, workers, context):
+    """Run (path, name, output_dir) tasks in one pool, yielding (path, name, result).
+
+    Stops at the first worker crash; the tasks it didn't finish are yielded
+    with result None.
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from concurrent.futures.process import BrokenProcessPool
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             max_tasks_per_child=1, initializer=_init_batch_worker,
+                             initargs=(args.worker_memory,)) as pool:
+        futures = {pool.submit(_build_channel, path, output_dir, args, selected): (path, name)
+                   for path, name, output_dir in tasks}
+        for future in as_completed(futures):
+            path, name = futures[future]
+            try:
+                yield path, name, future.result()
+            except BrokenProcessPool:
+                yield path, name, None
+
+def build_batch(inputs, output_root, args, selected, jobs):
+    """Build every channel export concurrently, yielding (path, name, result) as each finishes.
+
+    Each worker handles one file and is then replaced, so a large export
+    can't leave a worker holding its memory for the rest of the batch. If a
+    worker dies (e.g. at --worker-memory), the pool is lost; the exports it
+    didn't finish are retried one per pool so only the culprit fails.
+    """
+    import multiprocessing as mp
+
+    names = channel_names(inputs)
+    # Keep every channel's parsed dataset cached, not just the last few
+    args.cache_keep = max(CACHE_KEEP, 2 * len(inputs))
+    context = mp.get_context('forkserver' if 'forkserver' in mp.get_all_start_methods()
+                             else 'spawn')
+    tasks = [(path, name, Path(output_root) / name) for path, name in zip(inputs, names)]
+
+    unfinished = []
+    for path, name, result in _run_batch_pool(tasks, args, selected,
+                                              min(jobs, len(tasks)), context):
+        if result is None:
+            unfinished.append((path, name, Path(output_root) / name))
+        else:
+            yield path, name, result
+
+    for task in unfinished:
+        for path, name, result in _run_batch_pool([task], args, selected, 1, context):
+            yield path, name, result or {
+                'rendered': 0, 'figures': 0, 'sections': {},
+                'error': "worker process died (out of memory?)"}
+
+def write_channel_summary(output_root, results, options=FINAL_RENDER):
+    """Write the cross-channel summary table and chart; returns the CSV path
+    and the chart's files (one per output of `options`)."""
+    output_root = Path(output_root)
+    fields = ['channel', 'source', 'status', 'figures', 'rendered']
+    for section in SECTION_LABELS:
+        fields += [f'{section}_videos', f'{section}_ctr_improved', f'{section}_ctr_change',
+                   f'{section}_ctr_change_low', f'{section}_ctr_change_high']
+    with open(output_root / BATCH_SUMMARY_CSV, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        for name, path, result in results:
+            row = {'channel': name, 'source': str(path),
+                   'status': result['error'] or ('ok' if result['sections'] else 'no data'),
+                   'figures': result['figures'], 'rendered': result['rendered']}
+            for section, stats in result['sections'].items():
+                mean, low, high = stats['ctr_change']
+                row.update({f'{section}_videos': stats['videos'],
+                            f'{section}_ctr_improved': stats['ctr_improved'],
+                            f'{section}_ctr_change': round(mean, 4),
+                            f'{section}_ctr_change_low': round(low, 4),
+                            f'{section}_ctr_change_high': round(high, 4)})
+            writer.writerow(row)
+
+    fig = create_channel_summary(results)
+    apply_layout(fig, 'channel-summary', options)
+    rasterize_dense_layers(fig)
+    chart_paths = [output_root / name for name in stem_filenames(BATCH_SUMMARY_CHART, options)]
+    for path, (_, data) in zip(chart_paths, figure_outputs(fig, options)):
+        path.write_bytes(data)
+    plt.close(fig)
+    return output_root / BATCH_SUMMARY_CSV, chart_paths
+
+def create_channel_summary(results):
+    """Average CTR change with its bootstrap CI for every channel, per content type."""
+    results = [(name, result) for name, _, result in results if not result['error']]
+    fig, axes = plt.subplots(1, 2, figsize=(16, max(4, 0.4 * len(results) + 2)))
+    fig.suptitle('Average CTR Change by Channel (Equal Duration)',
+                 fontsize=16, fontweight='bold')
+
+    for ax, section, title in ((axes[0], 'longform_equal', 'Long Form Videos'),
+                               (axes[1], 'shorts_equal', 'Shorts')):
+        rows = [(name, result['sections'][section]) for name, result in results
+                if section in result['sections']]
+        if not rows:
+            _draw_no_data(ax)
+            ax.set_title(title, fontweight='bold')
+            continue
+        means = np.array([stats['ctr_change'] for _, stats in rows])
+        y_pos = np.arange(len(rows))
+        ax.barh(y_pos, means[:, 0], alpha=0.7,
+                color=np.where(means[:, 0] > 0, '#10b981', '#ef4444'))
+        ax.errorbar(means[:, 0], y_pos, xerr=[means[:, 0] - means[:, 1], means[:, 2] - means[:, 0]],
+                    fmt='none', ecolor='black', elinewidth=1, capsize=3)
+        ax.set_yticks(y_pos)
+        ax.set_yticklabels([f"{name} ({stats['videos']})" for name, stats in rows], fontsize=9)
+        ax.invert_yaxis()
+        ax.axvline(x=0, color='black', linewidth=0.8)
+        ax.set_xlabel(f'CTR Change (pp), {BOOTSTRAP_CONFIDENCE:.0%} CI')
+        ax.set_title(title, fontweight='bold')
 
-    plt.tight_layout()
     return fig
 
 def main():
     """Main function to generate all visualizations."""
+    global _profiler
+    parser = argparse.ArgumentParser(
+        description="Generate PNG charts from the YouTube Metrics Comparison CSV or a batch export",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python generate_visualizations.py
+  python generate_visualizations.py --jobs 8
+  python generate_visualizations.py --input youtube-metrics-batch-1731000000000.csv
+  pbpaste | python generate_visualizations.py --input - --content-type shorts
+  python generate_visualizations.py --force   # ignore the build manifest
+  python generate_visualizations.py --list
+  python generate_visualizations.py --only 1,heatmap
+  python generate_visualizations.py --preview
+  python generate_visualizations.py --format svg
+  python generate_visualizations.py --html
+  python generate_visualizations.py --outputs png,svg,pdf,webp@40
+  python generate_visualizations.py --watch --preview
+  python generate_visualizations.py --input exports/ --serve 8765
+  python generate_visualizations.py --input big-export.tsv --compact --preview
+  python generate_visualizations.py --force --profile
+  python generate_visualizations.py --input exports/ --jobs 8 --output reports
+  python generate_visualizations.py --input "exports/*-metrics.tsv" --worker-memory 2048
+  python generate_visualizations.py --input exports/ --ingest metrics.sqlite
+  python generate_visualizations.py --input metrics.sqlite --channel jstb --treated-since 2025-09-01
+        """
+    )
+    parser.add_argument(
+        "--input", "-i",
+        default=DEFAULT_INPUT,
+        help="Comparison sheet CSV or batch export TSV, '-' for stdin, or a metrics "
+             "store made with --ingest (default: the JSTB comparison spreadsheet)"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        default=OUTPUT_DIR,
+        help=f"Output folder; in batch mode one subfolder per channel (default: {OUTPUT_DIR})"
+    )
+    parser.add_argument(
+        "--content-type",
+        choices=["auto", "longform", "shorts"],
+        default="auto",
+        help="For batch exports: treat every row as long form or Shorts "
+             "(default: auto, from the long-form marker or URL)"
+    )
+    parser.add_argument(
+        "--ingest",
+        metavar="STORE",
+        help="Add the input exports (a file, directory or glob) to this SQLite metrics "
+             "store and exit; only new or changed rows are written, so re-running it "
+             "over a growing export folder is cheap. Render later with --input STORE"
+    )
+    parser.add_argument(
+        "--channel",
+        help="Channel name recorded when ingesting (default: the export's file name), "
+             "or the channel read from a metrics store (default: all)"
+    )
+    parser.add_argument(
+        "--treated-since",
+        metavar="DATE",
+        help="Metrics store input: only videos treated on or after DATE (YYYY-MM-DD)"
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Render figures in N worker processes, or in batch mode build N exports "
+             "at once (default: 1, 0 = one per CPU)"
+    )
+    parser.add_argument(
+        "--worker-memory",
+        type=int,
+        metavar="MB",
+        help="Batch mode: cap each worker's address space at MB megabytes (POSIX only)"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=CACHE_DIR,
+        help=f"Where parsed datasets are cached (default: {CACHE_DIR})"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always re-parse the input instead of using the dataset cache"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-render every figure even if its inputs are unchanged"
+    )
+    parser.add_argument(
+        "--only",
+        metavar="FIGURES",
+        help="Render only these figures, by number or name, comma-separated (e.g. 1,heatmap)"
+    )
+    parser.add_argument(
+        "--list",
+        action="store_true",
+        help="List the available figures and exit"
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="png",
+        help="Figure file format; SVG and PDF keep text and axes vector and "
+             "rasterize dense layers (default: png)"
+    )
+    parser.add_argument(
+        "--outputs",
+        metavar="FORMAT[@DPI],...",
+        help="Write every figure to several files in one pass, e.g. 'png,png@96,svg,webp@40'; "
+             "each figure is laid out once, and smaller PNG/WebP sizes are resampled from "
+             "the largest (overrides --format)"
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help=f"Quick low-resolution render ({PREVIEW_DPI} dpi, fixed layout) while iterating"
+    )
+    parser.add_argument(
+        "--html",
+        action="store_true",
+        help=f"Write one self-contained {HTML_REPORT_NAME} with interactive charts "
+             f"instead of the PNG files"
+    )
+    parser.add_argument(
+        "--serve",
+        type=int,
+        metavar="PORT",
+        help=f"Serve figures over HTTP on {SERVE_HOST}:PORT from the parsed input kept in "
+             "memory, e.g. GET /figures/heatmap.svg?top_k=10 (0 = any free port)"
+    )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=CACHE_MB,
+        help=f"With --serve: memory for rendered images, least recently used "
+             f"dropped first (default: {CACHE_MB})"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and rebuild whenever the input file changes "
+             "(combine with --preview for the fastest refreshes)"
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        metavar="K",
+        help="Videos shown at each end of the ranking charts (top performers, "
+             "Shorts lifetime, Shorts heatmap); default: 5, 10 and 7/8"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="For very large exports: load only the columns the selected figures read, "
+             "as int32 counts, float32 rates and categorical titles, and report the memory saved"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=f"Write per-stage wall/CPU time, peak memory and artist counts to "
+             f"{PROFILE_NAME} (and collapsed stacks for flamegraphs) in the output folder; "
+             f"figures render in-process"
+    )
+    args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+
+    if args.list:
+        print_figure_list()
+        return
+    try:
+        selected = select_figures(args.only) if args.only else list(range(len(FIGURES)))
+    except ValueError as e:
+        parser.error(str(e))
+    if not selected:
+        parser.error("--only needs at least one figure")
+    if args.top_k is not None and args.top_k < 1:
+        parser.error("--top-k must be at least 1")
+    if args.outputs is not None:
+        try:
+            parse_outputs(args.outputs)
+        except ValueError as e:
+            parser.error(f"--outputs: {e}")
+    if args.treated_since:
+        try:
+            pd.Timestamp(args.treated_since)
+        except ValueError:
+            parser.error(f"--treated-since: not a date: {args.treated_since}")
+
     print("YouTube Metrics Visualization Generator")
     print("=" * 50)
 
-    # Find the CSV file
-    csv_file = "JSTB spreadsheet (Extension) - YouTube Metrics Comparison.csv"
+    input_path = args.input
+    # A directory or glob of exports (one per channel) switches to batch mode
+    batch = input_path != '-' and (Path(input_path).is_dir() or
+                                   (glob.has_magic(input_path) and not Path(input_path).exists()))
 
-    if not Path(csv_file).exists():
-        print(f"ERROR: Could not find {csv_file}")
+    if not batch and input_path != '-' and not Path(input_path).exists():
+        print(f"ERROR: Could not find {input_path}")
         print("Please make sure the CSV file is in the same directory as this script.")
         return
 
-    print(f"\nLoading data from: {csv_file}")
-
-    try:
-        dfs = parse_csv_sections(csv_file)
-        print(f"✓ Successfully loaded data")
-        print(f"  - Long Form Equal: {len(dfs['longform_equal'])} videos")
-        print(f"  - Long Form Lifetime: {len(dfs['longform_lifetime'])} videos")
-        print(f"  - Shorts Equal: {len(dfs['shorts_equal'])} videos")
-        print(f"  - Shorts Lifetime: {len(dfs['shorts_lifetime'])} videos")
+    if args.ingest:
+        inputs = find_inputs(input_path)
+        if not inputs:
+            print(f"ERROR: No exports found in {input_path}")
+            return
+        print(f"\nIngesting {len(inputs)} export{'s' if len(inputs) > 1 else ''} into {args.ingest}")
+        ingest_inputs(args.ingest, inputs, args)
+        return
 
-        # Create output directory
-        output_dir = Path("visualizations")
-        output_dir.mkdir(exist_ok=True)
-        print(f"\n✓ Created output directory: {output_dir}")
+    if args.watch and (batch or input_path == '-'):
+        parser.error("--watch needs a single input file")
+    if args.serve is not None:
+        if input_path == '-':
+            parser.error("--serve needs an input file, folder or metrics store")
+        if args.cache_mb < 1:
+            parser.error("--cache-mb must be at least 1")
+        serve_figures(input_path, args)
+        return
 
-        # Generate visualizations
-        print("\nGenerating visualizations...")
+    if not batch:
+        if args.profile:
+            # Worker processes would escape the profiler; time every figure here instead
+            _profiler, jobs = StageProfiler(), 1
+        if args.watch:
+            watch_input(input_path, args.output, args, selected, jobs)
+            return
+        try:
+            build = build_html_report if args.html else build_visualizations
+            with profile_stage('run'):
+                build(input_path, args.output, args, selected, jobs)
+            if _profiler is not None:
+                profile_path = _profiler.write(Path(args.output) / PROFILE_NAME)
+                print(f"\n✓ Profile written to {profile_path} "
+                      f"(and {profile_path.with_suffix('.folded').name})")
+            if args.html:
+                print("\nOpen the report in any browser; it needs no other files.")
+            else:
+                print("\nYou can now:")
+                print("  1. Open the PNG files to view them")
+                print("  2. Copy/paste them into your Google Sheet")
+                print("  3. Use them in presentations")
+        except Exception as e:
+            print(f"\n✗ ERROR: {str(e)}")
+            traceback.print_exc()
+        return
 
-        print("  1. Summary Statistics...")
-        fig1 = create_summary_stats(dfs)
-        fig1.savefig(output_dir / "1_summary_stats.png", dpi=300, bbox_inches='tight')
-        plt.close(fig1)
-        print("     ✓ Saved: 1_summary_stats.png")
-
-        print("  2. Top & Bottom Performers...")
-        fig2 = create_top_performers(dfs)
-        fig2.savefig(output_dir / "2_top_performers.png", dpi=300, bbox_inches='tight')
-        plt.close(fig2)
-        print("     ✓ Saved: 2_top_performers.png")
-
-        print("  3. Long Form - Metrics Comparison...")
-        fig3 = create_metrics_comparison(dfs)
-        fig3.savefig(output_dir / "3_longform_metrics_comparison.png", dpi=300, bbox_inches='tight')
-        plt.close(fig3)
-        print("     ✓ Saved: 3_longform_metrics_comparison.png")
-
-        print("  4. Shorts - Metrics Comparison...")
-        fig4 = create_shorts_metrics_comparison(dfs)
-        fig4.savefig(output_dir / "4_shorts_metrics_comparison.png", dpi=300, bbox_inches='tight')
-        plt.close(fig4)
-        print("     ✓ Saved: 4_shorts_metrics_comparison.png")
-
-        print("  5. Lifetime Duration Analysis...")
-        fig5 = create_lifetime_comparison(dfs)
-        fig5.savefig(output_dir / "5_lifetime_comparison.png", dpi=300, bbox_inches='tight')
-        plt.close(fig5)
-        print("     ✓ Saved: 5_lifetime_comparison.png")
-
-        print("  6. CTR Scatter Analysis...")
-        fig6 = create_ctr_scatter(dfs)
-        fig6.savefig(output_dir / "6_ctr_scatter.png", dpi=300, bbox_inches='tight')
-        plt.close(fig6)
-        print("     ✓ Saved: 6_ctr_scatter.png")
-
-        print("  7. Performance Heatmap...")
-        fig7 = create_heatmap(dfs)
-        fig7.savefig(output_dir / "7_performance_heatmap.png", dpi=300, bbox_inches='tight')
-        plt.close(fig7)
-        print("     ✓ Saved: 7_performance_heatmap.png")
-
-        print("\n" + "=" * 50)
-        print("✓ All visualizations generated successfully!")
-        print(f"\nGenerated {7} visualization files:")
-        print("  1. Summary Statistics (overview)")
-        print("  2. Top & Bottom Performers (CTR)")
-        print("  3. Long Form - Detailed Metrics")
-        print("  4. Shorts - Detailed Metrics")
-        print("  5. Lifetime Duration Analysis")
-        print("  6. CTR Scatter Plot (correlation)")
-        print("  7. Performance Heatmap (all metrics)")
-        print(f"\nOutput files saved in: {output_dir.absolute()}")
-        print("\nYou can now:")
-        print("  1. Open the PNG files to view them")
-        print("  2. Copy/paste them into your Google Sheet")
-        print("  3. Use them in presentations")
+    inputs = find_inputs(input_path)
+    if not inputs:
+        print(f"ERROR: No exports found in {input_path}")
+        return
 
-    except Exception as e:
-        print(f"\n✗ ERROR: {str(e)}")
-        import traceback
-        traceback.print_exc()
+    output_root = Path(args.output)
+    output_root.mkdir(parents=True, exist_ok=True)
+    print(f"\nBatch: {len(inputs)} exports, {min(jobs, len(inputs))} workers")
+    print(f"Output: {output_root.absolute()}/<channel>\n")
+
+    results = []
+    for path, name, result in build_batch(inputs, output_root, args, selected, jobs):
+        results.append((name, path, result))
+        if result['error']:
+            log = Path(args.output) / name / BATCH_LOG_NAME
+            print(f"  ✗ {name}: {result['error']}" + (f" (see {log})" if log.exists() else ""))
+        elif not result['sections']:
+            print(f"  - {name}: no metrics found in {path}")
+        else:
+            videos = sum(stats['videos'] for stats in result['sections'].values())
+            print(f"  ✓ {name}: {videos} videos, {result['rendered']} of "
+                  f"{result['figures']} figures rendered")
+
+    # Report channels in input order, whatever order they finished in
+    order = {name: index for index, name in enumerate(channel_names(inputs))}
+    results.sort(key=lambda item: order[item[0]])
+    summary_path, chart_paths = write_channel_summary(output_root, results, render_options(args))
+    failed = sum(1 for _, _, result in results if result['error'])
+    empty = sum(1 for _, _, result in results if not result['error'] and not result['sections'])
+    problems = []
+    if failed:
+        problems.append(f"{failed} failed")
+    if empty:
+        problems.append(f"{empty} with no data")
+
+    print("\n" + "=" * 50)
+    print(f"✓ Built {len(results) - failed - empty} of {len(results)} channels"
+          + (f" ({', '.join(problems)})" if problems else ""))
+    print(f"  Cross-channel summary: {summary_path} and {', '.join(map(str, chart_paths))}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Batch Extraction Planner for YouTube Treatment Comparison Helper
+Turns a list of video URLs with their treatment dates into an ordered batch
+file: one batch per treatment date and content type (batch mode takes a
+single treatment date per run), with the videos of each batch ordered so
+that videos sharing the same Studio date ranges run back to back. Prints
+how many range changes that saves over paste order and an estimated run
+time.
+
+Date windows follow the extension's rules (calculateDateRanges in
+content-youtube-api.js): data is available up to today (UTC) minus three
+days, equal periods are as long as the shorter of the days before and
+after treatment, and lifetime runs from publish to treatment and from
+treatment to the latest available day.
+
+Input is CSV, TSV or plain text, one video per line: a URL in any format
+batch mode accepts, then the treatment date and optionally the publish
+date. Dates are DD/MM/YYYY, DD.MM.YYYY (as the extension exports them) or
+YYYY-MM-DD. Mark Shorts with "short" or "shorts" anywhere on the line.
+Without a publish date the equal window assumes the video is older than
+the PRE period; the extension reads the real one in Studio.
+
+Usage:
+  python plan_batches.py videos.csv
+  python plan_batches.py videos.txt --treatment-date 05/10/2025 -o batches.txt
+  python plan_batches.py videos.csv --mode equal-periods --timings report.json
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import defaultdict, namedtuple
+from datetime import date, datetime, timedelta, timezone
+from itertools import groupby
+from pathlib import Path
+
+from analyze_batch_logs import PAGE_LOAD_STEP, step_kind
+
+# YouTube Analytics data delay used by calculateDateRanges
+DATA_DELAY_DAYS = 3
+MIN_DAYS_SINCE = 2
+
+# Video ID patterns, in the order content-batch.js parseUrls tries them
+VIDEO_ID_PATTERNS = [re.compile(pattern) for pattern in (
+    r'/video/([a-zA-Z0-9_-]+)',
+    r'[?&]v=([a-zA-Z0-9_-]+)',
+    r'/shorts/([a-zA-Z0-9_-]+)',
+    r'youtu\.be/([a-zA-Z0-9_-]+)',
+)]
+DATE_PATTERN = re.compile(r'\b(\d{1,2})/(\d{1,2})/(\d{4})\b|\b(\d{1,2})\.(\d{1,2})\.(\d{4})\b'
+                          r'|\b(\d{4})-(\d{2})-(\d{2})\b')
+# Anything written like a date, valid or not, so typos are reported as such
+DATE_LIKE_PATTERN = re.compile(r'\b\d{1,4}[./-]\d{1,2}[./-]\d{1,4}\b')
+# One cell of a CSV, TSV or space-separated line
+CELL_PATTERN = re.compile(r'[^\s,;]+')
+SHORTS_PATTERN = re.compile(r'/shorts/|\bshorts?\b', re.IGNORECASE)
+STUDIO_URL = 'https://studio.youtube.com/video/{}/analytics'
+
+MODES = ('complete', 'equal-periods', 'lifetime')
+# Progress steps of one video per extraction mode (content-batch.js
+# extractVideoMetrics and content-youtube-api.js extractPrePostMetrics)
+VIDEO_STEPS = [PAGE_LOAD_STEP, 'Waiting for analytics page...', 'Analytics page loaded',
+               'Navigating to Details tab...', 'Extracting video title...',
+               'Returning to Analytics tab...', 'Calculating date ranges...']
+METRIC_STEPS = ['Navigating to Advanced Mode...', 'Selecting metrics...',
+                'Setting PRE dates...', 'Extracting PRE metrics...',
+                'Setting POST dates...', 'Extracting POST metrics...']
+RETENTION_STEPS = ['Navigating to retention chart...',
+                   'Setting PRE retention dates...', 'Extracting PRE retention...',
+                   'Setting POST retention dates...', 'Extracting POST retention...']
+MODE_STEPS = {
+    'complete': VIDEO_STEPS + [f'[Equal] {step}' for step in METRIC_STEPS + RETENTION_STEPS]
+                + [f'[Lifetime] {step}' for step in METRIC_STEPS],
+    'equal-periods': VIDEO_STEPS + METRIC_STEPS + RETENTION_STEPS,
+    'lifetime': VIDEO_STEPS + METRIC_STEPS,
+}
+# Rough seconds per kind of step when no analyze_batch_logs.py report is
+# given; setting a date range includes the extension's 2 s refresh wait
+STEP_SECONDS = {'page load': 3.0, 'navigation': 2.5, 'date range': 3.5,
+                'metric read': 1.0, 'setup': 1.0}
+
+# PRE and POST date ranges set in Studio for one kind of period
+Window = namedtuple('Window', ['pre_start', 'pre_end', 'post_start', 'post_end'])
+Video = namedtuple('Video', ['video_id', 'treatment', 'published', 'content_type',
+                             'equal', 'lifetime'])
+Batch = namedtuple('Batch', ['treatment', 'content_type', 'videos'])
+
+def parse_date(text):
+    """A date from DD/MM/YYYY, DD.MM.YYYY or YYYY-MM-DD."""
+    match = DATE_PATTERN.fullmatch(text.strip())
+    if not match:
+        raise ValueError(f"not a date: {text!r}")
+    day, month, year, dot_day, dot_month, dot_year, iso_year, iso_month, iso_day = match.groups()
+    try:
+        if iso_year:
+            return date(int(iso_year), int(iso_month), int(iso_day))
+        if dot_year:
+            return date(int(dot_year), int(dot_month), int(dot_day))
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        raise ValueError(f"not a date: {text!r}") from None
+
+def latest_data_date(today):
+    """Last day YouTube Analytics has data for."""
+    return today - timedelta(days=DATA_DELAY_DAYS)
+
+def equal_window(treatment, published, today):
+    """Equal-length PRE/POST periods around the treatment date.
+
+    Raises ValueError for the treatment dates the extension refuses.
+    """
+    days_since = (latest_data_date(today) - treatment).days
+    if days_since < 0:
+        raise ValueError("treatment date is in the future")
+    if days_since < MIN_DAYS_SINCE:
+        raise ValueError(f"treatment date must be at least {DATA_DELAY_DAYS + 1} days ago")
+    max_post_days = days_since + 1
+    max_pre_days = (treatment - published).days if published else max_post_days
+    days = min(max_pre_days, max_post_days)
+    if days < 1:
+        raise ValueError("video was published on or after the treatment date")
+    pre_end = treatment - timedelta(days=1)
+    return Window(pre_end - timedelta(days=days - 1), pre_end,
+                  treatment, treatment + timedelta(days=days - 1))
+
+def lifetime_window(treatment, published, today):
+    """Publish-to-treatment and treatment-to-latest periods (None until the publish date is known)."""
+    if published is None:
+        return None
+    return Window(published, treatment, treatment, latest_data_date(today))
+
+def studio_ranges(video, mode):
+    """The date ranges batch mode sets in Studio for this video, in order."""
+    return {'complete': (video.equal, video.lifetime),
+            'equal-periods': (video.equal,), 'lifetime': (video.lifetime,)}[mode]
+
+# ============================================================================
+# Reading the video list
+# ============================================================================
+
+def read_videos(lines, today, default_treatment=None):
+    """Videos from input lines, and (line number, line, reason) for lines that cannot run.
+
+    Lines without a video URL (headers, blanks) are skipped; repeated
+    videos are kept once, as batch mode would extract them twice.
+    """
+    videos, rejected, seen = [], [], set()
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        found = next((match for match in
+                      (pattern.search(line) for pattern in VIDEO_ID_PATTERNS) if match), None)
+        if not found:
+            continue
+        video_id = found.group(1)
+        # Dates are looked for outside the URL, whose video ID may contain digit runs
+        url = next(token for token in CELL_PATTERN.finditer(line)
+                   if token.start() <= found.start() < token.end())
+        rest = line[:url.start()] + ' ' + line[url.end():]
+        if video_id in seen:
+            rejected.append((number, line, "repeated video"))
+            continue
+        try:
+            dates = [parse_date(match.group(0)) for match in DATE_LIKE_PATTERN.finditer(rest)]
+            treatment = dates[0] if dates else default_treatment
+            published = dates[1] if len(dates) > 1 else None
+            if treatment is None:
+                raise ValueError("no treatment date")
+            equal = equal_window(treatment, published, today)
+        except ValueError as e:
+            rejected.append((number, line, str(e)))
+            continue
+        seen.add(video_id)
+        content_type = 'shorts' if SHORTS_PATTERN.search(line) else 'long-form'
+        videos.append(Video(video_id, treatment, published, content_type, equal,
+                            lifetime_window(treatment, published, today)))
+    return videos, rejected
+
+# ============================================================================
+# Planning
+# ============================================================================
+
+def plan_batches(videos, mode):
+    """Batches of videos sharing a treatment date and content type, in run order.
+
+    Within a batch, videos with the same Studio ranges are adjacent;
+    videos whose publish date is only known at run time go last, and ties
+    keep input order.
+    """
+    groups = defaultdict(list)
+    for video in videos:
+        groups[video.treatment, video.content_type].append(video)
+
+    def order(video):
+        return tuple((window is None, window or ()) for window in studio_ranges(video, mode))
+
+    return [Batch(treatment, content_type, sorted(group, key=order))
+            for (treatment, content_type), group
+            in sorted(groups.items(), key=lambda item: (item[0][0], item[0][1] != 'long-form'))]
+
+def range_changes(videos, mode):
+    """How often consecutive videos need different Studio date ranges.
+
+    Videos whose ranges depend on a publish date read at run time count
+    as a change each.
+    """
+    changes, previous = 0, None
+    for video in videos:
+        ranges = studio_ranges(video, mode)
+        if ranges != previous or None in ranges:
+            changes += 1
+        previous = ranges
+    return changes
+
+def step_seconds(timings_path=None):
+    """Seconds per progress step label: medians from an analyze_batch_logs.py --json report, else rough defaults."""
+    seconds = {}
+    if timings_path:
+        with open(timings_path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+        seconds = {row['step']: row['p50_ms'] / 1000 for row in report.get('steps', [])}
+    return {step: seconds.get(step, STEP_SECONDS[step_kind(step) if step != PAGE_LOAD_STEP else 'page load'])
+            for steps in MODE_STEPS.values() for step in steps}
+
+def video_seconds(mode, seconds):
+    return sum(seconds[step] for step in MODE_STEPS[mode])
+
+def format_duration(total_seconds):
+    minutes = round(total_seconds / 60)
+    return f"{minutes // 60}h {minutes % 60:02d}m" if minutes >= 60 else f"{minutes} min"
+
+def write_batch_file(batches, mode, per_video, out):
+    """The plan as text batch mode can take: paste each block's URLs with its treatment date.
+
+    Comment lines carry no URL, so batch mode's URL parser skips them.
+    """
+    out.write(f"# Batch plan: {sum(len(batch.videos) for batch in batches)} videos in "
+              f"{len(batches)} batches, {mode} mode, about "
+              f"{format_duration(per_video * sum(len(batch.videos) for batch in batches))}\n")
+    for number, batch in enumerate(batches, 1):
+        out.write(f"\n# Batch {number} of {len(batches)}: treatment date "
+                  f"{batch.treatment.strftime('%d/%m/%Y')}, {batch.content_type}, "
+                  f"{len(batch.videos)} videos, about {format_duration(per_video * len(batch.videos))}\n")
+        for ranges, group in groupby(batch.videos, key=lambda video: studio_ranges(video, mode)):
+            group = list(group)
+            described = '; '.join(
+                f"PRE {window.pre_start} to {window.pre_end}, POST {window.post_start} to {window.post_end}"
+                if window else "lifetime from publish date"
+                for window in ranges)
+            out.write(f"# {len(group)} video{'s' if len(group) != 1 else ''}: {described}\n")
+            for video in group:
+                out.write(STUDIO_URL.format(video.video_id) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Order a URL/treatment-date list into batch mode runs with shared date ranges",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python plan_batches.py videos.csv
+  python plan_batches.py videos.txt --treatment-date 05/10/2025 -o batches.txt
+  python plan_batches.py videos.csv --mode equal-periods --timings report.json
+        """
+    )
+    parser.add_argument("input", help="Video list (CSV, TSV or text; '-' for stdin)")
+    parser.add_argument("-o", "--output", metavar="PATH",
+                        help="Write the batch file here (default: print it)")
+    parser.add_argument("--mode", choices=MODES, default='complete',
+                        help="Batch extraction mode (default: complete)")
+    parser.add_argument("--treatment-date", metavar="DATE",
+                        help="Treatment date for lines without one (DD/MM/YYYY, DD.MM.YYYY or YYYY-MM-DD)")
+    parser.add_argument("--today", metavar="DATE",
+                        help="Plan as of this date (default: today, UTC)")
+    parser.add_argument("--timings", metavar="REPORT",
+                        help="analyze_batch_logs.py --json report to estimate step times from")
+    args = parser.parse_args()
+
+    try:
+        today = parse_date(args.today) if args.today else datetime.now(timezone.utc).date()
+        default_treatment = parse_date(args.treatment_date) if args.treatment_date else None
+    except ValueError as e:
+        parser.error(str(e))
+    if args.input != '-' and not Path(args.input).is_file():
+        parser.error(f"no such file: {args.input}")
+
+    if args.input == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        lines = Path(args.input).read_text(encoding='utf-8-sig').splitlines()
+    videos, rejected = read_videos(lines, today, default_treatment)
+    batches = plan_batches(videos, args.mode)
+    per_video = video_seconds(args.mode, step_seconds(args.timings))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            write_batch_file(batches, args.mode, per_video, f)
+    else:
+        write_batch_file(batches, args.mode, per_video, sys.stdout)
+
+    planned = [video for batch in batches for video in batch.videos]
+    report = sys.stderr if not args.output else sys.stdout
+    print(f"\nBatch plan ({args.mode}, as of {today})", file=report)
+    print("=" * 50, file=report)
+    print(f"  {len(videos)} videos in {len(batches)} batches", file=report)
+    print(f"  Range changes: {range_changes(videos, args.mode)} in input order, "
+          f"{range_changes(planned, args.mode)} planned", file=report)
+    print(f"  Estimated run time: {format_duration(per_video * len(videos))} "
+          f"({per_video:.0f}s per video{', from logged timings' if args.timings else ''})", file=report)
+    if rejected:
+        print(f"\n⚠️ {len(rejected)} lines left out:", file=report)
+        for number, line, reason in rejected:
+            print(f"  line {number}: {reason}: {line[:60]}", file=report)
+    if args.output:
+        print(f"\n✓ Batch file written to {args.output}", file=report)
+
+if __name__ == "__main__":
+    main()
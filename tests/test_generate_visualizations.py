@@ -0,0 +1,84 @@
+"""
+Tests for generate_visualizations.py: parsing exports and drawing charts.
+
+Exports are built with the benchmark dataset generator, so they have the
+same layout as the extension's batch TSV and the comparison sheet.
+
+Usage:
+  python -m pytest tests
+"""
+
+import io
+import os
+import sys
+import warnings
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "benchmarks"))
+
+from generate_visualizations import (  # noqa: E402
+    FIGURES, SECTION_LABELS, draw_figure, empty_section, ingest_export, load_sections,
+    normalize_sections, open_store, parse_tsv_export,
+)
+from make_dataset import TSV_HEADER, _tsv_rows  # noqa: E402
+
+
+def batch_export(titles, shorts_rate=0.0, columns=len(TSV_HEADER), order=None):
+    """A batch TSV as content-batch.js writes it: cells joined by tabs, nothing escaped.
+
+    `columns` keeps only the first ones (19: an Equal Periods export), and
+    `order` lists the videos' positions in the file.
+    """
+    rows = list(_tsv_rows(np.random.default_rng(0), 0, len(titles), shorts_rate, 0.0))
+    for row, title in zip(rows, titles):
+        row[1] = title
+    rows = [rows[i] for i in (order or range(len(rows)))]
+    return '\n'.join('\t'.join(row[:columns]) for row in [list(TSV_HEADER)] + rows).encode('utf-8')
+
+
+def test_tsv_title_starting_with_quote(tmp_path):
+    titles = ['"Quiet quitting is real', 'Plain title', 'Ends with "a quote"']
+    path = tmp_path / "export.tsv"
+    path.write_bytes(batch_export(titles))
+
+    for sections in (load_sections(path), load_sections(io.BytesIO(path.read_bytes())),
+                     parse_tsv_export(path)):
+        assert list(sections['longform_equal']['Video Title']) == titles
+        assert len(sections['longform_lifetime']) == len(titles)
+
+
+def test_missing_section_panels_show_no_data():
+    # A long-form-only export: both Shorts sections are empty tables
+    dfs = normalize_sections(load_sections(io.BytesIO(batch_export(['A', 'B', 'C']))))
+    for section in SECTION_LABELS:
+        dfs.setdefault(section, empty_section(section))
+
+    for index, figure in enumerate(FIGURES):
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', UserWarning)
+            fig = draw_figure(index, dfs)
+        # Panel axes come first; colorbars are appended after them
+        for ax, panel in zip(fig.axes, figure.chart.panels):
+            texts = [text.get_text() for text in ax.texts]
+            if panel.section.startswith('shorts'):
+                assert texts == ['No data'], (figure.name, panel.title)
+            else:
+                assert 'No data' not in texts, (figure.name, panel.title)
+
+
+def test_equal_only_export_downloaded_again_is_not_stored_twice(tmp_path):
+    conn = open_store(tmp_path / "metrics.sqlite")
+    day = 24 * 3600
+    for number, (order, age_days) in enumerate((([0, 1, 2], 10), ([2, 0, 1], 3))):
+        path = tmp_path / f"export{number}.tsv"
+        path.write_bytes(batch_export(['A', 'B', 'C'], columns=19, order=order))
+        mtime = os.path.getmtime(path) - age_days * day
+        os.utime(path, (mtime, mtime))
+        result = ingest_export(conn, path, channel='c')
+        assert result['rows'] == 3
+        assert result['written'] == (3 if number == 0 else 0)
+    assert conn.execute("SELECT count(*) FROM periods").fetchone()[0] == 3